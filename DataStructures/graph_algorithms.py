@@ -1,19 +1,176 @@
+import bisect
+import contextlib
+import functools
+import inspect
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import time as timer
+import tracemalloc
+import warnings
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from functools import cached_property
+from multiprocessing import shared_memory
+
 import numpy as np
 
+WHITE = 0
+GRAY = 1
+BLACK = 2
+NIL = -1
+CSR_MAGIC = b"CSRGRAPH"
+CSR_VERSION = 1
+
+
+class ResultCache:
+    """Bounded LRU memo of traversal results for one version of a graph."""
+
+    def __init__(self, maxsize: int = 8) -> None:
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> tuple | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, entry: tuple) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class CycleError(ValueError):
+    def __init__(self, cycle: list[str]) -> None:
+        super().__init__(f"graph has a cycle: {' -> '.join([*cycle, cycle[0]])}")
+        self.cycle = cycle
+
+
+def reporting_edit(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def edit(self, *args):
+        result = method(self, *args)
+        self.edited()
+        return result
+
+    return edit
+
+
+class Adjacents(list):
+    """Adjacency list of a Vertex that reports in-place edits to its graph."""
+
+    def __init__(self, names: Iterable[str] = (), vertex: "Vertex | None" = None):
+        super().__init__(names)
+        self.vertex = vertex
+
+    def edited(self) -> None:
+        if self.vertex is not None and self.vertex.graph_edited is not None:
+            self.vertex.graph_edited()
+
+    append = reporting_edit(list.append)
+    extend = reporting_edit(list.extend)
+    insert = reporting_edit(list.insert)
+    remove = reporting_edit(list.remove)
+    pop = reporting_edit(list.pop)
+    clear = reporting_edit(list.clear)
+    sort = reporting_edit(list.sort)
+    reverse = reporting_edit(list.reverse)
+    __setitem__ = reporting_edit(list.__setitem__)
+    __delitem__ = reporting_edit(list.__delitem__)
+    __iadd__ = reporting_edit(list.__iadd__)
+    __imul__ = reporting_edit(list.__imul__)
+
 
 class Vertex:
-    def __init__(self, name: str, adjacents: list[str]) -> None:
+    """A vertex of a Graph.
+
+    ``color`` and ``parent`` are derived from the epochs in which the vertex
+    was last discovered, finished and given a parent: a vertex not
+    discovered in the current epoch of its graph's ``clock`` is white with a
+    nil parent, so a traversal starts by bumping the clock instead of
+    resetting every vertex. Editing ``adjacents`` in place, or assigning it,
+    starts a new version of the graph through ``graph_edited``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        adjacents: list[str],
+        weights: dict[str, float] | None = None,
+    ) -> None:
         self.name = name
-        self.color = "white"
-        self.parent = "nil"
+        self.clock = [1]
+        self.discovered_in = 0
+        self.finished_in = 0
+        self.parent_in = 0
+        self.parent_name = "nil"
         self.discovery_time = np.inf
         self.finish_time = np.inf
-        self.adjacents: list[str] = adjacents
+        self.graph_edited: Callable[[], None] | None = None
+        self.adjacents = adjacents
+        self.weights: dict[str, float] = weights if weights is not None else {}
+
+    @property
+    def adjacents(self) -> Adjacents:
+        return self.adjacent_names
+
+    @adjacents.setter
+    def adjacents(self, names: Iterable[str]) -> None:
+        self.adjacent_names = Adjacents(names, self)
+        self.adjacent_names.edited()
+
+    def weight(self, adjacent: str) -> float:
+        """Weight of the edge to adjacent; unweighted edges weigh 1."""
+        return self.weights.get(adjacent, 1.0)
+
+    @property
+    def color(self) -> str:
+        if self.discovered_in != self.clock[0]:
+            return "white"
+        if self.finished_in != self.clock[0]:
+            return "gray"
+        return "black"
+
+    @color.setter
+    def color(self, value: str) -> None:
+        epoch = self.clock[0]
+        self.discovered_in = 0 if value == "white" else epoch
+        self.finished_in = epoch if value == "black" else 0
+
+    @property
+    def parent(self) -> str:
+        if self.parent_in != self.clock[0]:
+            return "nil"
+        return self.parent_name
+
+    @parent.setter
+    def parent(self, value: str) -> None:
+        self.parent_in = self.clock[0]
+        self.parent_name = value
 
     def copy_for_strongly_connected_components(self) -> "Vertex":
         other = Vertex(name=self.name, adjacents=[])
-        other.color = "white"
-        other.parent = "nil"
         other.discovery_time = np.inf
         other.finish_time = self.finish_time
         return other
@@ -36,32 +193,163 @@ class Graph:
     def __init__(self, name: str) -> None:
         self.graph: dict[str, Vertex] = {}
         self.name = name
+        self.sorted_adjacents: dict[str, list[Vertex]] = {}
+        self.vertex_orders: dict[str, list[Vertex]] = {}
+        self.incremental: IncrementalSCC | None = None
+        self.clock = [1]
+        self.csr: CSRGraph | None = None
+        self.version = 0
+        self.results = ResultCache()
+        self.state_key: tuple | None = None
+
+    @property
+    def epoch(self) -> int:
+        return self.clock[0]
+
+    def new_epoch(self) -> int:
+        """Start a traversal: every vertex becomes white with a nil parent."""
+        # The vertex state no longer matches any memoized snapshot.
+        self.state_key = None
+        self.clock[0] += 1
+        return self.clock[0]
+
+    def invalidate_indexes(self) -> None:
+        """Start a new version: drop cached indexes and traversal results.
+
+        ``__setitem__``, ``__delitem__``, ``add_edge`` and in-place edits of
+        a vertex's ``adjacents`` call this; code that edits a vertex's
+        ``weights`` in place must call it too.
+        """
+        self.sorted_adjacents.clear()
+        self.vertex_orders.clear()
+        self.csr = None
+        self.version += 1
+        self.results.clear()
+        self.state_key = None
+
+    def snapshot_state(self) -> tuple:
+        epoch = self.clock[0]
+        state = [
+            (
+                vertex,
+                vertex.discovery_time,
+                vertex.finish_time,
+                vertex.discovered_in == epoch,
+                vertex.finished_in == epoch,
+                vertex.parent_name if vertex.parent_in == epoch else "nil",
+            )
+            for vertex in self.graph.values()
+        ]
+        return state, self.vertex_orders.get("by finish time")
+
+    def restore_state(self, snapshot: tuple) -> None:
+        state, finish_order = snapshot
+        epoch = self.new_epoch()
+        for vertex, discovery, finish, discovered, finished, parent in state:
+            vertex.discovery_time = discovery
+            vertex.finish_time = finish
+            vertex.discovered_in = epoch if discovered else 0
+            vertex.finished_in = epoch if finished else 0
+            vertex.parent_in = epoch
+            vertex.parent_name = parent
+        if finish_order is not None:
+            self.vertex_orders["by finish time"] = finish_order
+
+    def to_csr(self) -> "CSRGraph":
+        """CSR snapshot of the graph, built once per version of the graph.
+
+        Its vertex ids follow the insertion order of ``self.graph``.
+        """
+        if self.csr is None:
+            self.csr = CSRGraph.from_graph(self)
+        return self.csr
 
     def vertices(self, sort: str = "") -> list[Vertex]:
+        order = self.vertex_orders.get(sort)
+        if order is not None:
+            return order
         if sort == "alphabetically":
-            return sorted(self.graph.values(), key=lambda x: x.name)
-        if sort == "by finish time":
-            return sorted(
+            order = sorted(self.graph.values(), key=lambda x: x.name)
+        elif sort == "by finish time":
+            order = sorted(
                 self.graph.values(),
                 key=lambda x: x.finish_time,
                 reverse=True,
             )
-        return list(self.graph.values())
+        else:
+            order = list(self.graph.values())
+        self.vertex_orders[sort] = order
+        return order
 
     def adjacents(self, vertex: Vertex) -> list[Vertex]:
-        return sorted(
-            [self.graph[v] for v in self.graph[vertex.name].adjacents],
-            key=lambda x: x.name,
-        )
+        adjacents = self.sorted_adjacents.get(vertex.name)
+        if adjacents is None:
+            adjacents = sorted(
+                [self.graph[v] for v in self.graph[vertex.name].adjacents],
+                key=lambda x: x.name,
+            )
+            self.sorted_adjacents[vertex.name] = adjacents
+        return adjacents
+
+    def set_finish_order(self, finished: list[str]) -> None:
+        """Record the finish order of a full traversal as "by finish time"."""
+        self.vertex_orders["by finish time"] = [
+            self.graph[name] for name in reversed(finished)
+        ]
 
     def __getitem__(self, key: str) -> Vertex:
         return self.graph[key]
 
+    def adjacents_edited(self) -> None:
+        """A vertex's adjacents were edited in place: start a new version."""
+        self.invalidate_indexes()
+        # The edit is unknown, so the incremental SCCs are rebuilt lazily.
+        self.incremental = None
+
     def __setitem__(self, key: str, value: Vertex) -> None:
+        old = self.graph.get(key)
+        if old is not None:
+            old.graph_edited = None
+        color = value.color
+        parent = value.parent
+        value.clock = self.clock
+        value.color = color
+        value.parent = parent
+        value.graph_edited = self.adjacents_edited
         self.graph[key] = value
+        self.invalidate_indexes()
+        if self.incremental is not None:
+            added = Counter(value.adjacents)
+            if old is not None:
+                if Counter(old.adjacents) - added:
+                    # Edge deletions cannot be applied online, rebuild lazily.
+                    self.incremental = None
+                    return
+                added -= Counter(old.adjacents)
+            self.incremental.add_vertex(key)
+            for adjacent in added.elements():
+                self.incremental.add_edge(key, adjacent)
 
     def __delitem__(self, key: str) -> None:
-        del self.graph[key]
+        self.graph.pop(key).graph_edited = None
+        self.invalidate_indexes()
+        self.incremental = None
+
+    def add_edge(self, u: str, v: str, weight: float | None = None) -> None:
+        # A known insertion updates the incremental SCCs instead of dropping
+        # them, so it bypasses Adjacents.append.
+        list.append(self.graph[u].adjacents, v)
+        if weight is not None:
+            self.graph[u].weights[v] = weight
+        self.invalidate_indexes()
+        if self.incremental is not None:
+            self.incremental.add_edge(u, v)
+
+    def track_strongly_connected_components(self) -> "IncrementalSCC":
+        """Start keeping the SCCs and their order up to date on insertions."""
+        if self.incremental is None:
+            self.incremental = IncrementalSCC(self)
+        return self.incremental
 
     def __str__(self) -> str:
         result = f"-- {self.name} Graph --\n"
@@ -80,66 +368,1053 @@ class Graph:
         for vertex in self.graph.values():
             for adjacent in vertex.adjacents:
                 transpose[adjacent].adjacents.append(vertex.name)
+                if adjacent in vertex.weights:
+                    transpose[adjacent].weights[vertex.name] = vertex.weights[adjacent]
+        transpose.invalidate_indexes()
+        if "by finish time" in self.vertex_orders:
+            transpose.vertex_orders["by finish time"] = [
+                transpose[vertex.name]
+                for vertex in self.vertex_orders["by finish time"]
+            ]
         return transpose
 
 
-def dfs(graph: Graph, sort: str = "alphabetically") -> None:
-    for u in graph.vertices():
-        u.color = "white"
-        u.parent = "nil"
+class CSRGraph:
+    """Compressed sparse row graph with interned integer vertex ids.
+
+    Vertex ``i`` is named ``names[i]`` and its adjacents are
+    ``targets[offsets[i]:offsets[i + 1]]``, kept sorted by name so traversals
+    visit them in the same order as ``Graph.adjacents``. Edge weights, when
+    present, are kept in ``weights`` aligned with ``targets``. Ids follow
+    insertion order, and the per-vertex traversal state lives in flat arrays
+    instead of one ``Vertex`` object per node.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        names: Sequence[str],
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        alphabetical: np.ndarray | None = None,
+        weights: np.ndarray | None = None,
+    ) -> None:
+        """Build the graph; rows are sorted unless alphabetical is given.
+
+        Passing ``alphabetical`` (the ids ordered by name) promises that every
+        row of targets is already in that order, as in a saved graph.
+        """
+        self.name = name
+        self.names = names
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=index_dtype(len(names)))
+        self.weights = None
+        if weights is not None:
+            self.weights = np.asarray(weights, dtype=np.float64)
+        if isinstance(names, np.ndarray):
+            self.names = NameTable.from_array(names)
+        if alphabetical is None:
+            if isinstance(names, np.ndarray):
+                self.alphabetical = np.argsort(names, kind="stable")
+            else:
+                self.alphabetical = np.array(
+                    sorted(range(len(names)), key=names.__getitem__),
+                    dtype=np.int64,
+                )
+            self.sort_adjacents()
+        else:
+            self.alphabetical = alphabetical
+
+        n = len(names)
+        self.version = 0
+        self.results = ResultCache()
+        self.state_key: tuple | None = None
+        self.epoch = 1
+        self.discovered_in = np.zeros(n, dtype=np.int32)
+        self.finished_in = np.zeros(n, dtype=np.int32)
+        self.parents = np.zeros(n, dtype=np.int64)
+        self.discovery_time = np.zeros(n, dtype=np.int64)
+        self.finish_time = np.zeros(n, dtype=np.int64)
+
+    @cached_property
+    def ids(self) -> dict[str, int]:
+        return {vertex_name: i for i, vertex_name in enumerate(self.names)}
+
+    def vertex_id(self, key: str) -> int:
+        if isinstance(self.names, list):
+            return self.ids[key]
+        # Binary search the name order instead of interning every name.
+        position = bisect.bisect_left(
+            self.alphabetical, key, key=self.names.__getitem__
+        )
+        if (
+            position == len(self.names)
+            or self.names[self.alphabetical[position]] != key
+        ):
+            raise KeyError(key)
+        return int(self.alphabetical[position])
+
+    @classmethod
+    def from_edges(
+        cls,
+        name: str,
+        names: Sequence[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        alphabetical: np.ndarray | None = None,
+        weights: np.ndarray | None = None,
+    ) -> "CSRGraph":
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(names)), out=offsets[1:])
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[order]
+        graph = cls(name, names, offsets, targets[order], alphabetical, weights)
+        if alphabetical is not None:
+            graph.sort_adjacents()
+        return graph
+
+    @classmethod
+    def from_arrays(
+        cls,
+        name: str,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        names: Sequence[str] | None = None,
+        weights: np.ndarray | None = None,
+    ) -> "CSRGraph":
+        """Build a graph from parallel arrays of integer vertex ids.
+
+        Vertices are named ``str(id)`` unless names are given.
+        """
+        sources = np.asarray(sources)
+        targets = np.asarray(targets)
+        if names is None:
+            n = 0
+            if sources.size:
+                n = int(max(sources.max(), targets.max())) + 1
+            names = np.arange(n).astype(str)
+        return cls.from_edges(name, names, sources, targets, weights=weights)
+
+    @classmethod
+    def from_edge_list(
+        cls,
+        path: str,
+        name: str | None = None,
+        delimiter: str | None = None,
+        skip_header: int = 0,
+        comments: str = "#",
+        chunk_size: int = 1_000_000,
+    ) -> "CSRGraph":
+        """Stream a text or CSV edge list with one ``source target`` per line.
+
+        A third column, if the first edge has one, is read as the edge
+        weight. Lines are parsed ``chunk_size`` at a time by ``np.loadtxt``
+        and every chunk keeps only its distinct names and an array of
+        indices into them, so memory holds the id arrays rather than the
+        text. Names made only of digits are read as integers and named by
+        their decimal value, as in ``from_arrays``. Vertex ids follow the
+        sorted order of the names.
+        """
+        chunks: list[tuple[np.ndarray, np.ndarray]] = []
+        weight_chunks: list[np.ndarray] = []
+        columns = 0
+        with open(path, encoding="utf-8") as file:
+            for _ in range(skip_header):
+                next(file, None)
+            while True:
+                lines = list(itertools.islice(file, chunk_size))
+                if not lines:
+                    break
+                if not columns:
+                    first = next(
+                        (
+                            line
+                            for line in map(str.strip, lines)
+                            if line and not line.startswith(comments)
+                        ),
+                        None,
+                    )
+                    if first is None:
+                        continue
+                    columns = min(len(first.split(delimiter)), 3)
+                sources, targets, weights = read_edge_chunk(
+                    lines, delimiter, comments, columns
+                )
+                chunks.append(unique_names(np.concatenate([sources, targets])))
+                weight_chunks.append(weights)
+        if name is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+        if not chunks:
+            empty = np.empty(0, dtype=np.int64)
+            return cls.from_edges(name, [], empty, empty)
+
+        # Chunks of integer names are merged as integers; otherwise every
+        # chunk's names are merged as text.
+        if any(names.dtype.kind != "i" for names, _ in chunks):
+            chunks = [(names.astype(str), inverse) for names, inverse in chunks]
+        names = np.unique(np.concatenate([names for names, _ in chunks]))
+        sources = []
+        targets = []
+        for chunk, inverse in chunks:
+            ids = np.searchsorted(names, chunk)[inverse]
+            sources.append(ids[: ids.size // 2])
+            targets.append(ids[ids.size // 2 :])
+        weights = np.concatenate(weight_chunks)
+        return cls.from_edges(
+            name,
+            names.astype(str),
+            np.concatenate(sources),
+            np.concatenate(targets),
+            # Text names are already in alphabetical order.
+            np.arange(names.size) if names.dtype.kind == "U" else None,
+            weights=None if np.all(weights == 1.0) else weights,
+        )
+
+    def save(self, path: str) -> None:
+        """Write the graph in the binary format read by ``CSRGraph.load``.
+
+        Layout: an 8-byte magic, a header of six little-endian uint64
+        (version, n, m, target item size, name bytes, weighted), then the
+        offsets, targets, alphabetical, name offsets, UTF-8 name bytes and,
+        if weighted, float64 weights, each starting on an 8-byte boundary.
+        """
+        if isinstance(self.names, NameTable):
+            name_offsets = self.names.offsets
+            name_bytes = self.names.data
+        else:
+            encoded = [vertex_name.encode() for vertex_name in self.names]
+            name_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(e) for e in encoded], out=name_offsets[1:])
+            name_bytes = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        header = np.array(
+            [
+                CSR_VERSION,
+                len(self.names),
+                self.targets.size,
+                self.targets.itemsize,
+                name_bytes.size,
+                self.weights is not None,
+            ],
+            dtype="<u8",
+        )
+        with open(path, "wb") as file:
+            file.write(CSR_MAGIC)
+            file.write(header.tobytes())
+            arrays = [
+                self.offsets.astype("<i8", copy=False),
+                self.targets.astype(self.targets.dtype.newbyteorder("<"), copy=False),
+                self.alphabetical.astype("<i8", copy=False),
+                np.asarray(name_offsets, dtype="<i8"),
+                name_bytes,
+            ]
+            if self.weights is not None:
+                arrays.append(self.weights.astype("<f8", copy=False))
+            for array in arrays:
+                file.write(memoryview(np.ascontiguousarray(array)).cast("B"))
+                file.write(b"\0" * (-array.nbytes % 8))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CSRGraph":
+        """Open a graph written by ``save``.
+
+        With ``mmap`` the arrays and names are memory-mapped read-only, so
+        opening is O(1) in the graph size and pages are read on first use.
+        """
+        with open(path, "rb") as file:
+            if file.read(len(CSR_MAGIC)) != CSR_MAGIC:
+                raise ValueError(f"{path} is not a CSRGraph file")
+            version, n, m, target_size, name_size, weighted = np.frombuffer(
+                file.read(48), dtype="<u8"
+            ).tolist()
+        if version != CSR_VERSION:
+            raise ValueError(f"unsupported CSRGraph file version {version}")
+
+        position = len(CSR_MAGIC) + 48
+        arrays = []
+        for dtype, count in (
+            ("<i8", n + 1),
+            ("<i4" if target_size == 4 else "<i8", m),
+            ("<i8", n),
+            ("<i8", n + 1),
+            ("u1", name_size),
+            ("<f8", m if weighted else 0),
+        ):
+            if mmap and count:
+                array = np.memmap(
+                    path, dtype=dtype, mode="r", offset=position, shape=(count,)
+                )
+            else:
+                array = np.fromfile(path, dtype=dtype, count=count, offset=position)
+            arrays.append(array)
+            position += count * np.dtype(dtype).itemsize
+            position += -position % 8
+        offsets, targets, alphabetical, name_offsets, name_bytes, weights = arrays
+        return cls(
+            os.path.splitext(os.path.basename(path))[0],
+            NameTable(name_offsets, name_bytes),
+            offsets,
+            targets,
+            alphabetical,
+            weights if weighted else None,
+        )
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "CSRGraph":
+        names = list(graph.graph)
+        ids = {vertex_name: i for i, vertex_name in enumerate(names)}
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        targets = []
+        weights = []
+        for i, vertex in enumerate(graph.graph.values()):
+            targets.extend(ids[adjacent] for adjacent in vertex.adjacents)
+            if vertex.weights:
+                weights.extend(vertex.weight(adjacent) for adjacent in vertex.adjacents)
+            else:
+                weights.extend([1.0] * len(vertex.adjacents))
+            offsets[i + 1] = len(targets)
+        weighted = any(vertex.weights for vertex in graph.graph.values())
+        return cls(
+            graph.name,
+            names,
+            offsets,
+            np.array(targets, dtype=np.int64),
+            weights=np.array(weights, dtype=np.float64) if weighted else None,
+        )
+
+    def sort_adjacents(self) -> None:
+        rank = np.empty(len(self.names), dtype=np.int64)
+        rank[self.alphabetical] = np.arange(len(self.names))
+        rows = np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+        if len(self.names) < 1 << 31:
+            # One integer key sorts faster than lexsort over two.
+            order = np.argsort(
+                rows * len(self.names) + rank[self.targets], kind="stable"
+            )
+        else:
+            order = np.lexsort((rank[self.targets], rows))
+        self.targets = self.targets[order]
+        if self.weights is not None:
+            self.weights = self.weights[order]
+
+    def new_epoch(self) -> int:
+        """Start a traversal: every vertex becomes white with a nil parent."""
+        self.state_key = None
+        if self.epoch == np.iinfo(self.discovered_in.dtype).max:
+            self.discovered_in.fill(0)
+            self.finished_in.fill(0)
+            self.epoch = 0
+        self.epoch += 1
+        return self.epoch
+
+    def snapshot_state(self) -> tuple:
+        return (
+            self.discovered_in == self.epoch,
+            self.finished_in == self.epoch,
+            self.parents.copy(),
+            self.discovery_time.copy(),
+            self.finish_time.copy(),
+        )
+
+    def restore_state(self, snapshot: tuple) -> None:
+        discovered, finished, parents, discovery_time, finish_time = snapshot
+        epoch = self.new_epoch()
+        self.discovered_in[discovered] = epoch
+        self.finished_in[finished] = epoch
+        self.parents[:] = parents
+        self.discovery_time[:] = discovery_time
+        self.finish_time[:] = finish_time
+
+    @property
+    def color(self) -> np.ndarray:
+        color = np.full(len(self), WHITE, dtype=np.int8)
+        color[self.discovered_in == self.epoch] = GRAY
+        color[self.finished_in == self.epoch] = BLACK
+        return color
+
+    @property
+    def parent(self) -> np.ndarray:
+        return np.where(self.discovered_in == self.epoch, self.parents, NIL)
+
+    def vertices(self, sort: str = "") -> np.ndarray:
+        if sort == "alphabetically":
+            return self.alphabetical
+        if sort == "by finish time":
+            return np.argsort(-self.finish_time, kind="stable")
+        return np.arange(len(self.names))
+
+    def adjacents(self, u: int) -> np.ndarray:
+        return self.targets[self.offsets[u] : self.offsets[u + 1]]
+
+    def transpose(self) -> "CSRGraph":
+        sources = np.repeat(
+            np.arange(len(self.names), dtype=np.int64), np.diff(self.offsets)
+        )
+        transpose = CSRGraph.from_edges(
+            f"{self.name} transpose",
+            self.names,
+            self.targets,
+            sources,
+            self.alphabetical,
+            self.weights,
+        )
+        transpose.finish_time[:] = self.finish_time
+        return transpose
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, key: str) -> Vertex:
+        u = self.vertex_id(key)
+        vertex = Vertex(
+            name=key,
+            adjacents=[self.names[v] for v in self.adjacents(u)],
+        )
+        if self.weights is not None:
+            weights = self.weights[self.offsets[u] : self.offsets[u + 1]].tolist()
+            vertex.weights = dict(zip(vertex.adjacents, weights))
+        if self.finished_in[u] == self.epoch:
+            vertex.color = "black"
+        elif self.discovered_in[u] == self.epoch:
+            vertex.color = "gray"
+        if vertex.color != "white" and self.parents[u] != NIL:
+            vertex.parent = self.names[self.parents[u]]
+        if self.discovery_time[u]:
+            vertex.discovery_time = int(self.discovery_time[u])
+        if self.finish_time[u]:
+            vertex.finish_time = int(self.finish_time[u])
+        return vertex
+
+    def __str__(self) -> str:
+        result = f"-- {self.name} Graph --\n"
+        for vertex_name in self.names:
+            result += str(self[vertex_name]) + "\n"
+        return result
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class NameTable(Sequence):
+    """Vertex names stored as UTF-8 bytes plus offsets, decoded on access."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_array(cls, names: np.ndarray) -> "NameTable":
+        """Pack a NumPy str or bytes array without a Python object per name."""
+        if names.dtype.kind == "U":
+            names = np.char.encode(names)
+        lengths = np.char.str_len(names)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        width = names.dtype.itemsize
+        characters = names.view(np.uint8).reshape(len(names), width)
+        return cls(offsets, characters[np.arange(width) < lengths[:, None]])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        return self.data[self.offsets[i] : self.offsets[i + 1]].tobytes().decode()
+
+
+def unique_names(names: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """``np.unique(names, return_inverse=True)``, faster for str arrays.
+
+    Sorting strings is several times slower than sorting integers, so str
+    names are deduplicated by an FNV-1a hash of their code points and only
+    the distinct names are sorted. A hash collision, detected by checking
+    every name against its representative, falls back to ``np.unique``.
+    """
+    if names.dtype.kind != "U" or names.size == 0:
+        return np.unique(names, return_inverse=True)
+    codes = np.ascontiguousarray(names).view(np.uint32).reshape(names.size, -1)
+    hashes = np.full(names.size, 0xCBF29CE484222325, dtype=np.uint64)
+    for column in codes.T:
+        hashes ^= column
+        hashes *= np.uint64(0x100000001B3)
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    distinct = names[first]
+    if not np.array_equal(distinct[inverse], names):
+        return np.unique(names, return_inverse=True)
+    order = np.argsort(distinct)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    return distinct[order], rank[inverse]
+
+
+def read_edge_chunk(
+    lines: list[str], delimiter: str | None, comments: str, columns: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Parse edge lines into source names, target names and weights.
+
+    Names are int64 when every name in the chunk is an integer and str
+    otherwise. Edges without a weight column weigh 1.
+    """
+    with warnings.catch_warnings():
+        # A chunk made only of comments and blank lines is not an error.
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            fields = np.loadtxt(
+                lines,
+                dtype=[("source", np.int64), ("target", np.int64), ("weight", float)][
+                    :columns
+                ],
+                delimiter=delimiter,
+                comments=comments,
+                usecols=range(columns),
+                ndmin=1,
+            )
+            sources, targets = fields["source"], fields["target"]
+            weights = fields["weight"] if columns > 2 else None
+        except ValueError:
+            fields = np.loadtxt(
+                lines,
+                dtype=str,
+                delimiter=delimiter,
+                comments=comments,
+                usecols=range(columns),
+                ndmin=2,
+            ).reshape(-1, columns)
+            if delimiter is not None:
+                fields = np.char.strip(fields)
+            sources, targets = fields[:, 0], fields[:, 1]
+            weights = fields[:, 2].astype(np.float64) if columns > 2 else None
+    if weights is None:
+        weights = np.ones(sources.size)
+    return sources, targets, weights
+
+
+class IncrementalSCC:
+    """Strongly connected components maintained under edge insertions.
+
+    Keeps the condensation of a Graph and a topological order of its
+    components with the Pearce-Kelly online algorithm. Inserting an edge
+    x -> y that already agrees with the order costs O(1); otherwise only the
+    components ordered between y and x are searched and reordered, and those
+    found on a new cycle are merged into one component.
+    Components are identified by a representative vertex name.
+    """
+
+    def __init__(self, graph: Graph) -> None:
+        self.component: dict[str, str] = {}
+        self.members: dict[str, list[str]] = {}
+        self.successors: dict[str, Counter[str]] = {}
+        self.predecessors: dict[str, Counter[str]] = {}
+        self.order: dict[str, int] = {}
+        self.next_order = 0
+        for members in tarjan_scc(graph):
+            for name in members:
+                self.component[name] = members[0]
+            self.add_component(members[0], members)
+        for vertex in graph.vertices():
+            x = self.component[vertex.name]
+            for adjacent in vertex.adjacents:
+                y = self.component[adjacent]
+                if x != y:
+                    self.successors[x][y] += 1
+                    self.predecessors[y][x] += 1
+
+    def add_component(self, root: str, members: list[str]) -> None:
+        self.members[root] = members
+        self.successors[root] = Counter()
+        self.predecessors[root] = Counter()
+        self.order[root] = self.next_order
+        self.next_order += 1
+
+    def add_vertex(self, name: str) -> None:
+        if name not in self.component:
+            self.component[name] = name
+            self.add_component(name, [name])
+
+    def add_edge(self, u: str, v: str) -> None:
+        self.add_vertex(u)
+        self.add_vertex(v)
+        x = self.component[u]
+        y = self.component[v]
+        if x == y:
+            return
+        self.successors[x][y] += 1
+        self.predecessors[y][x] += 1
+        lower = self.order[y]
+        upper = self.order[x]
+        if upper < lower:
+            return
+
+        forward = self.search(y, self.successors, lambda c: self.order[c] <= upper)
+        backward = self.search(x, self.predecessors, lambda c: self.order[c] >= lower)
+        slots = sorted(self.order[c] for c in forward | backward)
+        cycle = forward & backward
+        before = sorted(backward - cycle, key=self.order.__getitem__)
+        after = sorted(forward - cycle, key=self.order.__getitem__)
+        if cycle:
+            before.append(self.merge(cycle))
+        # Components reaching x move down and those reachable from y move up;
+        # slots freed by merging stay unused in between.
+        for c, slot in zip(before, slots):
+            self.order[c] = slot
+        for c, slot in zip(after, slots[len(slots) - len(after) :]):
+            self.order[c] = slot
+
+    def search(
+        self,
+        start: str,
+        edges: dict[str, Counter[str]],
+        inside: Callable[[str], bool],
+    ) -> set[str]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for c in edges[stack.pop()]:
+                if c not in seen and inside(c):
+                    seen.add(c)
+                    stack.append(c)
+        return seen
+
+    def merge(self, cycle: set[str]) -> str:
+        root = max(cycle, key=lambda c: len(self.members[c]))
+        successors: Counter[str] = Counter()
+        predecessors: Counter[str] = Counter()
+        for c in cycle:
+            for d, count in self.successors.pop(c).items():
+                if d not in cycle:
+                    del self.predecessors[d][c]
+                    successors[d] += count
+            for d, count in self.predecessors.pop(c).items():
+                if d not in cycle:
+                    del self.successors[d][c]
+                    predecessors[d] += count
+            if c != root:
+                for name in self.members[c]:
+                    self.component[name] = root
+                self.members[root].extend(self.members.pop(c))
+                del self.order[c]
+        self.successors[root] = successors
+        self.predecessors[root] = predecessors
+        for d, count in successors.items():
+            self.predecessors[d][root] = count
+        for d, count in predecessors.items():
+            self.successors[d][root] = count
+        return root
+
+    def same_component(self, u: str, v: str) -> bool:
+        return self.component[u] == self.component[v]
+
+    def components(self) -> list[list[str]]:
+        """The components, sources of the condensation first."""
+        return [
+            self.members[c] for c in sorted(self.members, key=self.order.__getitem__)
+        ]
+
+
+class ReachabilityIndex:
+    """Answers "can u reach v?" from labels on the SCC condensation.
+
+    The strongly connected components (Tarjan) are numbered in topological
+    order and collapsed into a DAG. Small DAGs store the transitive closure
+    as one bitset row per component, so a query is a single lookup. Larger
+    ones store ``labels`` GRAIL interval labels from randomized post-order
+    traversals: a query outside some interval is a "no", a target inside a
+    traversal's spanning subtree is a "yes", and the few left are settled
+    by a DFS pruned with the same intervals.
+    """
+
+    def __init__(
+        self,
+        graph: Graph | CSRGraph,
+        method: str = "auto",
+        bitset_limit: int = 20_000,
+        labels: int = 3,
+        seed: int = 0,
+    ) -> None:
+        start = timer.perf_counter()
+        self.csr = graph.to_csr() if isinstance(graph, Graph) else graph
+        csr = self.csr
+        components = csr_tarjan_components(csr)
+        size = len(components)
+        self.component = np.empty(len(csr), dtype=np.int64)
+        self.component[np.concatenate(components or [[]]).astype(np.int64)] = np.repeat(
+            np.arange(size), [len(members) for members in components]
+        )
+
+        sources = self.component[np.repeat(np.arange(len(csr)), np.diff(csr.offsets))]
+        targets = self.component[csr.targets]
+        external = sources != targets
+        edges = np.unique(sources[external] * size + targets[external])
+        self.dag = CSRGraph.from_edges(
+            f"{csr.name} condensation",
+            np.arange(size).astype(str),
+            edges // size,
+            edges % size,
+            np.arange(size),
+        )
+
+        if method == "auto":
+            method = "bitset" if size <= bitset_limit else "interval"
+        self.method = method
+        if method == "bitset":
+            self.closure = np.zeros((size, (size + 63) // 64), dtype=np.uint64)
+            one = np.uint64(1)
+            for c in range(size - 1, -1, -1):
+                successors = self.dag.adjacents(c)
+                if successors.size:
+                    np.bitwise_or.reduce(
+                        self.closure[successors], axis=0, out=self.closure[c]
+                    )
+                self.closure[c, c >> 6] |= one << np.uint64(c & 63)
+            self.nbytes = self.closure.nbytes + self.component.nbytes
+        else:
+            rng = random.Random(seed)
+            offsets = self.dag.offsets.tolist()
+            successors = self.dag.targets.tolist()
+            self.successors = [
+                successors[offsets[c] : offsets[c + 1]] for c in range(size)
+            ]
+            self.rows: list[tuple[list[int], list[int], list[int]]] | None = None
+            self.low = np.empty((labels, size), dtype=np.int64)
+            self.first = np.empty((labels, size), dtype=np.int64)
+            self.post = np.empty((labels, size), dtype=np.int64)
+            for label in range(labels):
+                self.low[label], self.first[label], self.post[label] = (
+                    self.interval_labels(rng)
+                )
+            self.nbytes = (
+                self.low.nbytes
+                + self.first.nbytes
+                + self.post.nbytes
+                + self.component.nbytes
+                + self.dag.offsets.nbytes
+                + self.dag.targets.nbytes
+            )
+        self.build_seconds = timer.perf_counter() - start
+
+    def interval_labels(
+        self, rng: random.Random
+    ) -> tuple[list[int], list[int], list[int]]:
+        """One randomized post-order traversal of the condensation.
+
+        Every component c reachable from u has ``low[u] <= post[c] <=
+        post[u]``, and the spanning-tree descendants of u are exactly the
+        components with ``first[u] <= post[c] <= post[u]``.
+        """
+        size = len(self.successors)
+        low = [0] * size
+        first = [0] * size
+        post = [0] * size
+        seen = [False] * size
+        roots = list(range(size))
+        rng.shuffle(roots)
+        time = 0
+        for root in roots:
+            if seen[root]:
+                continue
+            seen[root] = True
+            first[root] = low[root] = time + 1
+            adjacents = self.successors[root][:]
+            rng.shuffle(adjacents)
+            stack = [(root, iter(adjacents))]
+            while stack:
+                top, successors = stack[-1]
+                for v in successors:
+                    if not seen[v]:
+                        seen[v] = True
+                        first[v] = low[v] = time + 1
+                        adjacents = self.successors[v][:]
+                        rng.shuffle(adjacents)
+                        stack.append((v, iter(adjacents)))
+                        break
+                    if low[v] < low[top]:
+                        low[top] = low[v]
+                else:
+                    stack.pop()
+                    time += 1
+                    post[top] = time
+                    if stack:
+                        parent = stack[-1][0]
+                        if low[top] < low[parent]:
+                            low[parent] = low[top]
+        return low, first, post
+
+    def component_ids(self, vertices: Iterable) -> np.ndarray:
+        vertices = np.asarray(vertices)
+        if vertices.dtype.kind not in "iu":
+            vertices = np.array(
+                [self.csr.vertex_id(name) for name in vertices.tolist()],
+                dtype=np.int64,
+            )
+        return self.component[vertices]
+
+    def reaches(self, u: str, v: str) -> bool:
+        return bool(self.reaches_batch([(u, v)])[0])
+
+    def reaches_batch(
+        self, pairs: Iterable, targets: Iterable | None = None
+    ) -> np.ndarray:
+        """Vectorized queries over an (n, 2) array of (u, v) pairs.
+
+        Pairs hold names or CSR ids. ``reaches_batch(sources, targets)``
+        also accepts the two columns as parallel arrays.
+        """
+        if targets is None:
+            pairs = np.asarray(pairs)
+            if pairs.ndim != 2 or pairs.shape[1] != 2:
+                pairs = pairs.reshape(-1, 2)
+            sources, targets = pairs[:, 0], pairs[:, 1]
+        else:
+            sources = pairs
+        cu = self.component_ids(sources)
+        cv = self.component_ids(targets)
+        if self.method == "bitset":
+            words = self.closure[cu, cv >> 6]
+            return ((words >> (cv & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+        low = self.low[:, cv]
+        post = self.post[:, cv]
+        # Components later in topological order never reach earlier ones.
+        maybe = (cu <= cv) & np.all(
+            (self.low[:, cu] <= low) & (post <= self.post[:, cu]), axis=0
+        )
+        result = maybe & np.any(
+            (self.first[:, cu] <= post) & (post <= self.post[:, cu]), axis=0
+        )
+        for i in np.flatnonzero(maybe & ~result).tolist():
+            result[i] = self.search(int(cu[i]), int(cv[i]))
+        return result
+
+    def search(self, source: int, target: int) -> bool:
+        """DFS from source that skips components whose labels exclude target."""
+        if self.rows is None:
+            self.rows = list(
+                zip(self.low.T.tolist(), self.first.T.tolist(), self.post.T.tolist())
+            )
+        target_low, _, target_post = self.rows[target]
+        seen = {source}
+        stack = [source]
+        while stack:
+            for c in self.successors[stack.pop()]:
+                if c in seen or c > target:
+                    continue
+                seen.add(c)
+                low, first, post = self.rows[c]
+                if c == target or any(
+                    f <= p <= q for f, p, q in zip(first, target_post, post)
+                ):
+                    return True
+                if all(
+                    lo <= t_lo and t_post <= q
+                    for lo, t_lo, t_post, q in zip(low, target_low, target_post, post)
+                ):
+                    stack.append(c)
+        return False
+
+
+class IndexedHeap:
+    """d-ary min-heap of vertex ids with decrease-key.
+
+    ``position`` maps each id to its slot, so a vertex appears at most once
+    and decrease-key moves it in place instead of leaving stale entries.
+    """
+
+    def __init__(self, capacity: int, arity: int = 4) -> None:
+        self.arity = arity
+        self.heap: list[int] = []
+        self.key: list[float] = [np.inf] * capacity
+        self.position: list[int] = [NIL] * capacity
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, v: int) -> bool:
+        return self.position[v] != NIL
+
+    def push(self, v: int, key: float) -> None:
+        """Insert v, or lower its key if it is already queued."""
+        if self.position[v] == NIL:
+            self.position[v] = len(self.heap)
+            self.heap.append(v)
+        elif key >= self.key[v]:
+            return
+        self.key[v] = key
+        self.sift_up(self.position[v])
+
+    def pop_min(self) -> int:
+        top = self.heap[0]
+        last = self.heap.pop()
+        self.position[top] = NIL
+        if self.heap:
+            self.heap[0] = last
+            self.position[last] = 0
+            self.sift_down(0)
+        return top
+
+    def sift_up(self, i: int) -> None:
+        heap, key, position = self.heap, self.key, self.position
+        v = heap[i]
+        while i > 0:
+            parent = (i - 1) // self.arity
+            if key[heap[parent]] <= key[v]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i]] = i
+            i = parent
+        heap[i] = v
+        position[v] = i
+
+    def sift_down(self, i: int) -> None:
+        heap, key, position = self.heap, self.key, self.position
+        size = len(heap)
+        while True:
+            smallest = i
+            first = self.arity * i + 1
+            for child in range(first, min(first + self.arity, size)):
+                if key[heap[child]] < key[heap[smallest]]:
+                    smallest = child
+            if smallest == i:
+                return
+            heap[i], heap[smallest] = heap[smallest], heap[i]
+            position[heap[i]] = i
+            position[heap[smallest]] = smallest
+            i = smallest
+
+
+def index_dtype(n: int) -> type:
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+
+def memoized_traversal(function: Callable) -> Callable:
+    """Memoize a traversal per (graph version, function, arguments).
+
+    Results live in the graph's ResultCache and every caller gets its own
+    copy. When the traversal changed the vertex times and parents, a
+    snapshot is kept too: a hit right after the same call only copies the
+    result, and after a different traversal the snapshot is restored in
+    O(V) instead of traversing again. Traversals "by finish time" depend on
+    the times left by the previous traversal, which the key does not
+    capture, so they are never memoized.
+    """
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def memoized(graph, *args, **kwargs):
+        bound = signature.bind(graph, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = list(bound.arguments.values())[1:]
+        if "by finish time" in arguments:
+            return function(graph, *args, **kwargs)
+        key = (graph.version, function.__name__, *arguments)
+        entry = graph.results.get(key)
+        if entry is not None:
+            result, snapshot = entry
+            if snapshot is not None and graph.state_key != key:
+                graph.restore_state(snapshot)
+                graph.state_key = key
+            return copy_result(result)
+        # Nested memoized calls that leave their state behind set state_key.
+        state_key = graph.state_key
+        graph.state_key = None
+        epoch = graph.epoch
+        result = function(graph, *args, **kwargs)
+        snapshot = None
+        if graph.epoch != epoch or graph.state_key is not None:
+            snapshot = graph.snapshot_state()
+            graph.state_key = key
+        else:
+            graph.state_key = state_key
+        graph.results.put(key, (copy_result(result), snapshot))
+        return result
+
+    return memoized
+
+
+def copy_result(result: object) -> object:
+    """Copy the lists and dicts of a traversal result, down to the names."""
+    if isinstance(result, list):
+        return [copy_result(item) for item in result]
+    if isinstance(result, dict):
+        return {key: copy_result(value) for key, value in result.items()}
+    if isinstance(result, type({}.values())):
+        return {i: copy_result(value) for i, value in enumerate(result)}.values()
+    return result
+
+
+@memoized_traversal
+def dfs(graph: Graph | CSRGraph, sort: str = "alphabetically") -> None:
+    if isinstance(graph, CSRGraph):
+        csr_dfs(graph, sort)
+        return
+    epoch = graph.new_epoch()
     time = 0
+    finished: list[str] = []
 
     for u in graph.vertices(sort):
-        if u.color == "white":
-            time = dfs_visit(graph, u, time)
+        if u.discovered_in != epoch:
+            time = depth_first_visit(graph, u, time, finished=finished)
+    graph.set_finish_order(finished)
 
 
 def dfs_visit(graph: Graph, u: Vertex, time: int) -> int:
-    time += 1
-    u.discovery_time = time
-    u.color = "gray"
-    for v in graph.adjacents(u):
-        if v.color == "white":
-            v.parent = u.name
-            time = dfs_visit(graph, v, time)
-    time += 1
-    u.finish_time = time
-    u.color = "black"
-    return time
+    return depth_first_visit(graph, u, time)
 
 
-def dfs_forest(graph: Graph, sort: str = "alphabetically") -> dict[str, list[str]]:
-    for u in graph.vertices():
-        u.color = "white"
-        u.parent = "nil"
+@memoized_traversal
+def dfs_forest(
+    graph: Graph | CSRGraph, sort: str = "alphabetically"
+) -> dict[str, list[str]]:
+    if isinstance(graph, CSRGraph):
+        return csr_dfs_forest(graph, sort)
+    epoch = graph.new_epoch()
     time = 0
     roots: dict[str, list[str]] = {}
+    finished: list[str] = []
 
     for u in graph.vertices(sort):
-        if u.color == "white":
-            time, forest = dfs_forest_visit(graph, u, time)
+        if u.discovered_in != epoch:
+            forest: list[str] = []
+            time = depth_first_visit(
+                graph, u, time, discovered=forest, finished=finished
+            )
             roots[u.name] = [u.name, *forest]
+    graph.set_finish_order(finished)
     return roots
 
 
 def dfs_forest_visit(graph: Graph, u: Vertex, time: int) -> tuple[int, list[str]]:
-    time += 1
-    u.discovery_time = time
-    u.color = "gray"
-    forest = []
-    for v in graph.adjacents(u):
-        if v.color == "white":
-            v.parent = u.name
-            forest.append(v.name)
-            time, deep_forest = dfs_forest_visit(graph, v, time)
-            forest.extend(deep_forest)
-    time += 1
-    u.finish_time = time
-    u.color = "black"
+    forest: list[str] = []
+    time = depth_first_visit(graph, u, time, discovered=forest)
     return time, forest
 
 
-def strongly_connected_components(graph: Graph) -> list[list[str]]:
+@memoized_traversal
+def strongly_connected_components(
+    graph: Graph | CSRGraph, method: str = "kosaraju"
+) -> list[list[str]]:
+    """Return the strongly connected components of graph.
+
+    ``method="kosaraju"`` runs DFS on the graph and on its transpose.
+    ``method="tarjan"`` returns the same lists with a single DFS and no
+    transpose.
+    ``method="incremental"`` reads them from the graph's IncrementalSCC,
+    in some topological order of the condensation.
+    """
+    if method == "incremental":
+        if isinstance(graph, CSRGraph):
+            raise ValueError("CSRGraph is immutable and has no incremental SCCs")
+        return graph.track_strongly_connected_components().components()
+    if method == "tarjan":
+        if isinstance(graph, CSRGraph):
+            return csr_tarjan_scc(graph)
+        return tarjan_scc(graph)
+    if isinstance(graph, CSRGraph):
+        dfs(graph)
+        return dfs_forest(graph.transpose(), "by finish time").values()
     dfs(graph)
     print(graph, end="\n\n")
     graph_transpose = graph.transpose()
@@ -148,16 +1423,249 @@ def strongly_connected_components(graph: Graph) -> list[list[str]]:
     return forest.values()
 
 
-def topological_sort(graph: Graph) -> list[str]:
-    for u in graph.vertices():
-        u.color = "white"
-        u.parent = "nil"
+def tarjan_scc(graph: Graph) -> list[list[str]]:
+    """Tarjan's single-pass SCC on the same DFS that ``dfs`` performs.
+
+    Leaves the vertices with the times and parents of ``dfs(graph)``.
+    Components are found sinks first, so they are reversed at the end to
+    match the Kosaraju order (decreasing root finish time), and their
+    members are put in Kosaraju's order by ``kosaraju_member_order``.
+    """
+    epoch = graph.new_epoch()
     time = 0
-    topological_sorted_list = []
+    lowlink: dict[str, float] = {}
+    stack: list[Vertex] = []
+    stack_position: dict[str, int] = {}
+    components: list[list[str]] = []
+    finished: list[str] = []
+
+    for root in graph.vertices("alphabetically"):
+        if root.discovered_in == epoch:
+            continue
+        time += 1
+        root.discovery_time = time
+        root.discovered_in = epoch
+        lowlink[root.name] = time
+        stack_position[root.name] = len(stack)
+        stack.append(root)
+        calls = [(root, iter(graph.adjacents(root)))]
+        while calls:
+            top, adjacents = calls[-1]
+            for v in adjacents:
+                if v.discovered_in != epoch:
+                    v.parent_name = top.name
+                    v.parent_in = epoch
+                    time += 1
+                    v.discovery_time = time
+                    v.discovered_in = epoch
+                    lowlink[v.name] = time
+                    stack_position[v.name] = len(stack)
+                    stack.append(v)
+                    calls.append((v, iter(graph.adjacents(v))))
+                    break
+                if v.name in stack_position and v.discovery_time < lowlink[top.name]:
+                    lowlink[top.name] = v.discovery_time
+            else:
+                calls.pop()
+                time += 1
+                top.finish_time = time
+                top.finished_in = epoch
+                finished.append(top.name)
+                if lowlink[top.name] == top.discovery_time:
+                    position = stack_position[top.name]
+                    component = [v.name for v in stack[position:]]
+                    for name in component:
+                        del stack_position[name]
+                    del stack[position:]
+                    components.append(
+                        kosaraju_member_order(
+                            component, lambda u: graph[u].adjacents, lambda u: u
+                        )
+                    )
+                if calls:
+                    caller = calls[-1][0].name
+                    if lowlink[top.name] < lowlink[caller]:
+                        lowlink[caller] = lowlink[top.name]
+    graph.set_finish_order(finished)
+    components.reverse()
+    return components
+
+
+def csr_tarjan_scc(graph: CSRGraph) -> list[list[str]]:
+    return [
+        [graph.names[v] for v in component]
+        for component in csr_tarjan_components(graph)
+    ]
+
+
+def csr_tarjan_components(graph: CSRGraph) -> list[list[int]]:
+    """Tarjan's SCC over vertex ids, components in Kosaraju order."""
+    epoch = graph.new_epoch()
+    rank = np.empty(len(graph), dtype=np.int64)
+    rank[graph.alphabetical] = np.arange(len(graph))
+    offsets = graph.offsets
+    targets = graph.targets
+    discovered_in = graph.discovered_in
+    finished_in = graph.finished_in
+    parents = graph.parents
+    discovery_time = graph.discovery_time
+    finish_time = graph.finish_time
+    lowlink = np.zeros(len(graph), dtype=np.int64)
+    stack_position = np.full(len(graph), NIL, dtype=np.int64)
+    stack: list[int] = []
+    components: list[list[int]] = []
+    time = 0
+
+    for root in graph.vertices("alphabetically").tolist():
+        if discovered_in[root] == epoch:
+            continue
+        time += 1
+        discovery_time[root] = lowlink[root] = time
+        discovered_in[root] = epoch
+        parents[root] = NIL
+        stack_position[root] = len(stack)
+        stack.append(root)
+        calls = [root]
+        positions = [int(offsets[root])]
+        while calls:
+            top = calls[-1]
+            position = positions[-1]
+            end = offsets[top + 1]
+            while position < end:
+                v = int(targets[position])
+                if discovered_in[v] != epoch:
+                    break
+                if stack_position[v] != NIL and discovery_time[v] < lowlink[top]:
+                    lowlink[top] = discovery_time[v]
+                position += 1
+            if position < end:
+                positions[-1] = position + 1
+                parents[v] = top
+                time += 1
+                discovery_time[v] = lowlink[v] = time
+                discovered_in[v] = epoch
+                stack_position[v] = len(stack)
+                stack.append(v)
+                calls.append(v)
+                positions.append(int(offsets[v]))
+            else:
+                calls.pop()
+                positions.pop()
+                time += 1
+                finish_time[top] = time
+                finished_in[top] = epoch
+                if lowlink[top] == discovery_time[top]:
+                    position = int(stack_position[top])
+                    component = stack[position:]
+                    stack_position[component] = NIL
+                    del stack[position:]
+                    components.append(
+                        kosaraju_member_order(
+                            component, lambda u: graph.adjacents(u).tolist(), rank.item
+                        )
+                    )
+                if calls and lowlink[top] < lowlink[calls[-1]]:
+                    lowlink[calls[-1]] = lowlink[top]
+    components.reverse()
+    return components
+
+
+def kosaraju_member_order(
+    component: list[Hashable],
+    adjacents: Callable[[Hashable], Iterable[Hashable]],
+    rank: Callable[[Hashable], object],
+) -> list[Hashable]:
+    """Order a Tarjan component as the Kosaraju forest lists it.
+
+    Kosaraju lists a component in the discovery order of a DFS of the
+    transpose from its root, which is the first vertex Tarjan discovered
+    in it, visiting adjacents by ``rank``. Only the component's own edges
+    are reversed, so all the components together cost O(V + E).
+    """
+    if len(component) <= 2:
+        return component
+    members = set(component)
+    incoming: dict[Hashable, list[Hashable]] = {u: [] for u in component}
+    for u in component:
+        for v in adjacents(u):
+            if v in members:
+                incoming[v].append(u)
+    root = component[0]
+    order = [root]
+    visited = {root}
+    calls = [iter(sorted(incoming[root], key=rank))]
+    while calls:
+        for v in calls[-1]:
+            if v not in visited:
+                visited.add(v)
+                order.append(v)
+                calls.append(iter(sorted(incoming[v], key=rank)))
+                break
+        else:
+            calls.pop()
+    return order
+
+
+def benchmark_strongly_connected_components(
+    graph: Graph | CSRGraph, repeat: int = 3
+) -> dict[str, tuple[float, int]]:
+    """Best runtime in seconds and peak traced bytes of each SCC method.
+
+    The graph's result cache is cleared before every run so that each one
+    traverses the graph instead of hitting the memo.
+    """
+    results = {}
+    for method in ("kosaraju", "tarjan"):
+        best = np.inf
+        for _ in range(repeat):
+            graph.results.clear()
+            start = timer.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                strongly_connected_components(graph, method)
+            best = min(best, timer.perf_counter() - start)
+        graph.results.clear()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            strongly_connected_components(graph, method)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[method] = (best, peak)
+    return results
+
+
+@memoized_traversal
+def topological_sort(graph: Graph | CSRGraph, method: str = "dfs") -> list[str]:
+    if method == "kahn":
+        return list(topological_sort_stream(graph))
+    if method == "incremental":
+        if isinstance(graph, CSRGraph):
+            raise ValueError("CSRGraph is immutable and has no incremental SCCs")
+        incremental = graph.track_strongly_connected_components()
+        components = incremental.components()
+        for members in components:
+            if len(members) > 1:
+                raise CycleError(
+                    find_cycle(
+                        members[:1],
+                        lambda u: [
+                            v
+                            for v in graph[u].adjacents
+                            if incremental.same_component(u, v)
+                        ],
+                    )
+                )
+        return [members[0] for members in components]
+    if isinstance(graph, CSRGraph):
+        return csr_topological_sort(graph)
+    epoch = graph.new_epoch()
+    time = 0
+    finished: list[str] = []
     for u in graph.vertices("alphabetically"):
-        if u.color == "white":
-            time = topological_sort_visit(graph, u, time, topological_sorted_list)
-    return topological_sorted_list
+        if u.discovered_in != epoch:
+            time = depth_first_visit(graph, u, time, finished=finished)
+    graph.set_finish_order(finished)
+    finished.reverse()
+    return finished
 
 
 def topological_sort_visit(
@@ -166,17 +1674,552 @@ def topological_sort_visit(
     time: int,
     linked_list: list,
 ) -> int:
+    finished: list[str] = []
+    time = depth_first_visit(graph, u, time, finished=finished)
+    linked_list[0:0] = reversed(finished)
+    return time
+
+
+def depth_first_visit(
+    graph: Graph,
+    u: Vertex,
+    time: int,
+    discovered: list[str] | None = None,
+    finished: list[str] | None = None,
+) -> int:
+    """Visit every vertex reachable from u with an explicit stack.
+
+    Produces the same times and parents as the recursive CLRS DFS-VISIT
+    without one Python frame per tree edge. Tree vertices are appended to
+    ``discovered`` in discovery order (u itself excluded) and to ``finished``
+    in finish order, when given.
+    """
+    graph.vertex_orders.pop("by finish time", None)
+    epoch = graph.clock[0]
     time += 1
     u.discovery_time = time
-    u.color = "gray"
-    for v in graph.adjacents(u):
-        if v.color == "white":
-            v.parent = u.name
-            time = topological_sort_visit(graph, v, time, linked_list)
+    u.discovered_in = epoch
+    stack = [(u, iter(graph.adjacents(u)))]
+    while stack:
+        top, adjacents = stack[-1]
+        for v in adjacents:
+            if v.discovered_in != epoch:
+                v.parent_name = top.name
+                v.parent_in = epoch
+                time += 1
+                v.discovery_time = time
+                v.discovered_in = epoch
+                if discovered is not None:
+                    discovered.append(v.name)
+                stack.append((v, iter(graph.adjacents(v))))
+                break
+        else:
+            stack.pop()
+            time += 1
+            top.finish_time = time
+            top.finished_in = epoch
+            if finished is not None:
+                finished.append(top.name)
+    return time
+
+
+def topological_sort_stream(graph: Graph | CSRGraph) -> Iterator[str]:
+    """Yield the vertices in topological order as they become ready.
+
+    Kahn's algorithm: a vertex is yielded once all of its predecessors have
+    been, so consumers can start on it before the rest of the order exists.
+    Ties are broken alphabetically and the whole stream costs O(V + E).
+    Raises CycleError after the acyclic part has been yielded if the graph
+    is not a DAG.
+    """
+    for name, _ in kahn(graph):
+        yield name
+
+
+def topological_levels(graph: Graph | CSRGraph) -> list[list[str]]:
+    """Group the vertices into wavefronts that can run in parallel.
+
+    Level 0 holds the vertices without predecessors and level i + 1 the
+    vertices whose last predecessor is in level i. Raises CycleError if the
+    graph is not a DAG.
+    """
+    levels: list[list[str]] = []
+    for name, level in kahn(graph):
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(name)
+    return levels
+
+
+def kahn(graph: Graph | CSRGraph) -> Iterator[tuple[str, int]]:
+    if isinstance(graph, CSRGraph):
+        keys: Iterable[Hashable] = graph.alphabetical.tolist()
+        indegree = dict(
+            enumerate(np.bincount(graph.targets, minlength=len(graph)).tolist())
+        )
+
+        def name_of(u: int) -> str:
+            return graph.names[u]
+
+        def adjacents(u: int) -> list[int]:
+            return graph.adjacents(u).tolist()
+
+    else:
+        keys = [u.name for u in graph.vertices("alphabetically")]
+        indegree = dict.fromkeys(keys, 0)
+        for u in graph.vertices():
+            for adjacent in u.adjacents:
+                indegree[adjacent] += 1
+
+        def name_of(u: str) -> str:
+            return u
+
+        def adjacents(u: str) -> list[str]:
+            return [v.name for v in graph.adjacents(graph[u])]
+
+    level = dict.fromkeys((u for u in keys if indegree[u] == 0), 0)
+    ready = deque(level)
+    while ready:
+        u = ready.popleft()
+        yield name_of(u), level[u]
+        for v in adjacents(u):
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                level[v] = level[u] + 1
+                ready.append(v)
+
+    if len(level) < len(indegree):
+        remaining = [u for u in keys if indegree[u] > 0]
+        raise CycleError([name_of(u) for u in find_cycle(remaining, adjacents)])
+
+
+def find_cycle(
+    keys: list[Hashable],
+    adjacents: Callable[[Hashable], list[Hashable]],
+) -> list[Hashable]:
+    """Return the vertices of one cycle reachable from keys, in edge order."""
+    color: dict[Hashable, int] = {}
+    for root in keys:
+        if root in color:
+            continue
+        color[root] = GRAY
+        stack = [(root, iter(adjacents(root)))]
+        while stack:
+            top, successors = stack[-1]
+            for v in successors:
+                if color.get(v) == GRAY:
+                    path = [u for u, _ in stack]
+                    return path[path.index(v) :]
+                if v not in color:
+                    color[v] = GRAY
+                    stack.append((v, iter(adjacents(v))))
+                    break
+            else:
+                color[top] = BLACK
+                stack.pop()
+    return []
+
+
+def bfs(
+    graph: Graph | CSRGraph,
+    sources: str | Iterable[str],
+    targets: Iterable[str] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Level-synchronous breadth-first search from one or more sources.
+
+    Each level gathers the adjacency of the whole frontier with NumPy
+    instead of looping over vertices. Returns ``(distance, parent)`` arrays
+    indexed by CSR vertex id (see ``Graph.to_csr``), with -1 distances and
+    NIL parents for unreached vertices. With ``targets`` the search stops
+    after the first level that reaches any of them.
+    """
+    if isinstance(graph, Graph):
+        graph = graph.to_csr()
+    if isinstance(sources, str):
+        sources = [sources]
+    frontier = np.unique(
+        np.array(
+            [graph.vertex_id(name) for name in sources], dtype=index_dtype(len(graph))
+        )
+    )
+    is_target = None
+    if targets is not None:
+        is_target = np.zeros(len(graph), dtype=bool)
+        is_target[[graph.vertex_id(name) for name in targets]] = True
+
+    distance = np.full(len(graph), -1, dtype=np.int64)
+    parent = np.full(len(graph), NIL, dtype=np.int64)
+    distance[frontier] = 0
+    level = 0
+    while frontier.size:
+        if is_target is not None and is_target[frontier].any():
+            break
+        starts = graph.offsets[frontier]
+        counts = graph.offsets[frontier + 1] - starts
+        # Edge positions of every frontier vertex, concatenated.
+        edges = np.arange(counts.sum()) + np.repeat(
+            starts - (np.cumsum(counts) - counts), counts
+        )
+        adjacents = graph.targets[edges]
+        owners = np.repeat(frontier, counts)
+        unseen = distance[adjacents] == -1
+        frontier, first = np.unique(adjacents[unseen], return_index=True)
+        level += 1
+        distance[frontier] = level
+        parent[frontier] = owners[unseen][first]
+    return distance, parent
+
+
+def shortest_path(graph: Graph | CSRGraph, source: str, target: str) -> list[str]:
+    """Fewest-edges path from source to target, or [] if unreachable."""
+    csr = graph.to_csr() if isinstance(graph, Graph) else graph
+    _, parent = bfs(csr, source, [target])
+    return path_to(csr, parent, source, target)
+
+
+def dijkstra(
+    graph: Graph | CSRGraph, source: str, arity: int = 4
+) -> tuple[np.ndarray, np.ndarray]:
+    """Single-source shortest paths for non-negative edge weights.
+
+    Returns ``(distance, parent)`` arrays indexed by CSR vertex id, with inf
+    distances and NIL parents for unreachable vertices.
+    """
+    return best_first_search(graph, source, None, None, arity)
+
+
+def a_star(
+    graph: Graph | CSRGraph,
+    source: str,
+    target: str,
+    heuristic: Callable[[int], float] | np.ndarray,
+    arity: int = 4,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Dijkstra guided by a consistent heuristic, stopping at target.
+
+    ``heuristic`` gives a lower bound of the distance from a CSR vertex id
+    to target, either as a function or as an array. ``distance`` is exact
+    for every settled vertex, which includes target when it is reachable.
+    """
+    return best_first_search(graph, source, target, heuristic, arity)
+
+
+def best_first_search(
+    graph: Graph | CSRGraph,
+    source: str,
+    target: str | None,
+    heuristic: Callable[[int], float] | np.ndarray | None,
+    arity: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    csr = graph.to_csr() if isinstance(graph, Graph) else graph
+    weights = csr.weights
+    if weights is not None and weights.size and weights.min() < 0:
+        raise ValueError("edge weights must be non-negative")
+    if isinstance(heuristic, np.ndarray):
+        heuristic = heuristic.__getitem__
+    offsets = csr.offsets
+    targets = csr.targets
+
+    distance = [np.inf] * len(csr)
+    parent = [NIL] * len(csr)
+    settled = bytearray(len(csr))
+    queue = IndexedHeap(len(csr), arity)
+    goal = NIL if target is None else csr.vertex_id(target)
+    u = csr.vertex_id(source)
+    distance[u] = 0.0
+    queue.push(u, heuristic(u) if heuristic is not None else 0.0)
+    while queue:
+        u = queue.pop_min()
+        settled[u] = True
+        if u == goal:
+            break
+        start, end = offsets[u], offsets[u + 1]
+        if weights is None:
+            lengths = [1.0] * int(end - start)
+        else:
+            lengths = weights[start:end].tolist()
+        base = distance[u]
+        for v, length in zip(targets[start:end].tolist(), lengths):
+            candidate = base + length
+            if not settled[v] and candidate < distance[v]:
+                distance[v] = candidate
+                parent[v] = u
+                if heuristic is not None:
+                    candidate += heuristic(v)
+                queue.push(v, candidate)
+    return np.array(distance), np.array(parent, dtype=np.int64)
+
+
+def prim(graph: Graph | CSRGraph, arity: int = 4) -> tuple[np.ndarray, np.ndarray]:
+    """Minimum spanning forest, treating every edge as undirected.
+
+    Trees are grown from the alphabetically first vertex not yet spanned.
+    Returns ``(weight, parent)`` arrays indexed by CSR vertex id: the weight
+    of the edge joining each vertex to its parent, 0 and NIL for roots.
+    """
+    csr = graph.to_csr() if isinstance(graph, Graph) else graph
+    n = len(csr)
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(csr.offsets))
+    weights = csr.weights if csr.weights is not None else np.ones(csr.targets.size)
+    undirected = CSRGraph.from_edges(
+        csr.name,
+        csr.names,
+        np.concatenate([sources, csr.targets]),
+        np.concatenate([csr.targets, sources]),
+        csr.alphabetical,
+        np.concatenate([weights, weights]),
+    )
+    offsets = undirected.offsets
+    targets = undirected.targets
+
+    key = [np.inf] * n
+    parent = [NIL] * n
+    spanned = bytearray(n)
+    queue = IndexedHeap(n, arity)
+    for root in csr.alphabetical.tolist():
+        if spanned[root]:
+            continue
+        key[root] = 0.0
+        queue.push(root, 0.0)
+        while queue:
+            u = queue.pop_min()
+            spanned[u] = True
+            start, end = offsets[u], offsets[u + 1]
+            for v, length in zip(
+                targets[start:end].tolist(), undirected.weights[start:end].tolist()
+            ):
+                if not spanned[v] and length < key[v]:
+                    key[v] = length
+                    parent[v] = u
+                    queue.push(v, length)
+    return np.array(key), np.array(parent, dtype=np.int64)
+
+
+def path_to(graph: CSRGraph, parent: np.ndarray, source: str, target: str) -> list[str]:
+    """Follow parent pointers back from target; [] if source is not reached."""
+    v = graph.vertex_id(target)
+    path = []
+    while v != NIL:
+        path.append(graph.names[v])
+        v = parent[v]
+    if path[-1] != source:
+        return []
+    path.reverse()
+    return path
+
+
+def parallel_traversals(
+    graph: Graph | CSRGraph,
+    queries: Sequence,
+    kind: str = "reachable",
+    processes: int | None = None,
+    chunksize: int = 16,
+) -> list:
+    """Run independent traversals of one graph across a process pool.
+
+    The CSR arrays are published once into shared memory and every worker
+    maps them without copying; only queries and results are pickled.
+    Results come back in query order. See ``run_traversal`` for the kinds.
+    """
+    csr = graph.to_csr() if isinstance(graph, Graph) else graph
+    if processes == 1:
+        return [run_traversal(csr, kind, query) for query in queries]
+    blocks, layout = publish_graph(csr)
+    try:
+        with multiprocessing.Pool(
+            processes, initializer=attach_graph, initargs=(layout,)
+        ) as pool:
+            return pool.starmap(
+                run_shared_traversal,
+                zip(itertools.repeat(kind), queries),
+                chunksize,
+            )
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def run_traversal(graph: CSRGraph, kind: str, query) -> object:
+    """One query of ``parallel_traversals``.
+
+    - ``"reachable"``: query is a source name; returns the sorted CSR ids of
+      every vertex it reaches.
+    - ``"distance"``: query is a ``(source, target)`` pair; returns the
+      number of edges on a shortest path, or -1.
+    - ``"topological_sort"``: query is a list of names; returns the Kahn
+      order of the subgraph they induce.
+    """
+    if kind == "reachable":
+        distance, _ = bfs(graph, query)
+        return np.flatnonzero(distance >= 0)
+    if kind == "distance":
+        source, target = query
+        distance, _ = bfs(graph, source, [target])
+        return int(distance[graph.vertex_id(target)])
+    if kind == "topological_sort":
+        ids = np.array(sorted(graph.vertex_id(name) for name in query), dtype=np.int64)
+        local = np.full(len(graph), NIL, dtype=np.int64)
+        local[ids] = np.arange(ids.size)
+        counts = graph.offsets[ids + 1] - graph.offsets[ids]
+        edges = np.arange(counts.sum()) + np.repeat(
+            graph.offsets[ids] - (np.cumsum(counts) - counts), counts
+        )
+        sources = np.repeat(np.arange(ids.size), counts)
+        targets = local[graph.targets[edges]]
+        inside = targets != NIL
+        subgraph = CSRGraph.from_edges(
+            graph.name,
+            [graph.names[u] for u in ids.tolist()],
+            sources[inside],
+            targets[inside],
+        )
+        return list(topological_sort_stream(subgraph))
+    raise ValueError(f"unknown traversal kind {kind!r}")
+
+
+def publish_graph(
+    graph: CSRGraph,
+) -> tuple[list[shared_memory.SharedMemory], dict]:
+    """Copy the CSR arrays into shared memory blocks.
+
+    Returns the blocks, which the caller must unlink, and the layout that
+    ``attach_graph`` needs to map them in another process.
+    """
+    names = graph.names
+    if not isinstance(names, NameTable):
+        names = NameTable.from_array(np.array(names, dtype=str))
+    arrays = {
+        "offsets": graph.offsets,
+        "targets": graph.targets,
+        "alphabetical": graph.alphabetical,
+        "name_offsets": names.offsets,
+        "name_data": names.data,
+    }
+    if graph.weights is not None:
+        arrays["weights"] = graph.weights
+    blocks = []
+    layout: dict = {"name": graph.name, "arrays": {}}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        layout["arrays"][key] = (block.name, array.dtype.str, array.shape)
+    return blocks, layout
+
+
+shared_graph: CSRGraph | None = None
+shared_blocks: list[shared_memory.SharedMemory] = []
+
+
+def attach_graph(layout: dict) -> None:
+    """Pool initializer: map the published arrays into a CSRGraph."""
+    global shared_graph
+    arrays = {}
+    for key, (block_name, dtype, shape) in layout["arrays"].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        shared_blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype, buffer=block.buf)
+    shared_graph = CSRGraph(
+        layout["name"],
+        NameTable(arrays["name_offsets"], arrays["name_data"]),
+        arrays["offsets"],
+        arrays["targets"],
+        arrays["alphabetical"],
+        arrays.get("weights"),
+    )
+
+
+def run_shared_traversal(kind: str, query) -> object:
+    return run_traversal(shared_graph, kind, query)
+
+
+def csr_dfs(graph: CSRGraph, sort: str = "alphabetically") -> None:
+    epoch = graph.new_epoch()
+    time = 0
+    for u in graph.vertices(sort):
+        if graph.discovered_in[u] != epoch:
+            time = csr_dfs_visit(graph, int(u), time)
+
+
+def csr_dfs_forest(
+    graph: CSRGraph, sort: str = "alphabetically"
+) -> dict[str, list[str]]:
+    epoch = graph.new_epoch()
+    time = 0
+    roots: dict[str, list[str]] = {}
+    names = graph.names
+    for u in graph.vertices(sort):
+        if graph.discovered_in[u] != epoch:
+            forest: list[int] = []
+            time = csr_dfs_visit(graph, int(u), time, discovered=forest)
+            roots[names[u]] = [names[u], *(names[v] for v in forest)]
+    return roots
+
+
+def csr_topological_sort(graph: CSRGraph) -> list[str]:
+    epoch = graph.new_epoch()
+    time = 0
+    finished: list[int] = []
+    for u in graph.vertices("alphabetically"):
+        if graph.discovered_in[u] != epoch:
+            time = csr_dfs_visit(graph, int(u), time, finished=finished)
+    return [graph.names[u] for u in reversed(finished)]
+
+
+def csr_dfs_visit(
+    graph: CSRGraph,
+    u: int,
+    time: int,
+    discovered: list[int] | None = None,
+    finished: list[int] | None = None,
+) -> int:
+    """Visit every vertex reachable from u with an explicit stack.
+
+    Tree vertices are appended to ``discovered`` in discovery order (u itself
+    excluded) and to ``finished`` in finish order, when given.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    epoch = graph.epoch
+    discovered_in = graph.discovered_in
+    finished_in = graph.finished_in
+    parents = graph.parents
+    discovery_time = graph.discovery_time
+    finish_time = graph.finish_time
+
     time += 1
-    u.finish_time = time
-    u.color = "black"
-    linked_list.insert(0, u.name)
+    discovery_time[u] = time
+    discovered_in[u] = epoch
+    parents[u] = NIL
+    stack = [u]
+    positions = [int(offsets[u])]
+    while stack:
+        top = stack[-1]
+        position = positions[-1]
+        end = offsets[top + 1]
+        while position < end and discovered_in[targets[position]] == epoch:
+            position += 1
+        if position < end:
+            v = int(targets[position])
+            positions[-1] = position + 1
+            parents[v] = top
+            time += 1
+            discovery_time[v] = time
+            discovered_in[v] = epoch
+            if discovered is not None:
+                discovered.append(v)
+            stack.append(v)
+            positions.append(int(offsets[v]))
+        else:
+            stack.pop()
+            positions.pop()
+            time += 1
+            finish_time[top] = time
+            finished_in[top] = epoch
+            if finished is not None:
+                finished.append(top)
     return time
 
 
@@ -194,6 +2237,9 @@ def main() -> None:
     sccs = strongly_connected_components(graph)
     for i, component in enumerate(sccs, 1):
         print(f"SCC {i}: {component}")
+    print("-Tarjan SCCs of graph-")
+    for i, component in enumerate(strongly_connected_components(graph, "tarjan"), 1):
+        print(f"SCC {i}: {component}")
 
     graph = Graph(name="Original")
     graph["a"] = Vertex(name="a", adjacents=["b", "c", "d", "e"])
@@ -207,6 +2253,8 @@ def main() -> None:
     print()
     print("-Topological sort of graph-")
     print(topological_sort(graph))
+    print("-Topological levels of graph-")
+    print(topological_levels(graph))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,621 @@
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from graph_algorithms import (
+    NIL,
+    CSRGraph,
+    CycleError,
+    Graph,
+    IndexedHeap,
+    ReachabilityIndex,
+    Vertex,
+    a_star,
+    benchmark_strongly_connected_components,
+    bfs,
+    csr_tarjan_scc,
+    dfs,
+    dfs_forest,
+    dijkstra,
+    parallel_traversals,
+    prim,
+    strongly_connected_components,
+    tarjan_scc,
+    topological_levels,
+    topological_sort,
+    topological_sort_stream,
+)
+
+
+def small_graph() -> Graph:
+    graph = Graph(name="small")
+    graph["b"] = Vertex(name="b", adjacents=["a"])
+    graph["a"] = Vertex(name="a", adjacents=["c"])
+    graph["c"] = Vertex(name="c", adjacents=[])
+    return graph
+
+
+def random_graph(n: int, edges: int, seed: int) -> Graph:
+    rng = random.Random(seed)
+    graph = Graph(name=f"random {seed}")
+    names = [f"v{i}" for i in range(n)]
+    for name in names:
+        graph[name] = Vertex(name=name, adjacents=[])
+    for _ in range(edges):
+        u, v = rng.choice(names), rng.choice(names)
+        if v not in graph[u].adjacents:
+            graph.add_edge(u, v, weight=rng.randint(1, 9))
+    return graph
+
+
+def random_dag(n: int, edges: int, seed: int) -> Graph:
+    rng = random.Random(seed)
+    graph = Graph(name=f"dag {seed}")
+    names = [f"v{i}" for i in range(n)]
+    rng.shuffle(names)
+    for name in names:
+        graph[name] = Vertex(name=name, adjacents=[])
+    for _ in range(edges):
+        i, j = sorted(rng.sample(range(n), 2))
+        if names[j] not in graph[names[i]].adjacents:
+            graph.add_edge(names[i], names[j])
+    return graph
+
+
+def reference_dfs(graph: Graph) -> dict[str, tuple]:
+    """The recursive DFS of the original module: (d, f, parent) per vertex."""
+    result: dict[str, list] = {}
+    time = 0
+
+    def visit(u: str, parent: str) -> None:
+        nonlocal time
+        time += 1
+        result[u] = [time, None, parent]
+        for v in sorted(graph[u].adjacents):
+            if v not in result:
+                visit(v, u)
+        time += 1
+        result[u][1] = time
+
+    for u in sorted(graph.graph):
+        if u not in result:
+            visit(u, "nil")
+    return {u: tuple(value) for u, value in result.items()}
+
+
+def assert_topological(graph: Graph, order: list[str]) -> None:
+    assert sorted(order) == sorted(graph.graph)
+    position = {name: i for i, name in enumerate(order)}
+    for u in graph.graph:
+        for v in graph[u].adjacents:
+            assert position[u] < position[v]
+
+
+def times(graph: Graph) -> list[tuple]:
+    return [
+        (vertex.name, vertex.discovery_time, vertex.finish_time, vertex.parent)
+        for vertex in graph.vertices("")
+    ]
+
+
+def test_memoized_dfs_restores_state_after_other_traversals():
+    graph = small_graph()
+    dfs(graph, "")
+    expected = times(graph)
+    assert expected == [("b", 1, 6, "nil"), ("a", 2, 5, "b"), ("c", 3, 4, "a")]
+    graph.track_strongly_connected_components()
+    dfs(graph, "")
+    assert times(graph) == expected
+    tarjan_scc(graph)
+    dfs(graph, "")
+    assert times(graph) == expected
+
+    csr = graph.to_csr()
+    dfs(csr)
+    expected = csr.snapshot_state()
+    csr_tarjan_scc(csr)
+    dfs(csr)
+    for restored, original in zip(csr.snapshot_state(), expected):
+        np.testing.assert_array_equal(restored, original)
+
+
+def test_scc_benchmark_measures_real_traversals():
+    graph = Graph(name="chain")
+    for i in range(300):
+        graph[f"v{i:03}"] = Vertex(name=f"v{i:03}", adjacents=[f"v{(i + 1) % 300:03}"])
+    strongly_connected_components(graph)
+    hits = graph.results.hits
+    benchmark_strongly_connected_components(graph, repeat=2)
+    assert graph.results.hits == hits
+
+
+def test_bfs_matches_queue_based_search():
+    for seed in range(10):
+        graph = random_graph(60, 120, seed)
+        csr = graph.to_csr()
+        sources = ["v0", "v7"]
+        distance, parent = bfs(graph, sources)
+        expected = {name: 0 for name in sources}
+        queue = deque(sources)
+        while queue:
+            u = queue.popleft()
+            for v in graph[u].adjacents:
+                if v not in expected:
+                    expected[v] = expected[u] + 1
+                    queue.append(v)
+        for name in graph.graph:
+            u = csr.vertex_id(name)
+            assert distance[u] == expected.get(name, -1)
+            if parent[u] != NIL:
+                assert distance[parent[u]] == distance[u] - 1
+                assert name in graph[csr.names[parent[u]]].adjacents
+
+
+def test_bfs_without_sources_reaches_nothing():
+    distance, parent = bfs(small_graph(), [])
+    assert (distance == -1).all() and (parent == NIL).all()
+
+
+def components(sccs) -> set[frozenset]:
+    return {frozenset(members) for members in sccs}
+
+
+def test_incremental_scc_matches_tarjan_after_insertions():
+    rng = random.Random(0)
+    graph = random_graph(40, 0, 0)
+    graph.track_strongly_connected_components()
+    names = list(graph.graph)
+    for _ in range(80):
+        u, v = rng.choice(names), rng.choice(names)
+        if v in graph[u].adjacents:
+            continue
+        graph.add_edge(u, v)
+        incremental = strongly_connected_components(graph, "incremental")
+        assert components(incremental) == components(tarjan_scc(graph))
+        position = {
+            name: i for i, members in enumerate(incremental) for name in members
+        }
+        for name in names:
+            for adjacent in graph[name].adjacents:
+                assert position[name] <= position[adjacent]
+
+
+def test_incremental_topological_sort():
+    graph = Graph(name="dag")
+    for name in "abcd":
+        graph[name] = Vertex(name=name, adjacents=[])
+    graph.track_strongly_connected_components()
+    for u, v in [("c", "b"), ("b", "a"), ("d", "c")]:
+        graph.add_edge(u, v)
+    assert topological_sort(graph, "incremental") == ["d", "c", "b", "a"]
+    graph.add_edge("a", "d")
+    with pytest.raises(CycleError):
+        topological_sort(graph, "incremental")
+
+
+def test_incremental_methods_reject_csr_graphs():
+    csr = small_graph().to_csr()
+    with pytest.raises(ValueError):
+        strongly_connected_components(csr, "incremental")
+    with pytest.raises(ValueError):
+        topological_sort(csr, "incremental")
+
+
+def weighted_edges(graph: Graph) -> list[tuple[str, str, float]]:
+    return [(u, v, graph[u].weight(v)) for u in graph.graph for v in graph[u].adjacents]
+
+
+def test_indexed_heap_pops_in_key_order_after_decrease_key():
+    rng = random.Random(0)
+    heap = IndexedHeap(200, arity=3)
+    keys = {}
+    for _ in range(600):
+        v, key = rng.randrange(200), rng.random()
+        heap.push(v, key)
+        keys[v] = min(key, keys.get(v, np.inf))
+    popped = [heap.pop_min() for _ in range(len(heap))]
+    assert sorted(popped) == sorted(keys)
+    assert [keys[v] for v in popped] == sorted(keys.values())
+
+
+def test_dijkstra_and_a_star_match_bellman_ford():
+    for seed in range(10):
+        graph = random_graph(40, 120, seed)
+        csr = graph.to_csr()
+        expected = {name: np.inf for name in graph.graph}
+        expected["v0"] = 0.0
+        for _ in range(len(expected)):
+            for u, v, weight in weighted_edges(graph):
+                expected[v] = min(expected[v], expected[u] + weight)
+        distance, parent = dijkstra(graph, "v0")
+        for name, length in expected.items():
+            assert distance[csr.vertex_id(name)] == length
+        target = max(
+            (name for name in expected if expected[name] < np.inf),
+            key=expected.get,
+        )
+        goal = csr.vertex_id(target)
+        distance, _ = a_star(graph, "v0", target, np.zeros(len(csr)))
+        assert distance[goal] == expected[target]
+
+
+def test_prim_spans_with_minimum_weight():
+    for seed in range(10):
+        graph = random_graph(30, 60, seed)
+        csr = graph.to_csr()
+        root = {name: name for name in graph.graph}
+
+        def find(name: str) -> str:
+            while root[name] != name:
+                name = root[name]
+            return name
+
+        total = 0.0
+        for u, v, weight in sorted(weighted_edges(graph), key=lambda edge: edge[2]):
+            if find(u) != find(v):
+                root[find(u)] = find(v)
+                total += weight
+        weight, parent = prim(graph)
+        assert weight.sum() == total
+        trees = len({find(name) for name in graph.graph})
+        assert np.count_nonzero(parent == NIL) == trees
+
+
+def test_csr_traversals_match_graph():
+    for seed in range(8):
+        graph = random_graph(50, 90, seed)
+        csr = CSRGraph.from_graph(graph)
+        expected = reference_dfs(graph)
+        dfs(csr)
+        for name, (discovery, finish, parent) in expected.items():
+            u = csr.vertex_id(name)
+            assert (csr.discovery_time[u], csr.finish_time[u]) == (discovery, finish)
+            assert csr[name].parent == parent
+        assert dfs_forest(csr) == dfs_forest(graph)
+        assert components(strongly_connected_components(csr)) == components(
+            strongly_connected_components(graph)
+        )
+
+        dag = random_dag(50, 90, seed)
+        order = topological_sort(CSRGraph.from_graph(dag))
+        assert order == topological_sort(dag)
+        assert_topological(dag, order)
+
+
+def find_root(expected: dict[str, tuple], name: str) -> str:
+    while expected[name][2] != "nil":
+        name = expected[name][2]
+    return name
+
+
+def test_dfs_matches_recursive_reference():
+    for seed in range(8):
+        graph = random_graph(50, 90, seed)
+        dfs(graph)
+        expected = reference_dfs(graph)
+        for name, vertex in graph.graph.items():
+            assert (vertex.discovery_time, vertex.finish_time) == expected[name][:2]
+            assert vertex.parent == expected[name][2]
+            assert vertex.color == "black"
+        forest = dfs_forest(graph)
+        roots = [name for name in sorted(expected) if expected[name][2] == "nil"]
+        assert list(forest) == roots
+        for root, members in forest.items():
+            assert members == sorted(
+                (name for name in expected if find_root(expected, name) == root),
+                key=lambda name: expected[name][0],
+            )
+
+
+def test_dfs_handles_paths_deeper_than_the_recursion_limit():
+    graph = Graph(name="path")
+    n = 20_000
+    for i in range(n):
+        adjacents = [f"v{i + 1:05}"] if i + 1 < n else []
+        graph[f"v{i:05}"] = Vertex(name=f"v{i:05}", adjacents=adjacents)
+    dfs(graph)
+    assert graph["v00000"].finish_time == 2 * n
+    assert graph[f"v{n - 1:05}"].discovery_time == n
+    assert topological_sort(graph) == sorted(graph.graph)
+
+
+def test_cached_adjacency_and_orders_follow_edits():
+    graph = Graph(name="edits")
+    graph["b"] = Vertex(name="b", adjacents=["c", "a"])
+    graph["a"] = Vertex(name="a", adjacents=[])
+    graph["c"] = Vertex(name="c", adjacents=[])
+    assert [v.name for v in graph.adjacents(graph["b"])] == ["a", "c"]
+    assert [v.name for v in graph.vertices("alphabetically")] == ["a", "b", "c"]
+    assert graph.adjacents(graph["b"]) is graph.adjacents(graph["b"])
+
+    graph.add_edge("b", "aa")
+    graph["aa"] = Vertex(name="aa", adjacents=[])
+    assert [v.name for v in graph.adjacents(graph["b"])] == ["a", "aa", "c"]
+    assert [v.name for v in graph.vertices("alphabetically")] == ["a", "aa", "b", "c"]
+
+    graph["b"] = Vertex(name="b", adjacents=["a"])
+    del graph["c"]
+    assert [v.name for v in graph.adjacents(graph["b"])] == ["a"]
+    assert [v.name for v in graph.vertices("alphabetically")] == ["a", "aa", "b"]
+    dfs(graph)
+    assert sorted(times(graph)) == [
+        ("a", 1, 2, "nil"),
+        ("aa", 3, 4, "nil"),
+        ("b", 5, 6, "nil"),
+    ]
+
+
+def test_kahn_order_and_levels():
+    for seed in range(8):
+        dag = random_dag(60, 120, seed)
+        order = topological_sort(dag, "kahn")
+        assert_topological(dag, order)
+        assert list(topological_sort_stream(dag.to_csr())) == order
+
+        depth = dict.fromkeys(dag.graph, 0)
+        for u in order:
+            for v in dag[u].adjacents:
+                depth[v] = max(depth[v], depth[u] + 1)
+        levels = topological_levels(dag)
+        assert levels == topological_levels(dag.to_csr())
+        assert [name for level in levels for name in level] == order
+        for i, level in enumerate(levels):
+            assert all(depth[name] == i for name in level)
+
+
+def test_kahn_reports_a_cycle():
+    graph = random_dag(30, 40, 0)
+    graph.add_edge("v29", "v0")
+    graph.add_edge("v0", "v29")
+    stream = topological_sort_stream(graph)
+    with pytest.raises(CycleError) as error:
+        list(stream)
+    cycle = error.value.cycle
+    for u, v in zip(cycle, cycle[1:] + cycle[:1]):
+        assert v in graph[u].adjacents
+
+
+def test_tarjan_matches_kosaraju():
+    for seed in range(8):
+        graph = random_graph(50, 80, seed)
+        kosaraju = list(strongly_connected_components(graph))
+        assert any(len(members) > 2 for members in kosaraju)
+        assert list(strongly_connected_components(graph.to_csr())) == kosaraju
+        assert strongly_connected_components(graph, "tarjan") == kosaraju
+        assert strongly_connected_components(graph.to_csr(), "tarjan") == kosaraju
+        tarjan_scc(graph)
+        expected = reference_dfs(graph)
+        for name, vertex in graph.graph.items():
+            assert (vertex.discovery_time, vertex.finish_time) == expected[name][:2]
+            assert vertex.parent == expected[name][2]
+
+
+def csr_edges(csr: CSRGraph) -> set[tuple]:
+    weights = csr.weights if csr.weights is not None else np.ones(csr.targets.size)
+    return {
+        (csr.names[u], csr.names[int(v)], float(weights[position]))
+        for u in range(len(csr))
+        for position, v in zip(
+            range(csr.offsets[u], csr.offsets[u + 1]), csr.adjacents(u)
+        )
+    }
+
+
+def test_edge_list_loader_and_binary_format(tmp_path):
+    path = tmp_path / "roads.csv"
+    path.write_text(
+        "source,target,weight\n# comment\nb,a,2.5\na,c,1\n\nc,b,4\nd,a,1\n",
+        encoding="utf-8",
+    )
+    graph = CSRGraph.from_edge_list(str(path), delimiter=",", skip_header=1)
+    assert graph.name == "roads"
+    expected = {("b", "a", 2.5), ("a", "c", 1.0), ("c", "b", 4.0), ("d", "a", 1.0)}
+    assert csr_edges(graph) == expected
+    chunked = CSRGraph.from_edge_list(
+        str(path), delimiter=",", skip_header=1, chunk_size=2
+    )
+    assert csr_edges(chunked) == expected
+
+    saved = tmp_path / "roads.bin"
+    graph.save(str(saved))
+    for mmap in (True, False):
+        loaded = CSRGraph.load(str(saved), mmap=mmap)
+        assert list(loaded.names) == list(graph.names)
+        assert csr_edges(loaded) == expected
+        np.testing.assert_array_equal(loaded.alphabetical, graph.alphabetical)
+        assert dfs_forest(loaded) == dfs_forest(graph)
+
+    (tmp_path / "bad.bin").write_bytes(b"NOTAGRAPH" + bytes(64))
+    with pytest.raises(ValueError):
+        CSRGraph.load(str(tmp_path / "bad.bin"))
+
+
+def test_edge_list_loader_matches_line_by_line_parse(tmp_path):
+    rng = np.random.default_rng(7)
+    edges = 20_000
+    sources = rng.integers(0, 3000, edges)
+    targets = rng.integers(0, 3000, edges)
+    path = tmp_path / "edges.txt"
+    for prefix in ("", "v"):
+        lines = [f"{prefix}{u}\t{prefix}{v}\n" for u, v in zip(sources, targets)]
+        path.write_text("# header\n" + "".join(lines), encoding="utf-8")
+        expected = [tuple(line.split()) + (1.0,) for line in lines]
+        names = sorted({name for edge in expected for name in edge[:2]})
+        for chunk_size in (1_000_000, 999):
+            graph = CSRGraph.from_edge_list(str(path), chunk_size=chunk_size)
+            assert len(graph) == len(names) and graph.targets.size == edges
+            assert sorted(graph.names) == names
+            assert csr_edges(graph) == set(expected)
+
+    # Integer names in one chunk and text names in another are merged.
+    path.write_text("1 2\n# only a comment\n2 x\n", encoding="utf-8")
+    graph = CSRGraph.from_edge_list(str(path), chunk_size=1)
+    assert sorted(graph.names) == ["1", "2", "x"]
+    assert csr_edges(graph) == {("1", "2", 1.0), ("2", "x", 1.0)}
+    path.write_text("# nothing\n", encoding="utf-8")
+    assert len(CSRGraph.from_edge_list(str(path))) == 0
+
+
+def test_from_arrays_names_vertices_by_id():
+    graph = CSRGraph.from_arrays("ids", np.array([0, 2, 2]), np.array([1, 0, 3]))
+    assert list(graph.names) == ["0", "1", "2", "3"]
+    assert csr_edges(graph) == {("0", "1", 1.0), ("2", "0", 1.0), ("2", "3", 1.0)}
+
+
+def test_new_epoch_resets_colors_and_parents():
+    graph = random_graph(30, 50, 1)
+    dfs(graph)
+    assert all(vertex.color == "black" for vertex in graph.graph.values())
+    graph.new_epoch()
+    for vertex in graph.graph.values():
+        assert (vertex.color, vertex.parent) == ("white", "nil")
+    vertex = graph["v0"]
+    vertex.color = "gray"
+    vertex.parent = "v1"
+    assert (vertex.color, vertex.parent) == ("gray", "v1")
+
+    expected = reference_dfs(graph)
+    for _ in range(3):
+        graph.results.clear()
+        dfs(graph)
+        for name, vertex in graph.graph.items():
+            assert (vertex.discovery_time, vertex.finish_time) == expected[name][:2]
+            assert vertex.parent == expected[name][2]
+
+
+def test_csr_epoch_wraps_around():
+    graph = random_graph(30, 50, 2)
+    expected = reference_dfs(graph)
+    csr = graph.to_csr()
+    csr.epoch = np.iinfo(csr.discovered_in.dtype).max - 1
+    for _ in range(3):
+        csr.results.clear()
+        dfs(csr)
+        for name, (discovery, finish, parent) in expected.items():
+            u = csr.vertex_id(name)
+            assert (csr.discovery_time[u], csr.finish_time[u]) == (discovery, finish)
+            assert csr[name].parent == parent
+    assert csr.epoch < 10
+
+
+@pytest.mark.parametrize("method", ["bitset", "interval"])
+def test_reachability_index_matches_bfs(method):
+    for seed in range(6):
+        graph = random_graph(60, 90, seed)
+        csr = graph.to_csr()
+        index = ReachabilityIndex(graph, method=method, labels=2, seed=seed)
+        reached = np.array([bfs(csr, name)[0] >= 0 for name in csr.names])
+        sources, targets = np.meshgrid(np.arange(len(csr)), np.arange(len(csr)))
+        pairs = np.column_stack([sources.ravel(), targets.ravel()])
+        expected = reached[pairs[:, 0], pairs[:, 1]]
+        np.testing.assert_array_equal(index.reaches_batch(pairs), expected)
+        np.testing.assert_array_equal(
+            index.reaches_batch(pairs[:, 0], pairs[:, 1]), expected
+        )
+        names = np.array(csr.names)[pairs[:100]]
+        np.testing.assert_array_equal(index.reaches_batch(names), expected[:100])
+        assert index.reaches_batch([]).size == 0
+        assert index.reaches("v0", "v0")
+
+
+def test_parallel_traversals_match_serial_runs():
+    graph = random_graph(80, 160, 3)
+    dag = random_dag(40, 80, 3)
+    queries = {
+        "reachable": [f"v{i}" for i in range(0, 80, 7)],
+        "distance": [(f"v{i}", f"v{(i * 13) % 80}") for i in range(12)],
+    }
+    for kind, kind_queries in queries.items():
+        serial = parallel_traversals(graph, kind_queries, kind, processes=1)
+        parallel = parallel_traversals(graph, kind_queries, kind, processes=2)
+        assert len(parallel) == len(serial)
+        for expected, result in zip(serial, parallel):
+            np.testing.assert_array_equal(result, expected)
+
+    subsets = [sorted(dag.graph)[start::3] for start in range(3)]
+    orders = parallel_traversals(dag, subsets, "topological_sort", processes=2)
+    for subset, order in zip(subsets, orders):
+        assert sorted(order) == sorted(subset)
+        position = {name: i for i, name in enumerate(order)}
+        for u in subset:
+            for v in dag[u].adjacents:
+                if v in position:
+                    assert position[u] < position[v]
+
+
+def test_result_cache_hits_until_the_graph_changes():
+    graph = random_dag(30, 50, 4)
+    order = topological_sort(graph)
+    misses = graph.results.misses
+    hit = topological_sort(graph)
+    assert hit == order and hit is not order
+    assert graph.results.misses == misses
+    assert graph.results.hits >= 1
+    hit.reverse()
+    assert topological_sort(graph) == order
+
+    graph["new"] = Vertex(name="new", adjacents=[order[0]])
+    changed = topological_sort(graph)
+    assert changed is not order
+    assert_topological(graph, changed)
+    assert graph.results.info()["size"] <= graph.results.maxsize
+
+
+def test_cached_results_are_copies():
+    graph = random_graph(40, 70, 5)
+    components = [list(members) for members in strongly_connected_components(graph)]
+    for members in strongly_connected_components(graph):
+        members.append("corrupt")
+    assert list(strongly_connected_components(graph)) == components
+    forest = dfs_forest(graph)
+    dfs_forest(graph)["v0"] = ["corrupt"]
+    for members in dfs_forest(graph).values():
+        members.clear()
+    assert dfs_forest(graph) == forest
+
+
+def test_finish_time_traversals_follow_the_last_traversal():
+    graph = random_graph(20, 30, 1)
+    dfs(graph, "")
+    first = dfs_forest(graph, "by finish time")
+    dfs(graph, "alphabetically")
+    second = dfs_forest(graph, "by finish time")
+    fresh = random_graph(20, 30, 1)
+    dfs(fresh, "alphabetically")
+    assert second == dfs_forest(fresh, "by finish time")
+    assert second != first
+    assert times(graph) == times(fresh)
+
+
+def test_in_place_adjacency_edits_start_a_new_version():
+    graph = small_graph()
+    assert topological_sort(graph, "kahn") == ["b", "a", "c"]
+    graph.track_strongly_connected_components()
+    version = graph.version
+    graph["c"].adjacents.append("b")
+    assert graph.version > version
+    assert graph.incremental is None
+    with pytest.raises(CycleError):
+        topological_sort(graph, "kahn")
+    assert [sorted(members) for members in strongly_connected_components(graph)] == [
+        ["a", "b", "c"]
+    ]
+
+    graph["c"].adjacents.remove("b")
+    assert topological_sort(graph, "kahn") == ["b", "a", "c"]
+    graph["c"].adjacents += ["a"]
+    assert len(list(strongly_connected_components(graph, "tarjan"))) == 2
+    graph["c"].adjacents = []
+    assert topological_sort(graph, "kahn") == ["b", "a", "c"]
+    del graph["c"].adjacents[:]
+    graph["a"].adjacents[0] = "b"
+    with pytest.raises(CycleError):
+        topological_sort(graph, "kahn")
+
+    old = graph["c"]
+    graph["c"] = Vertex(name="c", adjacents=[])
+    version = graph.version
+    old.adjacents.append("a")
+    assert graph.version == version
@@ -0,0 +1,215 @@
+import time as timer
+
+import numpy as np
+
+from hash_insert import HASH_STRATEGIES, OpenAddressingTable, next_prime
+
+LOAD_FACTORS = (0.25, 0.5, 0.75, 0.9)
+SIZE_KINDS = ("prime", "power of two")
+DISTRIBUTIONS = ("uniform", "sequential", "multiples of m")
+
+
+def table_size(size: int, kind: str) -> int:
+    """
+    Return the table size of the given kind closest above size.
+
+    Parameters
+    ----------
+    size : int
+        The smallest acceptable size.
+    kind : str
+        'prime' or 'power of two'.
+
+    Returns
+    -------
+    int
+        The table size.
+    """
+    if kind == "prime":
+        return next_prime(size)
+    return 1 << (size - 1).bit_length()
+
+
+def make_keys(n: int, m: int, distribution: str, rng: np.random.Generator) -> list:
+    """
+    Generate n distinct keys for a table of size m.
+
+    Parameters
+    ----------
+    n : int
+        The number of keys.
+    m : int
+        The size of the table, used by the adversarial distribution.
+    distribution : str
+        'uniform' (random 62-bit keys), 'sequential' (0, 1, 2, ...) or
+        'multiples of m' (0, m, 2m, ..., which all share home slot 0).
+    rng : np.random.Generator
+        The source of randomness.
+
+    Returns
+    -------
+    list
+        The keys, as Python ints.
+    """
+    if distribution == "uniform":
+        keys = np.unique(rng.integers(0, 1 << 62, 2 * n))[:n]
+        return rng.permutation(keys).tolist()
+    elif distribution == "sequential":
+        return list(range(n))
+    elif distribution == "multiples of m":
+        return [m * i for i in range(n)]
+    raise ValueError(f"unknown key distribution: {distribution!r}")
+
+
+def benchmark_table(
+    hash_method: str,
+    m: int,
+    size_kind: str,
+    keys: list,
+    max_growth: int = 16,
+) -> dict:
+    """
+    Insert keys into an empty table of size m, then look every key up.
+
+    The table is allowed to fill completely before growing, so the load factor
+    is the one given by the number of keys unless the strategy fails to place
+    a key. A configuration that makes the table grow beyond max_growth times
+    its size is abandoned and reported as such.
+
+    Parameters
+    ----------
+    hash_method : str
+        The name of the probing strategy.
+    m : int
+        The size of the table.
+    size_kind : str
+        'prime' or 'power of two'; power-of-two tables also grow by doubling.
+    keys : list
+        The keys to insert.
+    max_growth : int
+        How much the table may grow before the run is abandoned.
+
+    Returns
+    -------
+    dict
+        Throughput, probe statistics and clustering of the run.
+    """
+    table = OpenAddressingTable(
+        capacity=m,
+        hash_method=hash_method,
+        max_load=1.0,
+        prime_capacity=size_kind == "prime",
+        collect_stats=True,
+    )
+    inserted = 0
+    start = timer.perf_counter()
+    for k in keys:
+        table.insert(k)
+        inserted += 1
+        if table.capacity > max_growth * m:
+            break
+    insert_seconds = timer.perf_counter() - start
+    abandoned = inserted < len(keys)
+
+    start = timer.perf_counter()
+    for k in keys[:inserted]:
+        table.find(k)
+    lookup_seconds = timer.perf_counter() - start
+
+    row = {
+        "method": hash_method,
+        "size kind": size_kind,
+        "m": m,
+        "final m": table.capacity,
+        "keys": inserted,
+        "abandoned": abandoned,
+        "inserts/s": inserted / insert_seconds if insert_seconds else float("inf"),
+        "lookups/s": inserted / lookup_seconds if lookup_seconds else float("inf"),
+    }
+    row.update(table.stats.summary())
+    row.update(table.clustering())
+    return row
+
+
+def run_benchmark(
+    size: int = 2048,
+    methods=None,
+    load_factors=LOAD_FACTORS,
+    size_kinds=SIZE_KINDS,
+    distributions=DISTRIBUTIONS,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Sweep hashing methods, load factors, table sizes and key distributions.
+
+    Parameters
+    ----------
+    size : int
+        The table size, rounded up to a prime or a power of two.
+    methods : list, optional
+        The probing strategies to measure, all registered ones by default.
+    load_factors : tuple
+        The fractions of the table to fill.
+    size_kinds : tuple
+        Any of 'prime' and 'power of two'.
+    distributions : tuple
+        Any of 'uniform', 'sequential' and 'multiples of m'.
+    seed : int
+        The seed of the uniform keys.
+
+    Returns
+    -------
+    list[dict]
+        One row per configuration, as returned by benchmark_table.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size_kind in size_kinds:
+        m = table_size(size, size_kind)
+        for distribution in distributions:
+            for load in load_factors:
+                keys = make_keys(int(load * m), m, distribution, rng)
+                for hash_method in methods or HASH_STRATEGIES:
+                    row = benchmark_table(hash_method, m, size_kind, keys)
+                    row["distribution"] = distribution
+                    row["load"] = load
+                    rows.append(row)
+    return rows
+
+
+def print_report(rows: list[dict]) -> None:
+    """
+    Print the benchmark rows as a table.
+
+    Parameters
+    ----------
+    rows : list[dict]
+        The rows returned by run_benchmark.
+
+    Returns
+    -------
+    None
+    """
+    header = (
+        f"{'method':<15}{'size':<14}{'keys':<16}{'load':>5}{'inserts/s':>12}"
+        f"{'lookups/s':>12}{'mean':>7}{'var':>9}{'max':>6}{'fail':>6}"
+        f"{'cluster':>9}{'final m':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['method']:<15}{row['size kind']:<14}{row['distribution']:<16}"
+            f"{row['load']:>5.2f}{row['inserts/s']:>12,.0f}{row['lookups/s']:>12,.0f}"
+            f"{row['mean probe']:>7.2f}{row['probe variance']:>9.2f}"
+            f"{row['max probe']:>6}{row['failed']:>6}{row['max cluster']:>9}"
+            f"{row['final m']:>9}{' (abandoned)' if row['abandoned'] else ''}"
+        )
+
+
+def main() -> None:
+    print_report(run_benchmark(size=1024))
+
+
+if __name__ == "__main__":
+    main()
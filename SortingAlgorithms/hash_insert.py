@@ -1,7 +1,250 @@
 import numpy as np
 import math
+import multiprocessing
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from multiprocessing import shared_memory
 
 NIL = np.inf
+EMPTY = 0
+OCCUPIED = 1
+DELETED = 2
+HASH_MAGIC = b"HASHTABL"
+HASH_FILE_VERSION = 1
+
+
+def empty_slot(dtype: np.dtype):
+    """
+    Return the value that marks an empty slot in a table of the given type.
+
+    Float tables use NIL, integer tables reserve the largest value of their
+    type so that keys are stored and compared exactly.
+
+    Parameters
+    ----------
+    dtype : np.dtype
+        The type of the table.
+
+    Returns
+    -------
+    np.generic
+        The empty-slot sentinel.
+    """
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        return dtype.type(np.iinfo(dtype).max)
+    return dtype.type(NIL)
+
+
+def new_hash_table(m: int, dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Create an empty hash table.
+
+    Parameters
+    ----------
+    m : int
+        The size of the hash table.
+    dtype : np.dtype
+        The type of the keys, a float type or int32, int64 or uint64.
+
+    Returns
+    -------
+    np.ndarray
+        The table with every slot set to the empty-slot sentinel.
+    """
+    return np.full(m, empty_slot(dtype), dtype=dtype)
+
+
+def new_occupancy_bitmap(m: int) -> np.ndarray:
+    """
+    Create a packed bitmap that tracks which slots of a table are taken.
+
+    A bitmap lets integer tables use the whole range of their type, since no
+    value has to be reserved as the empty-slot sentinel.
+
+    Parameters
+    ----------
+    m : int
+        The size of the hash table.
+
+    Returns
+    -------
+    np.ndarray
+        One bit per slot, all clear.
+    """
+    return np.zeros((m + 7) // 8, dtype=np.uint8)
+
+
+def slot_is_empty(table: np.ndarray, position, occupied: np.ndarray = None):
+    """
+    Tell whether slots of the table are empty.
+
+    Parameters
+    ----------
+    table : np.ndarray
+        The hash table.
+    position : int or np.ndarray
+        The slot or slots to check.
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table; the sentinel is used without it.
+
+    Returns
+    -------
+    bool or np.ndarray
+        Whether each slot is empty.
+    """
+    if occupied is None:
+        return table[position] == empty_slot(table.dtype)
+    return (occupied[position >> 3] >> (position & 7)) & 1 == 0
+
+
+def mark_occupied(occupied: np.ndarray, position) -> None:
+    """
+    Set the bits of the given slots in an occupancy bitmap.
+
+    Parameters
+    ----------
+    occupied : np.ndarray
+        The occupancy bitmap.
+    position : int or np.ndarray
+        The slot or slots that were taken.
+
+    Returns
+    -------
+    None
+    """
+    position = np.asarray(position)
+    np.bitwise_or.at(occupied, position >> 3, (1 << (position & 7)).astype(np.uint8))
+
+
+def check_key(table: np.ndarray, k, occupied: np.ndarray) -> None:
+    """
+    Reject keys that a sentinel-based table cannot tell apart from empty slots.
+
+    Parameters
+    ----------
+    table : np.ndarray
+        The hash table.
+    k : int or np.ndarray
+        The key or keys to insert.
+    occupied : np.ndarray
+        The occupancy bitmap of the table, or None.
+
+    Returns
+    -------
+    None
+    """
+    if occupied is None and np.issubdtype(table.dtype, np.integer):
+        if np.any(np.asarray(k) == empty_slot(table.dtype)):
+            raise ValueError(
+                f"{empty_slot(table.dtype)} marks empty slots of a "
+                f"{table.dtype} table; use an occupancy bitmap to store it"
+            )
+
+
+class ProbeStats:
+    """
+    Probe lengths of the inserts into a table.
+
+    A probe length is the number of slots visited to place a key, that is, one
+    more than its number of collisions. Inserts that found no slot are only
+    counted in failed.
+    """
+
+    def __init__(self) -> None:
+        self.lengths: Counter = Counter()
+        self.failed: int = 0
+
+    def record(self, probes: int) -> None:
+        self.lengths[probes] += 1
+
+    def record_failure(self) -> None:
+        self.failed += 1
+
+    @property
+    def count(self) -> int:
+        return sum(self.lengths.values())
+
+    @property
+    def max(self) -> int:
+        return max(self.lengths, default=0)
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        if not count:
+            return 0.0
+        return sum(length * n for length, n in self.lengths.items()) / count
+
+    @property
+    def variance(self) -> float:
+        count = self.count
+        if not count:
+            return 0.0
+        mean = self.mean
+        return (
+            sum(n * (length - mean) ** 2 for length, n in self.lengths.items()) / count
+        )
+
+    def histogram(self) -> np.ndarray:
+        """
+        Return how many inserts needed each probe length.
+
+        Returns
+        -------
+        np.ndarray
+            Entry p is the number of inserts that visited p slots.
+        """
+        histogram = np.zeros(self.max + 1, dtype=np.int64)
+        for length, n in self.lengths.items():
+            histogram[length] = n
+        return histogram
+
+    def summary(self) -> dict:
+        return {
+            "inserts": self.count,
+            "failed": self.failed,
+            "mean probe": self.mean,
+            "probe variance": self.variance,
+            "max probe": self.max,
+        }
+
+
+def cluster_statistics(empty: np.ndarray) -> dict:
+    """
+    Measure the runs of consecutive occupied slots of a table.
+
+    Long runs are what makes linear probing slow (primary clustering). A run
+    that reaches the end of the table continues at its start.
+
+    Parameters
+    ----------
+    empty : np.ndarray
+        Whether each slot of the table is empty, e.g. from slot_is_empty.
+
+    Returns
+    -------
+    dict
+        The number of clusters and their mean and maximum length.
+    """
+    occupied = ~np.asarray(empty, dtype=bool)
+    if occupied.all():
+        return {
+            "clusters": 1,
+            "mean cluster": float(occupied.size),
+            "max cluster": occupied.size,
+        }
+    # Rotate so that the table starts at an empty slot and no run wraps.
+    start = int(np.flatnonzero(~occupied)[0])
+    occupied = np.roll(occupied, -start).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], occupied, [0])))
+    lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    return {
+        "clusters": lengths.size,
+        "mean cluster": float(lengths.mean()) if lengths.size else 0.0,
+        "max cluster": int(lengths.max(initial=0)),
+    }
 
 
 def modulo_hash(k: int, m: int) -> int:
@@ -88,7 +331,407 @@ def double_hashing(i: int, k: int, m: int) -> int:
     return (modulo_hash(k, m) + i * modulo_hash_with_jump(k, m)) % m
 
 
-def hash_insert(table: np.ndarray, k: int, hash_method: str, verbose: bool) -> int:
+HASH_STRATEGIES: dict[str, type] = {}
+
+
+def register_strategy(name: str):
+    """
+    Register a probing strategy class under a hash method name.
+
+    Parameters
+    ----------
+    name : str
+        The name used to select the strategy, e.g. 'linear probe'.
+
+    Returns
+    -------
+    callable
+        A class decorator that records the class in HASH_STRATEGIES.
+    """
+
+    def register(strategy: type) -> type:
+        strategy.name = name
+        HASH_STRATEGIES[name] = strategy
+        return strategy
+
+    return register
+
+
+def get_strategy(hash_method: str) -> type:
+    """
+    Return the probing strategy class registered under a hash method name.
+
+    Parameters
+    ----------
+    hash_method : str
+        The hash method to use, one of the keys of HASH_STRATEGIES.
+
+    Returns
+    -------
+    type
+        The strategy class.
+    """
+    try:
+        return HASH_STRATEGIES[hash_method]
+    except KeyError:
+        raise ValueError(f"unknown hash method: {hash_method!r}") from None
+
+
+class ProbingStrategy:
+    """
+    How an OpenAddressingTable places, finds and removes keys.
+
+    A strategy is created for each table and may keep extra arrays next to
+    the table's keys, values and states. insert returns -1 when the key cannot
+    be placed without growing the table; the entry still waiting for a slot,
+    which relocating strategies may have swapped for the key, is left in
+    leftover.
+    """
+
+    name: str = ""
+    label: str = ""
+    constants: tuple = ()
+
+    def allocate(self, table: "OpenAddressingTable", capacity: int) -> None:
+        pass
+
+    def find(self, table: "OpenAddressingTable", k: int) -> int:
+        raise NotImplementedError
+
+    def insert(self, table: "OpenAddressingTable", k: int, value) -> int:
+        raise NotImplementedError
+
+    def delete(self, table: "OpenAddressingTable", position: int) -> None:
+        raise NotImplementedError
+
+    def probe_length(self, table: "OpenAddressingTable", position: int) -> int:
+        """Return how many slots a lookup visits to find the key at position."""
+        raise NotImplementedError
+
+
+class SequenceStrategy(ProbingStrategy):
+    """
+    Strategy that visits the slots given by probe(i, k, m) for i = 0, 1, ...
+
+    Deletes leave tombstones so that the sequences of other keys stay intact.
+    """
+
+    @staticmethod
+    def probe(i: int, k: int, m: int) -> int:
+        raise NotImplementedError
+
+    def find(self, table: "OpenAddressingTable", k: int) -> int:
+        m: int = table.capacity
+        for i in range(m):
+            position = self.probe(i, k, m)
+            state = table.states[position]
+            if state == EMPTY:
+                return -1
+            if state == OCCUPIED and table.keys[position] == k:
+                return position
+        return -1
+
+    def insert(self, table: "OpenAddressingTable", k: int, value) -> int:
+        m: int = table.capacity
+        free: int = -1
+        for i in range(m):
+            position = self.probe(i, k, m)
+            state = table.states[position]
+            if state == OCCUPIED:
+                if table.keys[position] == k:
+                    table.values[position] = value
+                    return position
+            elif state == DELETED:
+                if free == -1:
+                    free = position
+            else:
+                if free == -1:
+                    free = position
+                break
+        if free == -1:
+            self.leftover = (k, value)
+            return -1
+        if table.states[free] == DELETED:
+            table.tombstones -= 1
+        table.keys[free] = k
+        table.values[free] = value
+        table.states[free] = OCCUPIED
+        table.size += 1
+        return free
+
+    def delete(self, table: "OpenAddressingTable", position: int) -> None:
+        table.states[position] = DELETED
+        table.values[position] = None
+        table.size -= 1
+        table.tombstones += 1
+
+    def probe_length(self, table: "OpenAddressingTable", position: int) -> int:
+        m: int = table.capacity
+        k = int(table.keys[position])
+        for i in range(m):
+            if self.probe(i, k, m) == position:
+                return i + 1
+        return m
+
+
+@register_strategy("double hash")
+class DoubleHashing(SequenceStrategy):
+    label = "dh"
+    probe = staticmethod(double_hashing)
+
+
+@register_strategy("quadratic hash")
+class QuadraticProbing(SequenceStrategy):
+    """
+    Quadratic probing with c1 = 2 and c2 = 3.
+
+    The sequence does not visit every slot, so inserts can fail while there
+    are free slots left; OpenAddressingTable grows the table when that happens.
+    """
+
+    label = "qh"
+    constants = (2, 3)
+
+    @staticmethod
+    def probe(i: int, k: int, m: int) -> int:
+        return quadratic_probing_hash(i, k, m, 2, 3)
+
+
+@register_strategy("linear probe")
+class LinearProbing(SequenceStrategy):
+    label = "lp"
+
+    @staticmethod
+    def probe(i: int, k: int, m: int) -> int:
+        return (modulo_hash(k, m) + i) % m
+
+
+@register_strategy("robin hood")
+class RobinHood(ProbingStrategy):
+    """
+    Linear probing where a key takes the slot of any key closer to its home.
+
+    Keeping displacements even bounds the variance of probe lengths. Lookups
+    stop as soon as they pass a key closer to its home than the one searched,
+    and deletes shift the following keys back instead of leaving tombstones.
+    """
+
+    label = "rh"
+
+    def distance(self, table: "OpenAddressingTable", position: int) -> int:
+        m: int = table.capacity
+        return (position - modulo_hash(int(table.keys[position]), m)) % m
+
+    def find(self, table: "OpenAddressingTable", k: int) -> int:
+        m: int = table.capacity
+        position = modulo_hash(k, m)
+        for d in range(m):
+            if table.states[position] != OCCUPIED:
+                return -1
+            if table.keys[position] == k:
+                return position
+            if self.distance(table, position) < d:
+                return -1
+            position = (position + 1) % m
+        return -1
+
+    def insert(self, table: "OpenAddressingTable", k: int, value) -> int:
+        position = self.find(table, k)
+        if position != -1:
+            table.values[position] = value
+            return position
+        m: int = table.capacity
+        position = modulo_hash(k, m)
+        placed: int = -1
+        d: int = 0
+        for _ in range(m):
+            if table.states[position] != OCCUPIED:
+                table.keys[position] = k
+                table.values[position] = value
+                table.states[position] = OCCUPIED
+                table.size += 1
+                return position if placed == -1 else placed
+            e = self.distance(table, position)
+            if e < d:
+                k, table.keys[position] = int(table.keys[position]), k
+                value, table.values[position] = table.values[position], value
+                if placed == -1:
+                    placed = position
+                d = e
+            position = (position + 1) % m
+            d += 1
+        self.leftover = (k, value)
+        return -1
+
+    def delete(self, table: "OpenAddressingTable", position: int) -> None:
+        m: int = table.capacity
+        following = (position + 1) % m
+        while (
+            table.states[following] == OCCUPIED and self.distance(table, following) > 0
+        ):
+            table.keys[position] = table.keys[following]
+            table.values[position] = table.values[following]
+            position = following
+            following = (position + 1) % m
+        table.states[position] = EMPTY
+        table.values[position] = None
+        table.size -= 1
+
+    def probe_length(self, table: "OpenAddressingTable", position: int) -> int:
+        return self.distance(table, position) + 1
+
+
+@register_strategy("hopscotch")
+class Hopscotch(ProbingStrategy):
+    """
+    Hopscotch hashing: every key lives within H slots of its home.
+
+    hops[b] has bit d set when slot b + d holds a key whose home is b, so a
+    lookup checks at most H slots. Inserts probe linearly for a free slot and
+    move it back towards the home by swapping it with keys that may move
+    forward while staying in their own neighbourhood.
+    """
+
+    label = "hs"
+    H: int = 32
+
+    def allocate(self, table: "OpenAddressingTable", capacity: int) -> None:
+        self.neighbourhood = min(self.H, capacity)
+        self.hops = np.zeros(capacity, dtype=np.uint32)
+
+    def find(self, table: "OpenAddressingTable", k: int) -> int:
+        m: int = table.capacity
+        home = modulo_hash(k, m)
+        bits = int(self.hops[home])
+        while bits:
+            position = (home + (bits & -bits).bit_length() - 1) % m
+            if table.keys[position] == k:
+                return position
+            bits &= bits - 1
+        return -1
+
+    def insert(self, table: "OpenAddressingTable", k: int, value) -> int:
+        position = self.find(table, k)
+        if position != -1:
+            table.values[position] = value
+            return position
+        m: int = table.capacity
+        home = modulo_hash(k, m)
+        for d in range(m):
+            free = (home + d) % m
+            if table.states[free] != OCCUPIED:
+                break
+        else:
+            self.leftover = (k, value)
+            return -1
+        while d >= self.neighbourhood:
+            for back in range(self.neighbourhood - 1, 0, -1):
+                bucket = (free - back) % m
+                bits = int(self.hops[bucket]) & ((1 << back) - 1)
+                if bits:
+                    offset = (bits & -bits).bit_length() - 1
+                    source = (bucket + offset) % m
+                    table.keys[free] = table.keys[source]
+                    table.values[free] = table.values[source]
+                    table.states[free] = OCCUPIED
+                    table.states[source] = EMPTY
+                    self.hops[bucket] ^= (1 << back) | (1 << offset)
+                    d -= back - offset
+                    free = source
+                    break
+            else:
+                self.leftover = (k, value)
+                return -1
+        table.keys[free] = k
+        table.values[free] = value
+        table.states[free] = OCCUPIED
+        self.hops[home] |= 1 << d
+        table.size += 1
+        return free
+
+    def delete(self, table: "OpenAddressingTable", position: int) -> None:
+        m: int = table.capacity
+        home = modulo_hash(int(table.keys[position]), m)
+        self.hops[home] &= ~(1 << ((position - home) % m)) & 0xFFFFFFFF
+        table.states[position] = EMPTY
+        table.values[position] = None
+        table.size -= 1
+
+    def probe_length(self, table: "OpenAddressingTable", position: int) -> int:
+        m: int = table.capacity
+        home = modulo_hash(int(table.keys[position]), m)
+        d = (position - home) % m
+        return bin(int(self.hops[home]) & ((2 << d) - 1)).count("1")
+
+
+@register_strategy("cuckoo")
+class Cuckoo(ProbingStrategy):
+    """
+    Two-table cuckoo hashing: a key lives in one of exactly two slots.
+
+    The first half of the slots is the first table, addressed with
+    modulo_hash, and the second half is addressed with a multiplicative hash.
+    An insert into two full slots evicts one occupant to its other slot, and
+    gives up after max_kicks evictions so that the table grows.
+    """
+
+    label = "ck"
+
+    def slots(self, k: int, m: int) -> tuple[int, int]:
+        # NumPy integers would overflow in the multiplication.
+        k = int(k)
+        half = m // 2
+        mixed = ((k * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32
+        return modulo_hash(k, half), half + mixed % (m - half)
+
+    def find(self, table: "OpenAddressingTable", k: int) -> int:
+        for position in self.slots(k, table.capacity):
+            if table.states[position] == OCCUPIED and table.keys[position] == k:
+                return position
+        return -1
+
+    def insert(self, table: "OpenAddressingTable", k: int, value) -> int:
+        position = self.find(table, k)
+        if position != -1:
+            table.values[position] = value
+            return position
+        m: int = table.capacity
+        key: int = k
+        evicted_from: int = -1
+        for _ in range(max(16, 6 * m.bit_length())):
+            first, second = self.slots(k, m)
+            for position in (first, second):
+                if table.states[position] != OCCUPIED:
+                    table.keys[position] = k
+                    table.values[position] = value
+                    table.states[position] = OCCUPIED
+                    table.size += 1
+                    return self.find(table, key)
+            position = second if first == evicted_from else first
+            k, table.keys[position] = int(table.keys[position]), k
+            value, table.values[position] = table.values[position], value
+            evicted_from = position
+        self.leftover = (k, value)
+        return -1
+
+    def delete(self, table: "OpenAddressingTable", position: int) -> None:
+        table.states[position] = EMPTY
+        table.values[position] = None
+        table.size -= 1
+
+    def probe_length(self, table: "OpenAddressingTable", position: int) -> int:
+        first, _ = self.slots(int(table.keys[position]), table.capacity)
+        return 1 if position == first else 2
+
+
+def hash_insert(
+    table: np.ndarray,
+    k: int,
+    hash_method: str,
+    verbose: bool,
+    occupied: np.ndarray = None,
+    stats: ProbeStats = None,
+) -> int:
     """
     Insert a key into the hash table using the specified hash method.
 
@@ -99,23 +742,57 @@ def hash_insert(table: np.ndarray, k: int, hash_method: str, verbose: bool) -> i
     k : int
         The key to insert.
     hash_method : str
-        The hash method to use ('double hash' or 'quadratic hash').
+        The hash method to use, the name of a SequenceStrategy such as
+        'double hash', 'quadratic hash' or 'linear probe'.
     verbose: bool
         whether to print where the element is inserted in the table
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table, updated on insertion.
+    stats : ProbeStats, optional
+        Where to record the probe length of the insert.
     Returns
     -------
     int
         The position where the key was inserted, or -1 if the table is full.
     """
     m: int = table.size
+    check_key(table, k, occupied)
     if hash_method == "double hash":
-        return insert_using_double_hashing(table, k, m, verbose)
+        return insert_using_double_hashing(table, k, m, verbose, occupied, stats)
     elif hash_method == "quadratic hash":
-        return insert_using_quadratic_probing(table, k, m, verbose)
+        return insert_using_quadratic_probing(table, k, m, verbose, occupied, stats)
+    probe = probe_sequence(hash_method)
+    empty = empty_slot(table.dtype)
+    for i in range(m):
+        position = probe(i, k, m)
+        if (
+            table[position] == empty
+            if occupied is None
+            else slot_is_empty(table, position, occupied)
+        ):
+            if verbose:
+                label = get_strategy(hash_method).label
+                print(
+                    f"{label}: element {k} inserted at {position} (had {i} collisions)"
+                )
+            table[position] = k
+            if occupied is not None:
+                mark_occupied(occupied, position)
+            if stats is not None:
+                stats.record(i + 1)
+            return position
+    if stats is not None:
+        stats.record_failure()
+    return -1
 
 
 def insert_using_quadratic_probing(
-    table: np.ndarray, k: int, m: int, verbose: bool
+    table: np.ndarray,
+    k: int,
+    m: int,
+    verbose: bool,
+    occupied: np.ndarray = None,
+    stats: ProbeStats = None,
 ) -> int:
     """
     Insert a key into the hash table using quadratic probing.
@@ -130,6 +807,10 @@ def insert_using_quadratic_probing(
         The size of the hash table.
     verbose: bool
         whether to print where the element is inserted in the table
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table, updated on insertion.
+    stats : ProbeStats, optional
+        Where to record the probe length of the insert.
 
     Returns
     -------
@@ -138,20 +819,36 @@ def insert_using_quadratic_probing(
     """
     c1: int = 2
     c2: int = 3
+    empty = empty_slot(table.dtype)
     i: int = 0
     while i != m:
         position = quadratic_probing_hash(i, k, m, c1, c2)
-        if table[position] == NIL:
+        if (
+            table[position] == empty
+            if occupied is None
+            else slot_is_empty(table, position, occupied)
+        ):
             if verbose:
                 print(f"qh: element {k} inserted at {position} (had {i} collisions)")
             table[position] = k
+            if occupied is not None:
+                mark_occupied(occupied, position)
+            if stats is not None:
+                stats.record(i + 1)
             return position
         i += 1
+    if stats is not None:
+        stats.record_failure()
     return -1
 
 
 def insert_using_double_hashing(
-    table: np.ndarray, k: int, m: int, verbose: bool
+    table: np.ndarray,
+    k: int,
+    m: int,
+    verbose: bool,
+    occupied: np.ndarray = None,
+    stats: ProbeStats = None,
 ) -> int:
     """
     Insert a key into the hash table using double hashing.
@@ -166,25 +863,1081 @@ def insert_using_double_hashing(
         The size of the hash table.
     verbose: bool
         whether to print where the element is inserted in the table
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table, updated on insertion.
+    stats : ProbeStats, optional
+        Where to record the probe length of the insert.
 
     Returns
     -------
     int
         The position where the key was inserted, or -1 if the table is full.
     """
+    empty = empty_slot(table.dtype)
     i: int = 0
     while i != m:
         position = double_hashing(i, k, m)
-        if table[position] == NIL:
+        if (
+            table[position] == empty
+            if occupied is None
+            else slot_is_empty(table, position, occupied)
+        ):
             if verbose:
                 print(f"dh: element {k} inserted at {position} (had {i} collisions)")
             table[position] = k
+            if occupied is not None:
+                mark_occupied(occupied, position)
+            if stats is not None:
+                stats.record(i + 1)
             return position
         i += 1
+    if stats is not None:
+        stats.record_failure()
+    return -1
+
+
+def probe_sequence(hash_method: str):
+    """
+    Return the probe function used by the specified hash method.
+
+    Parameters
+    ----------
+    hash_method : str
+        The name of a SequenceStrategy.
+
+    Returns
+    -------
+    callable
+        A function of (i, k, m) that works on scalars and NumPy arrays alike.
+    """
+    strategy = get_strategy(hash_method)
+    if not issubclass(strategy, SequenceStrategy):
+        raise ValueError(f"{hash_method!r} does not probe a fixed sequence")
+    return strategy.probe
+
+
+def find_empty_slots(
+    table: np.ndarray,
+    keys: np.ndarray,
+    positions: np.ndarray,
+    collisions: np.ndarray,
+    probe,
+    occupied: np.ndarray = None,
+) -> None:
+    """
+    Find the first empty slot of every key on its probe sequence.
+
+    The search for each key resumes at the iteration stored in collisions,
+    since the slots it already passed can only have stayed occupied. All the
+    keys still searching advance one probe at a time with array arithmetic.
+
+    Parameters
+    ----------
+    table : np.ndarray
+        The hash table.
+    keys : np.ndarray
+        The keys to place.
+    positions : np.ndarray
+        Output, the empty slot found for each key or -1 if there is none.
+    collisions : np.ndarray
+        Input and output, the iteration at which each key's search stands.
+    probe : callable
+        The probe function returned by probe_sequence.
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table; the sentinel is used without it.
+
+    Returns
+    -------
+    None
+    """
+    m: int = table.size
+    active = np.flatnonzero(collisions < m)
+    positions[collisions >= m] = -1
+    while active.size:
+        i = collisions[active]
+        slots = probe(i, keys[active], m)
+        empty = slot_is_empty(table, slots, occupied)
+        positions[active[empty]] = slots[empty]
+        active = active[~empty]
+        collisions[active] += 1
+        exhausted = collisions[active] >= m
+        positions[active[exhausted]] = -1
+        active = active[~exhausted]
+
+
+def batch_hash_insert(
+    table: np.ndarray,
+    keys: np.ndarray,
+    hash_method: str,
+    verbose: bool = False,
+    occupied: np.ndarray = None,
+    stats: ProbeStats = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Insert many keys into the hash table using the specified hash method.
+
+    The result is the same table, positions and collision counts as calling
+    hash_insert on every key in order. Keys are processed in rounds over a
+    window of pending keys: every key in the window looks up its first empty
+    slot at once, and the longest prefix whose slots are all distinct is
+    committed. A key's probe path before its slot is full, so the only way an
+    earlier key can change its outcome is by taking that same slot; the first
+    key that repeats a slot is retried in the next round.
+
+    Parameters
+    ----------
+    table : np.ndarray
+        The hash table.
+    keys : np.ndarray
+        The keys to insert, in insertion order.
+    hash_method : str
+        The hash method to use ('double hash' or 'quadratic hash').
+    verbose: bool
+        whether to print where each element is inserted in the table
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table, updated on insertion.
+    stats : ProbeStats, optional
+        Where to record the probe lengths of the inserts.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The position where each key was inserted (-1 if the table was full)
+        and the number of collisions each key had.
+    """
+    probe = probe_sequence(hash_method)
+    m: int = table.size
+    if np.issubdtype(table.dtype, np.integer):
+        keys = np.asarray(keys, dtype=table.dtype)
+    else:
+        keys = np.asarray(keys, dtype=np.int64)
+    check_key(table, keys, occupied)
+    hashed = keys.astype(np.int64)
+    if keys.dtype == np.uint64:
+        # k mod m*(m - 2) keeps both k mod m and k mod (m - 2) and fits int64.
+        hashed = (keys % np.uint64(m * max(m - 2, 1))).astype(np.int64)
+    n: int = keys.size
+    positions = np.full(n, -1, dtype=np.int64)
+    collisions = np.zeros(n, dtype=np.int64)
+    window: int = 64
+    start: int = 0
+    while start < n:
+        stop = min(n, start + window)
+        find_empty_slots(
+            table,
+            hashed[start:stop],
+            positions[start:stop],
+            collisions[start:stop],
+            probe,
+            occupied,
+        )
+        slots = positions[start:stop]
+        order = np.argsort(slots, kind="stable")
+        ordered = slots[order]
+        repeated = (ordered[1:] == ordered[:-1]) & (ordered[1:] != -1)
+        accepted = int(order[1:][repeated].min()) if repeated.any() else slots.size
+        placed = slots[:accepted] != -1
+        table[slots[:accepted][placed]] = keys[start : start + accepted][placed]
+        if occupied is not None:
+            mark_occupied(occupied, slots[:accepted][placed])
+        if verbose:
+            prefix = get_strategy(hash_method).label
+            for index in range(start, start + accepted):
+                if positions[index] != -1:
+                    print(
+                        f"{prefix}: element {keys[index]} inserted at "
+                        f"{positions[index]} (had {collisions[index]} collisions)"
+                    )
+        start += accepted
+        window = window * 2 if accepted == slots.size else max(64, 2 * accepted)
+    if stats is not None:
+        placed = positions != -1
+        lengths, counts = np.unique(collisions[placed] + 1, return_counts=True)
+        stats.lengths.update(dict(zip(lengths.tolist(), counts.tolist())))
+        stats.failed += int(n - placed.sum())
+    return positions, collisions
+
+
+def next_prime(n: int) -> int:
+    """
+    Find the smallest prime greater than or equal to n.
+
+    Parameters
+    ----------
+    n : int
+        The lower bound.
+
+    Returns
+    -------
+    int
+        The smallest prime that is at least n.
+    """
+    n = max(n, 3)
+    while any(n % d == 0 for d in range(2, math.isqrt(n) + 1)):
+        n += 1
+    return n
+
+
+class OpenAddressingTable:
+    """
+    Map from integer keys to values using open addressing.
+
+    Keys are placed by the ProbingStrategy registered under hash_method,
+    normally on a prime capacity. Sequence strategies mark deleted slots as tombstones so
+    that probe sequences going through them stay intact. The table grows when
+    occupied slots plus tombstones exceed max_load, or when the strategy
+    cannot place a key, and is rebuilt at the same capacity when the
+    tombstones alone exceed max_tombstones, so probe sequences stay short.
+
+    Parameters
+    ----------
+    capacity : int
+        The initial number of slots, rounded up to a prime unless
+        prime_capacity is False.
+    hash_method : str
+        The name of the probing strategy, one of the keys of HASH_STRATEGIES.
+    max_load : float
+        The highest fraction of slots that may be occupied or deleted.
+    max_tombstones : float
+        The highest fraction of slots that may be deleted.
+    dtype : np.dtype
+        The integer type of the keys, stored exactly.
+    prime_capacity : bool
+        Whether capacities are rounded up to primes; otherwise the table
+        keeps the given capacity and doubles it when growing.
+    collect_stats : bool
+        Whether to record the probe length of every insert in stats.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 11,
+        hash_method: str = "double hash",
+        max_load: float = 0.5,
+        max_tombstones: float = 0.25,
+        dtype: np.dtype = np.int64,
+        prime_capacity: bool = True,
+        collect_stats: bool = False,
+    ) -> None:
+        self.dtype = np.dtype(dtype)
+        self.prime_capacity = prime_capacity
+        self.stats = ProbeStats() if collect_stats else None
+        self.hash_method = hash_method
+        self.strategy = get_strategy(hash_method)()
+        self.max_load = max_load
+        self.max_tombstones = max_tombstones
+        self.allocate(self.round_capacity(capacity))
+
+    def round_capacity(self, capacity: int) -> int:
+        return next_prime(capacity) if self.prime_capacity else max(capacity, 3)
+
+    def allocate(self, capacity: int) -> None:
+        self.keys = np.zeros(capacity, dtype=self.dtype)
+        self.values = np.empty(capacity, dtype=object)
+        self.states = np.zeros(capacity, dtype=np.uint8)
+        self.size = 0
+        self.tombstones = 0
+        self.strategy.allocate(self, capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self.states.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, k: int) -> bool:
+        return self.find(k) != -1
+
+    def find(self, k: int) -> int:
+        """
+        Find the slot holding a key.
+
+        Parameters
+        ----------
+        k : int
+            The key to look up.
+
+        Returns
+        -------
+        int
+            The position of the key, or -1 if it is not in the table.
+        """
+        return self.strategy.find(self, k)
+
+    def insert(self, k: int, value=None) -> int:
+        """
+        Insert a key, or replace its value if it is already in the table.
+
+        Parameters
+        ----------
+        k : int
+            The key to insert.
+        value : object
+            The value associated with the key.
+
+        Returns
+        -------
+        int
+            The position where the key was stored.
+        """
+        if (self.size + self.tombstones + 1) > self.max_load * self.capacity:
+            self.resize(2 * self.capacity)
+        position = self.strategy.insert(self, k, value)
+        if position == -1:
+            while position == -1:
+                if self.stats is not None:
+                    self.stats.record_failure()
+                pending = self.strategy.leftover
+                self.resize(2 * self.capacity)
+                position = self.strategy.insert(self, *pending)
+            position = self.find(k)
+        if self.stats is not None:
+            self.stats.record(self.strategy.probe_length(self, position))
+        return position
+
+    def lookup(self, k: int):
+        """
+        Return the value associated with a key.
+
+        Parameters
+        ----------
+        k : int
+            The key to look up.
+
+        Returns
+        -------
+        object
+            The value of the key.
+
+        Raises
+        ------
+        KeyError
+            If the key is not in the table.
+        """
+        position = self.find(k)
+        if position == -1:
+            raise KeyError(k)
+        return self.values[position]
+
+    def delete(self, k: int) -> int:
+        """
+        Remove a key; sequence strategies leave a tombstone in its slot.
+
+        Parameters
+        ----------
+        k : int
+            The key to remove.
+
+        Returns
+        -------
+        int
+            The position the key occupied.
+
+        Raises
+        ------
+        KeyError
+            If the key is not in the table.
+        """
+        position = self.find(k)
+        if position == -1:
+            raise KeyError(k)
+        self.strategy.delete(self, position)
+        if self.tombstones > self.max_tombstones * self.capacity:
+            self.resize(self.capacity)
+        return position
+
+    def resize(self, capacity: int) -> None:
+        """
+        Rehash every key into a table of the given capacity, dropping tombstones.
+
+        Parameters
+        ----------
+        capacity : int
+            The number of slots of the new table.
+
+        Returns
+        -------
+        None
+        """
+        occupied = np.flatnonzero(self.states == OCCUPIED)
+        keys = self.keys[occupied]
+        values = self.values[occupied]
+        stats, self.stats = self.stats, None
+        self.allocate(self.round_capacity(capacity))
+        for k, value in zip(keys.tolist(), values):
+            self.insert(k, value)
+        self.stats = stats
+
+    def probe_lengths(self) -> np.ndarray:
+        """
+        Return how many slots a lookup visits for every key in the table.
+
+        Returns
+        -------
+        np.ndarray
+            The probe length of each stored key, in slot order.
+        """
+        return np.array(
+            [
+                self.strategy.probe_length(self, position)
+                for position in np.flatnonzero(self.states == OCCUPIED).tolist()
+            ],
+            dtype=np.int64,
+        )
+
+    def clustering(self) -> dict:
+        """
+        Measure the runs of occupied slots, see cluster_statistics.
+
+        Returns
+        -------
+        dict
+            The number of clusters and their mean and maximum length.
+        """
+        return cluster_statistics(self.states != OCCUPIED)
+
+    def items(self) -> Iterator[tuple[int, object]]:
+        for position in np.flatnonzero(self.states == OCCUPIED):
+            yield int(self.keys[position]), self.values[position]
+
+
+def hash_search(
+    table: np.ndarray, k: int, hash_method: str, occupied: np.ndarray = None
+) -> int:
+    """
+    Search a key in a hash table filled by hash_insert.
+
+    Parameters
+    ----------
+    table : np.ndarray
+        The hash table.
+    k : int
+        The key to search.
+    hash_method : str
+        The name of the SequenceStrategy used to insert the keys.
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table; the sentinel is used without it.
+
+    Returns
+    -------
+    int
+        The position of the key, or -1 if it is not in the table.
+    """
+    probe = probe_sequence(hash_method)
+    m: int = table.size
+    for i in range(m):
+        position = probe(i, k, m)
+        if slot_is_empty(table, position, occupied):
+            return -1
+        if table[position] == k:
+            return position
     return -1
 
 
-def print_hash_table(table: np.ndarray) -> None:
+def write_hash_file(
+    path: str,
+    table: np.ndarray,
+    hash_method: str,
+    occupied: np.ndarray = None,
+    count: int = None,
+    chunk_size: int = 1 << 20,
+) -> None:
+    """
+    Write a hash table in the file format read by MappedHashTable.
+
+    Layout: an 8-byte magic, six little-endian uint64 (version, m, whether
+    there is an occupancy bitmap, number of keys, c1, c2), the key dtype in 8
+    bytes and the hash method name in 24 bytes, all NUL-padded, then the slots
+    and the bitmap, each starting on an 8-byte boundary. The file is written
+    front to back in chunks of chunk_size slots.
+
+    Parameters
+    ----------
+    path : str
+        The file to create or overwrite.
+    table : np.ndarray
+        The hash table.
+    hash_method : str
+        The name of the SequenceStrategy used to insert the keys.
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table.
+    count : int, optional
+        The number of keys in the table, counted when not given.
+    chunk_size : int
+        The number of slots written at a time.
+
+    Returns
+    -------
+    None
+    """
+    strategy = get_strategy(hash_method)
+    if not issubclass(strategy, SequenceStrategy):
+        raise ValueError(f"{hash_method!r} does not probe a fixed sequence")
+    if count is None:
+        count = int(
+            np.count_nonzero(~slot_is_empty(table, np.arange(table.size), occupied))
+        )
+    c1, c2 = (tuple(strategy.constants) + (0, 0))[:2]
+    header = np.array(
+        [HASH_FILE_VERSION, table.size, occupied is not None, count, c1, c2],
+        dtype="<u8",
+    )
+    dtype = table.dtype.newbyteorder("<")
+    with open(path, "wb") as file:
+        file.write(HASH_MAGIC)
+        file.write(header.tobytes())
+        file.write(dtype.str.encode().ljust(8, b"\0"))
+        file.write(hash_method.encode().ljust(24, b"\0"))
+        for start in range(0, table.size, chunk_size):
+            chunk = table[start : start + chunk_size].astype(dtype, copy=False)
+            file.write(memoryview(np.ascontiguousarray(chunk)).cast("B"))
+        file.write(b"\0" * (-table.nbytes % 8))
+        if occupied is not None:
+            file.write(memoryview(np.ascontiguousarray(occupied)).cast("B"))
+
+
+class MappedHashTable:
+    """
+    Hash table stored in a file and memory-mapped, so that it outlives the
+    process and can be larger than RAM.
+
+    Only the pages touched by the probes are read. Tables opened with mode
+    'r' are read-only; mode 'r+' allows inserts, which are written back to
+    the file by flush or close.
+
+    Parameters
+    ----------
+    path : str
+        A file written by write_hash_file, create or build.
+    mode : str
+        'r' for read-only, 'r+' for read and write.
+    """
+
+    HEADER_SIZE: int = len(HASH_MAGIC) + 48 + 8 + 24
+
+    def __init__(self, path: str, mode: str = "r") -> None:
+        with open(path, "rb") as file:
+            if file.read(len(HASH_MAGIC)) != HASH_MAGIC:
+                raise ValueError(f"{path} is not a hash table file")
+            version, m, bitmap, count, c1, c2 = np.frombuffer(
+                file.read(48), dtype="<u8"
+            ).tolist()
+            dtype = np.dtype(file.read(8).rstrip(b"\0").decode())
+            hash_method = file.read(24).rstrip(b"\0").decode()
+        if version != HASH_FILE_VERSION:
+            raise ValueError(f"unsupported hash table file version {version}")
+        strategy = get_strategy(hash_method)
+        if (tuple(strategy.constants) + (0, 0))[:2] != (c1, c2):
+            raise ValueError(
+                f"{path} was built with constants {(c1, c2)}, "
+                f"but {hash_method!r} uses {strategy.constants}"
+            )
+        self.path = path
+        self.mode = mode
+        self.hash_method = hash_method
+        self.count = count
+        self.header = np.memmap(
+            path, dtype="<u8", mode=mode, offset=len(HASH_MAGIC), shape=(6,)
+        )
+        self.table = np.memmap(
+            path, dtype=dtype, mode=mode, offset=self.HEADER_SIZE, shape=(m,)
+        )
+        self.occupied = None
+        if bitmap:
+            offset = self.HEADER_SIZE + m * dtype.itemsize
+            offset += -offset % 8
+            self.occupied = np.memmap(
+                path, dtype=np.uint8, mode=mode, offset=offset, shape=((m + 7) // 8,)
+            )
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        m: int,
+        hash_method: str = "double hash",
+        dtype: np.dtype = np.int64,
+        bitmap: bool = False,
+    ) -> "MappedHashTable":
+        """
+        Create an empty table file and open it for inserts.
+
+        Parameters
+        ----------
+        path : str
+            The file to create or overwrite.
+        m : int
+            The size of the hash table.
+        hash_method : str
+            The name of the SequenceStrategy used to insert the keys.
+        dtype : np.dtype
+            The type of the keys.
+        bitmap : bool
+            Whether to track the occupied slots with a bitmap.
+
+        Returns
+        -------
+        MappedHashTable
+            The table, opened with mode 'r+'.
+        """
+        table = np.broadcast_to(empty_slot(dtype), (m,))
+        occupied = new_occupancy_bitmap(m) if bitmap else None
+        write_hash_file(path, table, hash_method, occupied, count=0)
+        return cls(path, mode="r+")
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        keys: np.ndarray,
+        m: int,
+        hash_method: str = "double hash",
+        dtype: np.dtype = np.int64,
+        bitmap: bool = False,
+        window: int = 1 << 20,
+    ) -> "MappedHashTable":
+        """
+        Build a table from many keys straight into a mapped file.
+
+        The empty table is written sequentially by create, and the keys are
+        then inserted with batch_hash_insert into the mapped file, one window
+        of window home slots at a time, in slot order. Most writes land in
+        the current window, and each window is flushed before the next one,
+        so the process never holds more than the keys and the pages of about
+        one window, however large the table. The keys of a window are
+        inserted in their given order, so a table of at most window slots is
+        the same as inserting all the keys in order.
+
+        Parameters
+        ----------
+        path : str
+            The file to create or overwrite.
+        keys : np.ndarray
+            The keys to insert, in insertion order.
+        m : int
+            The size of the hash table.
+        hash_method : str
+            The name of the SequenceStrategy used to insert the keys.
+        dtype : np.dtype
+            The type of the keys.
+        bitmap : bool
+            Whether to track the occupied slots with a bitmap.
+        window : int
+            The number of home slots filled at a time.
+
+        Returns
+        -------
+        MappedHashTable
+            The table, opened read-only.
+        """
+        mapped = cls.create(path, m, hash_method, dtype, bitmap)
+        keys = np.asarray(keys)
+        windows = probe_sequence(hash_method)(0, keys, m) // window
+        order = np.argsort(windows, kind="stable")
+        bounds = np.searchsorted(windows[order], np.arange(-(-m // window) + 1))
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if start == stop:
+                continue
+            positions, _ = batch_hash_insert(
+                mapped.table,
+                keys[order[start:stop]],
+                hash_method,
+                occupied=mapped.occupied,
+            )
+            mapped.count += int(np.count_nonzero(positions != -1))
+            mapped.flush()
+        mapped.close()
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, k: int) -> bool:
+        return self.find(k) != -1
+
+    def find(self, k: int) -> int:
+        """
+        Find the slot holding a key.
+
+        Parameters
+        ----------
+        k : int
+            The key to look up.
+
+        Returns
+        -------
+        int
+            The position of the key, or -1 if it is not in the table.
+        """
+        return hash_search(self.table, k, self.hash_method, self.occupied)
+
+    def insert(self, k: int) -> int:
+        """
+        Insert a key into a table opened with mode 'r+'.
+
+        Parameters
+        ----------
+        k : int
+            The key to insert.
+
+        Returns
+        -------
+        int
+            The position where the key was inserted, or -1 if the table is full.
+        """
+        if self.mode == "r":
+            raise ValueError(f"{self.path} is open read-only")
+        position = hash_insert(self.table, k, self.hash_method, False, self.occupied)
+        if position != -1:
+            self.count += 1
+        return position
+
+    def flush(self) -> None:
+        if self.mode != "r":
+            self.header[3] = self.count
+            for array in (self.header, self.table, self.occupied):
+                if array is not None:
+                    array.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.header = self.table = self.occupied = None
+
+
+def shard_of(keys, shards: int):
+    """
+    Route keys to shards by the high bits of a multiplicative hash.
+
+    The shard does not depend on the low bits that modulo_hash uses inside a
+    shard, so keys spread evenly over the slots of every shard.
+
+    Parameters
+    ----------
+    keys : int or np.ndarray
+        The key or keys to route.
+    shards : int
+        The number of shards.
+
+    Returns
+    -------
+    int or np.ndarray
+        The shard of each key, between 0 and shards - 1.
+    """
+    if np.isscalar(keys):
+        mixed = (int(keys) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return ((mixed >> 32) * shards) >> 32
+    mixed = np.asarray(keys).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    return (((mixed >> np.uint64(32)) * np.uint64(shards)) >> np.uint64(32)).astype(
+        np.int64
+    )
+
+
+class ShardedHashTable:
+    """
+    Hash table split into independent shards held in shared memory.
+
+    Every shard is an open-addressing table filled with hash_insert. Threads
+    insert through insert, which locks only the shard of the key. Process
+    pools use bulk_insert, where each shard has a single owner process at a
+    time, so no locking is needed and shards fill in parallel. merge builds a
+    single read-only table from all the shards.
+
+    Parameters
+    ----------
+    shards : int
+        The number of shards.
+    shard_size : int
+        The number of slots of each shard.
+    hash_method : str
+        The name of the SequenceStrategy used inside the shards.
+    dtype : np.dtype
+        The type of the keys.
+    bitmap : bool
+        Whether to track the occupied slots with bitmaps.
+    """
+
+    def __init__(
+        self,
+        shards: int = 8,
+        shard_size: int = 1031,
+        hash_method: str = "double hash",
+        dtype: np.dtype = np.int64,
+        bitmap: bool = False,
+    ) -> None:
+        if not issubclass(get_strategy(hash_method), SequenceStrategy):
+            raise ValueError(f"{hash_method!r} does not probe a fixed sequence")
+        self.hash_method = hash_method
+        self.shard_size = shard_size
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.counts = np.zeros(shards, dtype=np.int64)
+        self.shared: list[tuple[shared_memory.SharedMemory, np.ndarray]] = []
+        self.tables = [
+            self.share(new_hash_table(shard_size, dtype)) for _ in range(shards)
+        ]
+        self.occupied = [
+            self.share(new_occupancy_bitmap(shard_size)) if bitmap else None
+            for _ in range(shards)
+        ]
+
+    def share(self, array: np.ndarray) -> np.ndarray:
+        """Copy an array into a new shared memory block owned by the table."""
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+        shared[...] = array
+        self.shared.append((block, shared))
+        return shared
+
+    def layout(self, array: np.ndarray) -> tuple:
+        """Return what attach_shards needs to map a shared array."""
+        block = next(block for block, shared in self.shared if shared is array)
+        return block.name, array.dtype.str, array.shape
+
+    def release(self, array: np.ndarray) -> None:
+        """Free the shared memory block of an array returned by share."""
+        index = next(i for i, (_, shared) in enumerate(self.shared) if shared is array)
+        block, _ = self.shared.pop(index)
+        block.close()
+        block.unlink()
+
+    @property
+    def shards(self) -> int:
+        return len(self.tables)
+
+    def __len__(self) -> int:
+        return int(self.counts.sum())
+
+    def __contains__(self, k: int) -> bool:
+        return self.find(k) != -1
+
+    def __enter__(self) -> "ShardedHashTable":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def find(self, k: int) -> int:
+        """
+        Find the slot holding a key.
+
+        Parameters
+        ----------
+        k : int
+            The key to look up.
+
+        Returns
+        -------
+        int
+            The position of the key counting the slots of all the shards in
+            order, or -1 if it is not in the table.
+        """
+        shard = shard_of(k, self.shards)
+        position = hash_search(
+            self.tables[shard], k, self.hash_method, self.occupied[shard]
+        )
+        return -1 if position == -1 else shard * self.shard_size + position
+
+    def insert(self, k: int) -> int:
+        """
+        Insert a key, locking only its shard.
+
+        Parameters
+        ----------
+        k : int
+            The key to insert.
+
+        Returns
+        -------
+        int
+            The position where the key was inserted counting the slots of all
+            the shards in order, or -1 if its shard is full.
+        """
+        shard = shard_of(k, self.shards)
+        with self.locks[shard]:
+            position = hash_insert(
+                self.tables[shard], k, self.hash_method, False, self.occupied[shard]
+            )
+            if position == -1:
+                return -1
+            self.counts[shard] += 1
+        return shard * self.shard_size + position
+
+    def bulk_insert(self, keys: np.ndarray, processes: int = None) -> np.ndarray:
+        """
+        Insert many keys with one process per shard at a time.
+
+        The keys are grouped by shard, keeping their order, and published in
+        shared memory next to the shards. Each pool task fills one shard with
+        batch_hash_insert, so every shard ends up as if its keys had been
+        inserted one by one in order.
+
+        Parameters
+        ----------
+        keys : np.ndarray
+            The keys to insert.
+        processes : int, optional
+            The size of the pool; 1 inserts in this process.
+
+        Returns
+        -------
+        np.ndarray
+            The position of each key counting the slots of all the shards in
+            order, or -1 for the keys whose shard was full.
+        """
+        dtype = self.tables[0].dtype
+        keys = np.asarray(
+            keys, dtype=dtype if np.issubdtype(dtype, np.integer) else np.int64
+        )
+        routes = shard_of(keys, self.shards)
+        order = np.argsort(routes, kind="stable")
+        bounds = np.searchsorted(routes[order], np.arange(self.shards + 1))
+        grouped = keys[order]
+        positions = np.full(keys.size, -1, dtype=np.int64)
+        if processes == 1:
+            for shard in range(self.shards):
+                start, stop = bounds[shard], bounds[shard + 1]
+                positions[start:stop], _ = batch_hash_insert(
+                    self.tables[shard],
+                    grouped[start:stop],
+                    self.hash_method,
+                    occupied=self.occupied[shard],
+                )
+        else:
+            shared_keys = self.share(grouped)
+            shared_positions = self.share(positions)
+            layout = {
+                "hash_method": self.hash_method,
+                "tables": [self.layout(table) for table in self.tables],
+                "occupied": [
+                    None if occupied is None else self.layout(occupied)
+                    for occupied in self.occupied
+                ],
+                "keys": self.layout(shared_keys),
+                "positions": self.layout(shared_positions),
+            }
+            try:
+                with multiprocessing.Pool(
+                    processes, initializer=attach_shards, initargs=(layout,)
+                ) as pool:
+                    pool.starmap(
+                        fill_shard,
+                        zip(
+                            range(self.shards),
+                            bounds[:-1].tolist(),
+                            bounds[1:].tolist(),
+                        ),
+                    )
+                positions[...] = shared_positions
+            finally:
+                self.release(shared_keys)
+                self.release(shared_positions)
+        placed = positions != -1
+        self.counts += np.bincount(routes[order][placed], minlength=self.shards)
+        positions[placed] += routes[order][placed] * self.shard_size
+        result = np.empty_like(positions)
+        result[order] = positions
+        return result
+
+    def merge(self, m: int = None, hash_method: str = None) -> tuple:
+        """
+        Build a single read-only table holding the keys of every shard.
+
+        Parameters
+        ----------
+        m : int, optional
+            The size of the merged table, twice the number of keys rounded up
+            to a prime by default.
+        hash_method : str, optional
+            The SequenceStrategy of the merged table, the one of the shards by
+            default.
+
+        Returns
+        -------
+        tuple
+            The merged table and its occupancy bitmap (None without bitmaps),
+            both read-only. They can be saved with write_hash_file.
+        """
+        hash_method = hash_method or self.hash_method
+        keys = []
+        for table, occupied in zip(self.tables, self.occupied):
+            keys.append(table[~slot_is_empty(table, np.arange(table.size), occupied)])
+        keys = np.concatenate(keys)
+        m = m or next_prime(2 * keys.size)
+        table = new_hash_table(m, self.tables[0].dtype)
+        occupied = None if self.occupied[0] is None else new_occupancy_bitmap(m)
+        batch_hash_insert(table, keys, hash_method, occupied=occupied)
+        for array in (table, occupied):
+            if array is not None:
+                array.setflags(write=False)
+        return table, occupied
+
+    def close(self) -> None:
+        """Release the shared memory of the shards."""
+        self.tables = []
+        self.occupied = []
+        while self.shared:
+            self.release(self.shared[-1][1])
+
+
+shared_shards: dict = {}
+shared_shard_blocks: list[shared_memory.SharedMemory] = []
+
+
+def attach_shards(layout: dict) -> None:
+    """
+    Pool initializer: map the shards published by bulk_insert.
+
+    Parameters
+    ----------
+    layout : dict
+        The shared memory block, dtype and shape of every array.
+
+    Returns
+    -------
+    None
+    """
+
+    def attach(entry):
+        if entry is None:
+            return None
+        block_name, dtype, shape = entry
+        block = shared_memory.SharedMemory(name=block_name)
+        shared_shard_blocks.append(block)
+        return np.ndarray(shape, dtype, buffer=block.buf)
+
+    shared_shards["hash_method"] = layout["hash_method"]
+    shared_shards["tables"] = [attach(entry) for entry in layout["tables"]]
+    shared_shards["occupied"] = [attach(entry) for entry in layout["occupied"]]
+    shared_shards["keys"] = attach(layout["keys"])
+    shared_shards["positions"] = attach(layout["positions"])
+
+
+def fill_shard(shard: int, start: int, stop: int) -> None:
+    """
+    Pool task of bulk_insert: insert the keys of one shard.
+
+    Parameters
+    ----------
+    shard : int
+        The shard to fill; no other task writes to it.
+    start : int
+        The index of the first key of the shard in the grouped keys.
+    stop : int
+        The index after the last key of the shard.
+
+    Returns
+    -------
+    None
+    """
+    shared_shards["positions"][start:stop], _ = batch_hash_insert(
+        shared_shards["tables"][shard],
+        shared_shards["keys"][start:stop],
+        shared_shards["hash_method"],
+        occupied=shared_shards["occupied"][shard],
+    )
+
+
+def print_hash_table(table: np.ndarray, occupied: np.ndarray = None) -> None:
     """
     Print the hash table, printing the empty spaces of the table as nil.
 
@@ -192,6 +1945,8 @@ def print_hash_table(table: np.ndarray) -> None:
     ----------
     table : np.ndarray
         The hash table.
+    occupied : np.ndarray, optional
+        The occupancy bitmap of the table; the sentinel is used without it.
 
     Returns
     -------
@@ -199,22 +1954,22 @@ def print_hash_table(table: np.ndarray) -> None:
     """
     print("[", end="")
     for index in range(table.size - 1):
-        if table[index] == NIL:
+        if slot_is_empty(table, index, occupied):
             print("NIL, ", end="")
         else:
             print(f"{table[index]}, ", end="")
 
-    if table[table.size - 1] == NIL:
+    if slot_is_empty(table, table.size - 1, occupied):
         print("NIL]")
     else:
-        print(f"{table[index]}]")
+        print(f"{table[table.size - 1]}]")
 
 
 def main() -> None:
 
     elements = [37, 36, 33, 3, 15, 35, 10]
-    hash_table_quadratic_hash = np.full(10, NIL)
-    hash_table_double_hash = np.full(10, NIL)
+    hash_table_quadratic_hash = new_hash_table(10)
+    hash_table_double_hash = new_hash_table(10)
     for element in elements:
         hash_insert(hash_table_double_hash, element, "double hash", verbose=True)
 
@@ -1,6 +1,12 @@
+import bisect
+
+MIN_RUN = 32
+MIN_GALLOP = 7
+
+
 def print_merge(array):
     print('Result after merge')
-    for l in range(n):
+    for l in range(len(array)):
         print(array[l], end=" ")
     print('\n')
 
@@ -51,14 +57,14 @@ def print_values_return(p, r, depth):
     print('depth:' + str(depth))
     print('\n')
 
-def print_values(p, r, q, depth):
+def print_values(array, p, r, q, depth):
     print('Mergesort called with:')
     print('p: ' + str(p + 1))
     print('r: ' + str(r + 1))
     print('q: ' + str(q + 1))
     print('depth:' + str(depth))
 
-    for i in range(n):
+    for i in range(len(array)):
         print(array[i], end=" ")
 
     print('\n')
@@ -70,23 +76,145 @@ def mergesort(array, p, r, depth):
     
     q = (p + r) // 2
 
-    print_values(p, r, q, depth)
+    print_values(array, p, r, q, depth)
     
     mergesort(array, p, q, depth + 1)
     mergesort(array, q + 1, r, depth + 1)
     merge(array, p, q, r)
 
 
-array = ['G', 'V', 'A', 'N', 'R', 'O', 'P', 'U']
-n = len(array)
-print("Without sorting")
+def binary_insertion_sort(array, lo, start, hi):
+    # array[lo:start] is already sorted; insert the rest after equal keys
+    # so that the sort stays stable.
+    for i in range(start, hi):
+        value = array[i]
+        position = bisect.bisect_right(array, value, lo, i)
+        array[position + 1:i + 1] = array[position:i]
+        array[position] = value
+
+
+def count_run(array, lo, n):
+    # Length of the run starting at lo. A strictly descending run is reversed
+    # in place; equal keys never form part of a descending run, so reversing
+    # it keeps the sort stable.
+    hi = lo + 1
+    if hi == n:
+        return 1
+    if array[hi] < array[lo]:
+        while hi + 1 < n and array[hi + 1] < array[hi]:
+            hi += 1
+        array[lo:hi + 1] = array[lo:hi + 1][::-1]
+    else:
+        while hi + 1 < n and array[hi + 1] >= array[hi]:
+            hi += 1
+    return hi + 1 - lo
+
+
+def find_runs(array):
+    # Boundaries of the natural runs of array, each extended to at least
+    # MIN_RUN elements with binary insertion sort.
+    n = len(array)
+    bounds = [0]
+    lo = 0
+    while lo < n:
+        length = count_run(array, lo, n)
+        if length < MIN_RUN:
+            forced = min(MIN_RUN, n - lo)
+            binary_insertion_sort(array, lo, lo + length, lo + forced)
+            length = forced
+        lo += length
+        bounds.append(lo)
+    return bounds
+
+
+def merge_runs(source, target, lo, mid, hi):
+    # Stable merge of source[lo:mid] and source[mid:hi] into target[lo:hi].
+    if not source[mid] < source[mid - 1]:
+        target[lo:hi] = source[lo:hi]
+        return
+
+    # Elements of the left run that are not greater than the first element
+    # of the right run, and elements of the right run that are not less than
+    # the last element of the left run, are already in place.
+    i = bisect.bisect_right(source, source[mid], lo, mid)
+    end = bisect.bisect_left(source, source[mid - 1], mid, hi)
+    target[lo:i] = source[lo:i]
+    target[end:hi] = source[end:hi]
+
+    j = mid
+    k = i
+    left_wins = 0
+    right_wins = 0
+    while i < mid and j < end:
+        if source[j] < source[i]:
+            target[k] = source[j]
+            j += 1
+            k += 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP:
+                # Galloping: copy every right element less than source[i].
+                stop = bisect.bisect_left(source, source[i], j, end)
+                target[k:k + stop - j] = source[j:stop]
+                k += stop - j
+                j = stop
+                right_wins = 0
+        else:
+            target[k] = source[i]
+            i += 1
+            k += 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP:
+                # Galloping: copy every left element not greater than source[j].
+                stop = bisect.bisect_right(source, source[j], i, mid)
+                target[k:k + stop - i] = source[i:stop]
+                k += stop - i
+                i = stop
+                left_wins = 0
+    target[k:k + mid - i] = source[i:mid]
+    k += mid - i
+    target[k:end] = source[j:end]
+
+
+def natural_mergesort(array):
+    # Iterative, stable mergesort in the style of Timsort: natural runs are
+    # merged pairwise, level by level, alternating between array and a single
+    # buffer, so sorted or nearly sorted input takes close to O(n).
+    n = len(array)
+    if n < 2:
+        return array
+    bounds = find_runs(array)
+    source = array
+    target = array.copy()
+    while len(bounds) > 2:
+        merged = [0]
+        for index in range(0, len(bounds) - 2, 2):
+            lo, mid, hi = bounds[index], bounds[index + 1], bounds[index + 2]
+            merge_runs(source, target, lo, mid, hi)
+            merged.append(hi)
+        if len(bounds) % 2 == 0:
+            lo, hi = bounds[-2], bounds[-1]
+            target[lo:hi] = source[lo:hi]
+            merged.append(hi)
+        bounds = merged
+        source, target = target, source
+    if source is not array:
+        array[:] = source
+    return array
+
+
+if __name__ == '__main__':
+    array = ['G', 'V', 'A', 'N', 'R', 'O', 'P', 'U']
+    n = len(array)
+    print("Without sorting")
 
-for i in range(n):
-    print(array[i], end=" ")
-print('\n')
+    for i in range(n):
+        print(array[i], end=" ")
+    print('\n')
 
-mergesort(array, 0, n-1, 1)
+    mergesort(array, 0, n-1, 1)
 
-print("Sorted")
-for i in range(n):
-    print(array[i], end=" ")
\ No newline at end of file
+    print("Sorted")
+    for i in range(n):
+        print(array[i], end=" ")
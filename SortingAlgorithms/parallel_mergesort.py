@@ -0,0 +1,356 @@
+import multiprocessing
+import os
+import time as timer
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from external_sort import sort_keys, stable_sort
+
+PARALLEL_THRESHOLD = 1 << 16
+
+
+def merge_sorted(parts: list[np.ndarray], key: str = None) -> np.ndarray:
+    """
+    Stable merge of sorted arrays, earlier arrays first on equal keys.
+
+    The parts are concatenated in order and sorted with stable_sort. Numpy's
+    stable sort finds the sorted runs and merges them, so the cost is that
+    of a k-way merge rather than of a full sort.
+
+    Parameters
+    ----------
+    parts : list[np.ndarray]
+        The sorted arrays, in the order that breaks ties.
+    key : str, optional
+        The field to sort structured records by.
+
+    Returns
+    -------
+    np.ndarray
+        The merged records.
+    """
+    return stable_sort(np.concatenate(parts), key)
+
+
+def chunk_bounds(n: int, chunks: int) -> np.ndarray:
+    """
+    Split range(n) into chunks nearly equal contiguous pieces.
+
+    Parameters
+    ----------
+    n : int
+        The number of elements.
+    chunks : int
+        The number of pieces.
+
+    Returns
+    -------
+    np.ndarray
+        The chunks + 1 boundaries, from 0 to n.
+    """
+    return np.arange(chunks + 1) * n // chunks
+
+
+def split_point(keys: np.ndarray, bounds: np.ndarray, rank: int) -> np.ndarray:
+    """
+    Find where the first rank elements of the stable merge of chunks end.
+
+    The splitter is the smallest key v with at least rank keys <= v over all
+    the chunks. One binary search runs in all the chunks at once for their
+    first key that qualifies, and each step ranks the probed keys with one
+    searchsorted per chunk, so p chunks take O(p log n) numpy calls. Each
+    chunk then gives all its keys below v, and the keys equal to v still
+    needed are taken from the first chunks, which keeps the merge stable.
+
+    Parameters
+    ----------
+    keys : np.ndarray
+        The sort keys of an array made of sorted chunks.
+    bounds : np.ndarray
+        The boundaries of the chunks, from 0 to keys.size.
+    rank : int
+        The number of elements before the split.
+
+    Returns
+    -------
+    np.ndarray
+        The index of the cut in every chunk, counted from the start of keys.
+    """
+    starts, stops = bounds[:-1], bounds[1:]
+    if rank <= 0:
+        return starts.copy()
+    if rank >= keys.size:
+        return stops.copy()
+    sizes = stops - starts
+    chunks = [keys[start:stop] for start, stop in zip(starts, stops)]
+
+    def rank_of(values: np.ndarray) -> np.ndarray:
+        return sum(np.searchsorted(chunk, values, "right") for chunk in chunks)
+
+    # A chunk where no key qualifies ends with low == its size.
+    low = np.zeros_like(sizes)
+    high = sizes.copy()
+    while (searching := low < high).any():
+        middle = (low + high) // 2
+        enough = rank_of(keys[np.minimum(starts + middle, keys.size - 1)]) >= rank
+        high = np.where(searching & enough, middle, high)
+        low = np.where(searching & ~enough, middle + 1, low)
+    found = low < sizes
+    # Sorting rather than min() keeps NaN, which numpy sorts last, in place.
+    splitter = np.sort(keys[starts[found] + low[found]])[0]
+    below = np.array([np.searchsorted(chunk, splitter, "left") for chunk in chunks])
+    equal = np.array([np.searchsorted(chunk, splitter, "right") for chunk in chunks])
+    equal -= below
+    needed = rank - below.sum()
+    taken = np.minimum(equal, np.maximum(needed - (np.cumsum(equal) - equal), 0))
+    return starts + below + taken
+
+
+def parallel_mergesort(
+    array: np.ndarray,
+    processes: int = None,
+    key: str = None,
+    threshold: int = PARALLEL_THRESHOLD,
+) -> np.ndarray:
+    """
+    Stable mergesort of a numpy array across a process pool.
+
+    The array is copied into shared memory and split into one chunk per
+    process, and each worker sorts its chunk in place. The output is then cut
+    into one partition per process, all of the same size: each worker finds
+    where its partition begins and ends in every chunk with split_point and
+    merges it with merge_sorted straight into the shared output. Both phases
+    run in parallel and no two workers write to the same place. Arrays of
+    Python objects cannot be shared between processes and are sorted in this
+    process.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The one-dimensional array to sort, numeric or structured.
+    processes : int, optional
+        The size of the pool, all the CPUs by default; 1 runs both phases in
+        this process.
+    key : str, optional
+        The field to sort structured records by.
+    threshold : int
+        Arrays shorter than this are sorted in this process.
+
+    Returns
+    -------
+    np.ndarray
+        The sorted copy of the array.
+    """
+    array = np.asarray(array)
+    if array.ndim != 1:
+        raise ValueError("parallel_mergesort sorts one-dimensional arrays")
+    processes = processes or os.cpu_count() or 1
+    if array.size < threshold or array.dtype.hasobject:
+        processes = 1
+    if processes == 1:
+        output = array.copy()
+        sort_chunk(0, array.size, key, output)
+        return output
+
+    bounds = chunk_bounds(array.size, processes)
+    blocks = []
+    source = output = None
+    try:
+        for _ in range(2):
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+        source, output = (
+            np.ndarray(array.shape, array.dtype, buffer=block.buf) for block in blocks
+        )
+        source[...] = array
+        layout = {
+            "source": (blocks[0].name, array.dtype, array.shape),
+            "output": (blocks[1].name, array.dtype, array.shape),
+        }
+        with multiprocessing.Pool(
+            processes, initializer=attach_arrays, initargs=(layout,)
+        ) as pool:
+            pool.starmap(
+                sort_chunk,
+                zip(bounds[:-1].tolist(), bounds[1:].tolist(), [key] * processes),
+            )
+            pool.starmap(
+                merge_partition,
+                [(bounds.tolist(), j, key) for j in range(processes)],
+            )
+        return output.copy()
+    finally:
+        # The views must go before the blocks they map can be closed.
+        source = output = None
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def measure_speedup(
+    n: int = 10_000_000,
+    process_counts: tuple = None,
+    repeats: int = 3,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Time parallel_mergesort against its single-core path.
+
+    Parameters
+    ----------
+    n : int
+        The number of random int64 keys to sort.
+    process_counts : tuple, optional
+        The pool sizes to measure, 1, 2, 4, ... up to the number of CPUs by
+        default.
+    repeats : int
+        The best of this many runs is kept.
+    seed : int
+        The seed of the keys.
+
+    Returns
+    -------
+    list[dict]
+        One row per pool size, with its time and its speedup over
+        parallel_mergesort with processes=1.
+    """
+    cpus = os.cpu_count() or 1
+    if process_counts is None:
+        process_counts = tuple(1 << i for i in range(cpus.bit_length()))
+        process_counts += (cpus,) if cpus not in process_counts else ()
+    array = np.random.default_rng(seed).integers(0, 1 << 62, n)
+
+    def best_time(sort) -> float:
+        best = float("inf")
+        for _ in range(repeats):
+            start = timer.perf_counter()
+            sort()
+            best = min(best, timer.perf_counter() - start)
+        return best
+
+    serial = best_time(lambda: parallel_mergesort(array, 1))
+    rows = []
+    for processes in process_counts:
+        seconds = best_time(lambda: parallel_mergesort(array, processes))
+        rows.append(
+            {
+                "processes": processes,
+                "seconds": seconds,
+                "serial seconds": serial,
+                "speedup": serial / seconds,
+            }
+        )
+    return rows
+
+
+def print_speedup(rows: list[dict]) -> None:
+    """
+    Print the rows returned by measure_speedup as a table.
+
+    Parameters
+    ----------
+    rows : list[dict]
+        The rows returned by measure_speedup.
+
+    Returns
+    -------
+    None
+    """
+    header = f"{'processes':>10}{'seconds':>10}{'serial':>10}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['processes']:>10}{row['seconds']:>10.3f}"
+            f"{row['serial seconds']:>10.3f}{row['speedup']:>9.2f}"
+        )
+
+
+shared_arrays: dict = {}
+shared_array_blocks: list[shared_memory.SharedMemory] = []
+
+
+def attach_arrays(layout: dict) -> None:
+    """
+    Pool initializer: map the arrays published by parallel_mergesort.
+
+    Parameters
+    ----------
+    layout : dict
+        The shared memory block, dtype and shape of every array.
+
+    Returns
+    -------
+    None
+    """
+    for name, (block_name, dtype, shape) in layout.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        shared_array_blocks.append(block)
+        shared_arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def sort_chunk(
+    start: int, stop: int, key: str = None, array: np.ndarray = None
+) -> None:
+    """
+    Pool task of parallel_mergesort: sort one chunk in place.
+
+    Parameters
+    ----------
+    start : int
+        The index of the first element of the chunk.
+    stop : int
+        The index after the last element of the chunk.
+    key : str, optional
+        The field to sort structured records by.
+    array : np.ndarray, optional
+        The array holding the chunk, the shared source by default.
+
+    Returns
+    -------
+    None
+    """
+    chunk = (shared_arrays["source"] if array is None else array)[start:stop]
+    chunk[...] = stable_sort(chunk, key)
+
+
+def merge_partition(bounds: list, partition: int, key: str = None) -> None:
+    """
+    Pool task of parallel_mergesort: merge one partition into the output.
+
+    Partition j of the output holds as many elements as chunk j of the
+    source and starts at the same index.
+
+    Parameters
+    ----------
+    bounds : list
+        The boundaries of the sorted chunks of the source.
+    partition : int
+        The partition to merge.
+    key : str, optional
+        The field to sort structured records by.
+
+    Returns
+    -------
+    None
+    """
+    source = shared_arrays["source"]
+    keys = sort_keys(source, key)
+    bounds = np.array(bounds)
+    begin, end = bounds[partition], bounds[partition + 1]
+    starts = split_point(keys, bounds, begin)
+    stops = split_point(keys, bounds, end)
+    parts = [source[start:stop] for start, stop in zip(starts, stops)]
+    shared_arrays["output"][begin:end] = merge_sorted(parts, key)
+
+
+def main() -> None:
+    array = np.random.default_rng(1).integers(0, 100, 1_000_000)
+    result = parallel_mergesort(array, processes=4)
+    print("sorted:", bool(np.array_equal(result, np.sort(array))))
+    print_speedup(measure_speedup(n=2_000_000, process_counts=(1, 2, 4), repeats=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,21 @@
+import heapq
+import math
+import random
+
+import numpy as np
+
+from heapsort import corregir_cima
+
+UMBRAL_INSERCION = 16
+UMBRAL_NINTHER = 128
+# Medido con CPython: con menos elementos, sorted le gana a convertir una
+# lista a NumPy; heapq.nsmallest le gana a sorted si k < n / 16, y a NumPy
+# si k < n / 128.
+UMBRAL_LISTAS_NUMPY = 2000
+FRACCION_NSMALLEST = 16
+FRACCION_NSMALLEST_NUMPY = 128
+
+
 def intercambiar(arreglo: list, indice_primero: int, indice_segundo: int) -> None:
     """Intercambia dos elementos en un arreglo.
 
@@ -81,6 +99,7 @@ def particionar(
     indice_inicio: int,
     indice_final: int,
     sangria: str = "",
+    imprimir: bool = True,
 ) -> int:
     """Particiona un arreglo en dos, uno con elementos <= al pivote y otro con elementos >= al pivote.
 
@@ -92,6 +111,7 @@ def particionar(
                      Equivale a p en el pseudocódigo.
     - indice_final: índice del último elemento del subarreglo a particionar.
                     Equivale a r en el pseudocódigo.
+    - imprimir: si se imprime el resultado de la partición.
     retorna:
     --------
     - int: índice del pivote después de la partición.
@@ -107,19 +127,548 @@ def particionar(
             limite_elementos_menores += 1
             intercambiar(arreglo, limite_elementos_menores, indice_actual)
     intercambiar(arreglo, limite_elementos_menores + 1, indice_final)
-    print(sangria + f"Finalizó pos {limite_elementos_menores + 1 + 1}")
-    print(
-        sangria
-        + "Dejó el arreglo de trabajo como:"
-        + f"{arreglo[indice_inicio:indice_final + 1]}\n"
-    )
+    if imprimir:
+        print(sangria + f"Finalizó pos {limite_elementos_menores + 1 + 1}")
+        print(
+            sangria
+            + "Dejó el arreglo de trabajo como:"
+            + f"{arreglo[indice_inicio:indice_final + 1]}\n"
+        )
     return limite_elementos_menores + 1
 
 
-arreglo = ["K", "V", "Y", "N", "T", "S", "D", "B", "J", "I", "G"]
-print("Arreglo original:", arreglo)
-quicksort(arreglo, 0, len(arreglo) - 1)
-print("Arreglo ordenado:", arreglo)
-print()
-print("------------------------------------------------")
-print()
+def mediana_de_tres(arreglo: list, i: int, j: int, k: int) -> int:
+    """Elige entre tres posiciones la que tiene el valor mediano.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos.
+    - i, j, k: índices de los tres candidatos.
+
+    retorna:
+    --------
+    - int: índice del candidato cuyo valor queda entre los otros dos.
+    """
+    if arreglo[i] < arreglo[j]:
+        if arreglo[j] < arreglo[k]:
+            return j
+        return k if arreglo[i] < arreglo[k] else i
+    if arreglo[i] < arreglo[k]:
+        return i
+    return k if arreglo[j] < arreglo[k] else j
+
+
+def ninther(arreglo: list, indice_inicio: int, indice_final: int) -> int:
+    """Elige el pivote como la mediana de tres medianas de tres (de Tukey).
+
+    Se toman nueve muestras repartidas en el subarreglo, lo que aproxima
+    mejor la mediana que tres muestras en subarreglos grandes.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo.
+
+    retorna:
+    --------
+    - int: índice del pivote elegido.
+    """
+    paso = (indice_final - indice_inicio) // 8
+    medio = indice_inicio + (indice_final - indice_inicio) // 2
+    return mediana_de_tres(
+        arreglo,
+        mediana_de_tres(
+            arreglo, indice_inicio, indice_inicio + paso, indice_inicio + 2 * paso
+        ),
+        mediana_de_tres(arreglo, medio - paso, medio, medio + paso),
+        mediana_de_tres(
+            arreglo, indice_final - 2 * paso, indice_final - paso, indice_final
+        ),
+    )
+
+
+def particionar_en_tres(
+    arreglo: list,
+    indice_inicio: int,
+    indice_final: int,
+    valor_pivote,
+) -> tuple[int, int]:
+    """Particiona un subarreglo en menores, iguales y mayores que el pivote.
+
+    Es la partición de la bandera holandesa de Dijkstra: los elementos
+    iguales al pivote quedan juntos en el centro y no se vuelven a ordenar,
+    de modo que las entradas con muchos repetidos no se vuelven cuadráticas.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos a particionar.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo.
+    - valor_pivote: valor con el que se compara cada elemento.
+
+    retorna:
+    --------
+    - tuple[int, int]: índices del primer y el último elemento igual al
+      pivote; antes quedan los menores y después los mayores.
+    """
+    menores = indice_inicio
+    actual = indice_inicio
+    mayores = indice_final
+    while actual <= mayores:
+        if arreglo[actual] < valor_pivote:
+            arreglo[menores], arreglo[actual] = arreglo[actual], arreglo[menores]
+            menores += 1
+            actual += 1
+        elif valor_pivote < arreglo[actual]:
+            # Los mayores que ya están al final se dejan en su lugar; así una
+            # entrada ordenada no se desordena al particionarla.
+            while mayores > actual and valor_pivote < arreglo[mayores]:
+                mayores -= 1
+            arreglo[actual], arreglo[mayores] = arreglo[mayores], arreglo[actual]
+            mayores -= 1
+        else:
+            actual += 1
+    return menores, mayores
+
+
+def ordenar_por_insercion(arreglo: list, indice_inicio: int, indice_final: int) -> None:
+    """Ordena un subarreglo por inserción, rápido para subarreglos pequeños.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos a ordenar.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo.
+    """
+    for i in range(indice_inicio + 1, indice_final + 1):
+        valor = arreglo[i]
+        j = i - 1
+        while j >= indice_inicio and valor < arreglo[j]:
+            arreglo[j + 1] = arreglo[j]
+            j -= 1
+        arreglo[j + 1] = valor
+
+
+def ordenar_por_monticulos(
+    arreglo: list, indice_inicio: int, indice_final: int
+) -> None:
+    """Ordena un subarreglo con el heapsort de heapsort.py, sin impresiones.
+
+    El montículo se construye sobre una copia del subarreglo, porque
+    corregir_cima trabaja con montículos que empiezan en el índice 0.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos a ordenar.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo.
+    """
+    monticulo = arreglo[indice_inicio : indice_final + 1]
+    n = len(monticulo)
+    for i in range(n // 2 - 1, -1, -1):
+        corregir_cima(monticulo, i, n)
+    for i in range(n - 1, 0, -1):
+        monticulo[0], monticulo[i] = monticulo[i], monticulo[0]
+        corregir_cima(monticulo, 0, i)
+    arreglo[indice_inicio : indice_final + 1] = monticulo
+
+
+def quicksort_introspectivo(
+    arreglo: list,
+    indice_inicio: int = 0,
+    indice_final: int | None = None,
+    seleccion_pivote: str = "mediana_de_tres",
+) -> None:
+    """Ordena un arreglo con introsort, en tiempo O(n log n) garantizado.
+
+    Es el quicksort para uso real, sin impresiones: elige el pivote con la
+    mediana de tres (o el ninther en subarreglos grandes), particiona en tres
+    para los repetidos, ordena por inserción los subarreglos pequeños y solo
+    hace recursión sobre la parte más pequeña, así que la pila crece a lo más
+    log2(n). Si la profundidad pasa de 2·log2(n) el subarreglo se termina de
+    ordenar con heapsort.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos a ordenar.
+    - indice_inicio: índice del primer elemento del subarreglo a ordenar.
+    - indice_final: índice del último elemento del subarreglo a ordenar,
+      por defecto el último del arreglo.
+    - seleccion_pivote: "mediana_de_tres" o "ninther".
+    """
+    if seleccion_pivote not in ("mediana_de_tres", "ninther"):
+        raise ValueError(f"selección de pivote desconocida: {seleccion_pivote!r}")
+    if arreglo is None or len(arreglo) == 0 or indice_inicio < 0:
+        return
+    if indice_final is None:
+        indice_final = len(arreglo) - 1
+    n = indice_final - indice_inicio + 1
+    if n < 2:
+        return
+    profundidad_maxima = 2 * int(math.log2(n))
+    introsort(
+        arreglo, indice_inicio, indice_final, profundidad_maxima, seleccion_pivote
+    )
+
+
+def introsort(
+    arreglo: list,
+    indice_inicio: int,
+    indice_final: int,
+    profundidad_restante: int,
+    seleccion_pivote: str,
+) -> None:
+    """Paso recursivo de quicksort_introspectivo.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos a ordenar.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo.
+    - profundidad_restante: particiones que faltan antes de usar heapsort.
+    - seleccion_pivote: "mediana_de_tres" o "ninther".
+    """
+    while indice_final - indice_inicio + 1 > UMBRAL_INSERCION:
+        if profundidad_restante == 0:
+            ordenar_por_monticulos(arreglo, indice_inicio, indice_final)
+            return
+        profundidad_restante -= 1
+
+        if (
+            seleccion_pivote == "ninther"
+            and indice_final - indice_inicio + 1 >= UMBRAL_NINTHER
+        ):
+            indice_pivote = ninther(arreglo, indice_inicio, indice_final)
+        else:
+            indice_pivote = mediana_de_tres(
+                arreglo,
+                indice_inicio,
+                indice_inicio + (indice_final - indice_inicio) // 2,
+                indice_final,
+            )
+        primer_igual, ultimo_igual = particionar_en_tres(
+            arreglo, indice_inicio, indice_final, arreglo[indice_pivote]
+        )
+
+        # Recursión sobre la parte más pequeña y ciclo sobre la más grande.
+        if primer_igual - indice_inicio < indice_final - ultimo_igual:
+            introsort(
+                arreglo,
+                indice_inicio,
+                primer_igual - 1,
+                profundidad_restante,
+                seleccion_pivote,
+            )
+            indice_inicio = ultimo_igual + 1
+        else:
+            introsort(
+                arreglo,
+                ultimo_igual + 1,
+                indice_final,
+                profundidad_restante,
+                seleccion_pivote,
+            )
+            indice_final = primer_igual - 1
+    ordenar_por_insercion(arreglo, indice_inicio, indice_final)
+
+
+def mediana_de_medianas(arreglo: list, indice_inicio: int, indice_final: int) -> int:
+    """Elige un pivote que deja al menos 3/10 de los elementos a cada lado.
+
+    Se ordena cada grupo de cinco por inserción, sus medianas se mueven al
+    inicio del subarreglo y se busca la mediana de ellas con nth_element.
+
+    parametros:
+    ----------
+    - arreglo: lista de elementos.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo.
+
+    retorna:
+    --------
+    - int: índice del pivote elegido.
+    """
+    cantidad = 0
+    for inicio_grupo in range(indice_inicio, indice_final + 1, 5):
+        final_grupo = min(inicio_grupo + 4, indice_final)
+        ordenar_por_insercion(arreglo, inicio_grupo, final_grupo)
+        intercambiar(
+            arreglo,
+            indice_inicio + cantidad,
+            inicio_grupo + (final_grupo - inicio_grupo) // 2,
+        )
+        cantidad += 1
+    indice_mediana = indice_inicio + (cantidad - 1) // 2
+    nth_element(
+        arreglo,
+        indice_mediana,
+        indice_inicio,
+        indice_inicio + cantidad - 1,
+        "mediana_de_medianas",
+    )
+    return indice_mediana
+
+
+def es_arreglo_numerico(arreglo) -> bool:
+    return isinstance(arreglo, np.ndarray) and arreglo.dtype.kind in "biuf"
+
+
+def admite_seleccion_vectorizada(arreglo) -> bool:
+    """Indica si valor_k_esimo_numpy sirve para el arreglo: numérico y sin NaN."""
+    return es_arreglo_numerico(arreglo) and not (
+        arreglo.dtype.kind == "f" and np.isnan(arreglo).any()
+    )
+
+
+def como_arreglo_numerico(arreglo: list) -> np.ndarray | None:
+    """Convierte una lista grande a NumPy si select y top_k pueden usarla.
+
+    Solo se convierten listas de solo int o solo float, que NumPy guarda
+    sin perder precisión; en otro caso retorna None.
+    """
+    if len(arreglo) < UMBRAL_LISTAS_NUMPY or set(map(type, arreglo)) not in (
+        {int},
+        {float},
+    ):
+        return None
+    convertido = np.array(arreglo)
+    return convertido if admite_seleccion_vectorizada(convertido) else None
+
+
+def valor_k_esimo_numpy(arreglo: np.ndarray, k: int, pivote: str):
+    """Busca el k-ésimo menor valor de un arreglo de NumPy sin modificarlo.
+
+    Con pivote "aleatorio" se usa el muestreo de Floyd y Rivest: dos pivotes
+    tomados de una muestra ordenada encierran a la posición k con alta
+    probabilidad, así que una sola pasada vectorizada sobre el arreglo deja
+    pocos candidatos. Con "mediana_de_medianas" el pivote es la mediana de
+    las medianas de grupos de cinco. En ambos casos se conserva solo la parte
+    que contiene a k.
+
+    parametros:
+    ----------
+    - arreglo: arreglo numérico sin NaN.
+    - k: posición buscada, contando desde 0.
+    - pivote: "aleatorio" o "mediana_de_medianas".
+
+    retorna:
+    --------
+    - el valor que ocuparía la posición k si el arreglo estuviera ordenado.
+    """
+    while True:
+        n = arreglo.size
+        if n <= 600:
+            return np.sort(arreglo)[k]
+        if pivote == "aleatorio":
+            tamanno_muestra = int(n ** (2 / 3))
+            muestra = np.sort(arreglo[np.random.randint(0, n, tamanno_muestra)])
+            posicion = k * tamanno_muestra // n
+            margen = int(math.sqrt(tamanno_muestra * math.log(n)))
+            # Cerca de los extremos de la muestra solo se acota un lado.
+            candidatos = np.ones(n, dtype=bool)
+            menores = 0
+            if posicion - margen >= 0:
+                candidatos = arreglo >= muestra[posicion - margen]
+                menores = n - np.count_nonzero(candidatos)
+            if posicion + margen < tamanno_muestra:
+                candidatos &= arreglo <= muestra[posicion + margen]
+            cantidad = np.count_nonzero(candidatos)
+            if menores <= k < menores + cantidad:
+                if (
+                    0 <= posicion - margen
+                    and posicion + margen < tamanno_muestra
+                    and muestra[posicion - margen] == muestra[posicion + margen]
+                ):
+                    # Con muchos repetidos ambas cotas coinciden y todos los
+                    # candidatos valen lo mismo.
+                    return muestra[posicion - margen]
+                if cantidad < n:
+                    arreglo = arreglo[candidatos]
+                    k -= menores
+                    continue
+            # La muestra falló o no descartó nada, como pasa con muchos
+            # repetidos: se particiona en tres alrededor de un pivote al azar.
+            valor_pivote = arreglo[random.randrange(n)]
+        else:
+            # Mediana de cada grupo de cinco con comparaciones por columnas.
+            a, b, c, d, e = arreglo[: n // 5 * 5].reshape(-1, 5).T
+            f = np.maximum(np.minimum(a, b), np.minimum(c, d))
+            g = np.minimum(np.maximum(a, b), np.maximum(c, d))
+            medianas = np.maximum(np.minimum(e, f), np.minimum(np.maximum(e, f), g))
+            valor_pivote = valor_k_esimo_numpy(medianas, medianas.size // 2, pivote)
+        menores = arreglo[arreglo < valor_pivote]
+        if k < menores.size:
+            arreglo = menores
+            continue
+        iguales = n - menores.size - np.count_nonzero(arreglo > valor_pivote)
+        if k < menores.size + iguales:
+            return valor_pivote
+        k -= menores.size + iguales
+        arreglo = arreglo[arreglo > valor_pivote]
+
+
+def nth_element(
+    arreglo: list,
+    k: int,
+    indice_inicio: int = 0,
+    indice_final: int | None = None,
+    pivote: str = "aleatorio",
+):
+    """Reordena un arreglo para que la posición k quede como si estuviera ordenado.
+
+    Al terminar, los elementos antes de k son menores o iguales que
+    arreglo[k] y los de después, mayores o iguales. Con pivote "aleatorio"
+    el tiempo esperado es lineal; con "mediana_de_medianas" es lineal en el
+    peor caso. Las listas se particionan con particionar, juntando luego los
+    iguales al pivote para que los repetidos no vuelvan cuadrática la
+    búsqueda. Los arreglos numéricos de NumPy se reordenan con
+    ndarray.partition, cuyo introselect también es lineal en el peor caso,
+    y sus NaN quedan al final como en np.sort.
+
+    parametros:
+    ----------
+    - arreglo: lista o arreglo de NumPy, se modifica en su lugar.
+    - k: posición buscada, contando desde 0 dentro de todo el arreglo.
+    - indice_inicio: índice del primer elemento del subarreglo.
+    - indice_final: índice del último elemento del subarreglo, por defecto
+      el último del arreglo.
+    - pivote: "aleatorio" o "mediana_de_medianas".
+
+    retorna:
+    --------
+    - el valor que quedó en la posición k.
+    """
+    if pivote not in ("aleatorio", "mediana_de_medianas"):
+        raise ValueError(f"selección de pivote desconocida: {pivote!r}")
+    if indice_final is None:
+        indice_final = len(arreglo) - 1
+    if not indice_inicio <= k <= indice_final:
+        raise IndexError(f"k = {k} está fuera del subarreglo")
+
+    if es_arreglo_numerico(arreglo):
+        arreglo[indice_inicio : indice_final + 1].partition(k - indice_inicio)
+        return arreglo[k]
+
+    while indice_inicio < indice_final:
+        if pivote == "aleatorio":
+            indice_pivote = random.randint(indice_inicio, indice_final)
+        else:
+            indice_pivote = mediana_de_medianas(arreglo, indice_inicio, indice_final)
+        intercambiar(arreglo, indice_pivote, indice_final)
+        q = particionar(arreglo, indice_inicio, indice_final, imprimir=False)
+        if k > q:
+            indice_inicio = q + 1
+        elif k < q:
+            # Los iguales al pivote quedan mezclados con los menores; se
+            # juntan al lado del pivote para no descartarlos de uno en uno.
+            valor_pivote = arreglo[q]
+            limite_iguales = q - 1
+            for i in range(q - 1, indice_inicio - 1, -1):
+                if arreglo[i] == valor_pivote:
+                    intercambiar(arreglo, i, limite_iguales)
+                    limite_iguales -= 1
+            if k > limite_iguales:
+                break
+            indice_final = limite_iguales
+        else:
+            break
+    return arreglo[k]
+
+
+def select(arreglo: list, k: int, pivote: str = "aleatorio"):
+    """Devuelve el k-ésimo menor elemento sin ordenar ni modificar el arreglo.
+
+    Particionar una lista en Python es más lento que el sorted de CPython,
+    así que las listas grandes de números se convierten una vez a NumPy y
+    las demás listas se ordenan con sorted; para particionar una lista en
+    su lugar está nth_element.
+
+    parametros:
+    ----------
+    - arreglo: lista o arreglo de NumPy.
+    - k: posición buscada, contando desde 0; select(arreglo, n // 2) es
+      la mediana.
+    - pivote: "aleatorio" o "mediana_de_medianas".
+
+    retorna:
+    --------
+    - el valor que ocuparía la posición k si el arreglo estuviera ordenado.
+    """
+    if not 0 <= k < len(arreglo):
+        raise IndexError(f"k = {k} está fuera del arreglo")
+    if pivote not in ("aleatorio", "mediana_de_medianas"):
+        raise ValueError(f"selección de pivote desconocida: {pivote!r}")
+    if admite_seleccion_vectorizada(arreglo):
+        return valor_k_esimo_numpy(arreglo, k, pivote)
+    if isinstance(arreglo, list):
+        convertido = como_arreglo_numerico(arreglo)
+        if convertido is None:
+            return sorted(arreglo)[k]
+        return valor_k_esimo_numpy(convertido, k, pivote).item()
+    return nth_element(arreglo.copy(), k, pivote=pivote)
+
+
+def top_k(arreglo: list, k: int, pivote: str = "aleatorio") -> list:
+    """Devuelve los k menores elementos, ordenados, sin modificar el arreglo.
+
+    Para k chico las listas usan heapq.nsmallest; si no, siguen el mismo
+    camino que en select.
+
+    parametros:
+    ----------
+    - arreglo: lista o arreglo de NumPy.
+    - k: cantidad de elementos pedidos.
+    - pivote: "aleatorio" o "mediana_de_medianas".
+
+    retorna:
+    --------
+    - list o np.ndarray (según la entrada): los k menores, de menor a mayor.
+    """
+    if k < 0:
+        raise ValueError(f"k = {k} no puede ser negativo")
+    if pivote not in ("aleatorio", "mediana_de_medianas"):
+        raise ValueError(f"selección de pivote desconocida: {pivote!r}")
+    k = min(k, len(arreglo))
+    if k == 0:
+        return arreglo[:0].copy()
+    if isinstance(arreglo, list):
+        if k * FRACCION_NSMALLEST_NUMPY < len(arreglo):
+            return heapq.nsmallest(k, arreglo)
+        convertido = como_arreglo_numerico(arreglo)
+        if convertido is not None:
+            return top_k(convertido, k, pivote).tolist()
+        if k * FRACCION_NSMALLEST < len(arreglo):
+            return heapq.nsmallest(k, arreglo)
+        return sorted(arreglo)[:k]
+    if admite_seleccion_vectorizada(arreglo):
+        valor = valor_k_esimo_numpy(arreglo, k - 1, pivote)
+        menores = arreglo[arreglo < valor]
+        return np.sort(
+            np.concatenate(
+                (menores, np.full(k - menores.size, valor, dtype=arreglo.dtype))
+            )
+        )
+    copia = arreglo.copy()
+    nth_element(copia, k - 1, pivote=pivote)
+    return np.sort(copia[:k])
+
+
+if __name__ == "__main__":
+    arreglo = ["K", "V", "Y", "N", "T", "S", "D", "B", "J", "I", "G"]
+    print("Arreglo original:", arreglo)
+    quicksort(arreglo, 0, len(arreglo) - 1)
+    print("Arreglo ordenado:", arreglo)
+    print()
+    print("------------------------------------------------")
+    print()
+
+    arreglo = list(range(20, 0, -1)) + [5] * 10
+    print("Arreglo original:", arreglo)
+    quicksort_introspectivo(arreglo)
+    print("Arreglo ordenado con introsort:", arreglo)
+
+    arreglo = [random.randint(0, 99) for _ in range(15)]
+    print("Arreglo:", arreglo)
+    print("Mediana:", select(arreglo, len(arreglo) // 2))
+    print("Los 5 menores:", top_k(arreglo, 5))
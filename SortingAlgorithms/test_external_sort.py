@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pytest
+
+from external_sort import external_sort, merge_files, stable_sort
+
+RECORD = np.dtype([("key", "<i4"), ("index", "<i8")])
+
+
+def sort_file(tmp_path, records, **options):
+    input_path = tmp_path / "input.bin"
+    output_path = tmp_path / "output.bin"
+    records.tofile(input_path)
+    work_dir = tmp_path / "work"
+    work_dir.mkdir(exist_ok=True)
+    count = external_sort(
+        input_path, output_path, records.dtype, temp_dir=work_dir, **options
+    )
+    assert count == records.size
+    assert os.listdir(work_dir) == []
+    return np.fromfile(output_path, dtype=records.dtype)
+
+
+def test_stable_sort_keeps_signed_zeros_in_order():
+    rng = np.random.default_rng(0)
+    values = rng.integers(-2, 3, 10_000).astype(float)
+    values[values == 0] = np.where(rng.random(10_000) < 0.5, -0.0, 0.0)[values == 0]
+    result = stable_sort(values)
+    np.testing.assert_array_equal(result, np.sort(values))
+    np.testing.assert_array_equal(
+        np.signbit(result[result == 0]), np.signbit(values[values == 0])
+    )
+
+
+@pytest.mark.parametrize("memory_limit, fan_in", [(1 << 20, 64), (800, 2), (800, 3)])
+def test_external_sort_matches_np_sort(tmp_path, memory_limit, fan_in):
+    rng = np.random.default_rng(fan_in)
+    for records in (
+        rng.integers(-(1 << 62), 1 << 62, 5000),
+        rng.integers(0, 10, 5000),
+        np.arange(5000)[::-1].copy(),
+        np.zeros(0, dtype=np.int64),
+    ):
+        result = sort_file(tmp_path, records, memory_limit=memory_limit, fan_in=fan_in)
+        np.testing.assert_array_equal(result, np.sort(records))
+
+
+@pytest.mark.parametrize("memory_limit, fan_in", [(1 << 20, 64), (1000, 2)])
+def test_external_sort_is_stable(tmp_path, memory_limit, fan_in):
+    records = np.zeros(3000, RECORD)
+    records["key"] = np.random.default_rng(0).integers(0, 5, records.size)
+    records["index"] = np.arange(records.size)
+    result = sort_file(
+        tmp_path, records, key="key", memory_limit=memory_limit, fan_in=fan_in
+    )
+    expected = records[np.argsort(records["key"], kind="stable")]
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("memory_limit, fan_in", [(1 << 20, 64), (800, 2), (800, 3)])
+def test_external_sort_orders_nan_and_infinities_like_np_sort(
+    tmp_path, memory_limit, fan_in
+):
+    rng = np.random.default_rng(fan_in)
+    special = np.array([np.nan, np.inf, -np.inf, 0.0, -0.0])
+    for records in (
+        np.where(
+            rng.random(3000) < 0.3, rng.choice(special, 3000), rng.normal(size=3000)
+        ),
+        rng.choice(special, 3000),
+        np.full(3000, np.nan),
+    ):
+        result = sort_file(tmp_path, records, memory_limit=memory_limit, fan_in=fan_in)
+        np.testing.assert_array_equal(result, np.sort(records))
+
+
+@pytest.mark.parametrize("memory_limit, fan_in", [(1 << 20, 64), (1600, 2)])
+def test_external_sort_is_stable_with_nan_keys(tmp_path, memory_limit, fan_in):
+    rng = np.random.default_rng(1)
+    records = np.zeros(3000, [("key", "<f8"), ("index", "<i8")])
+    records["key"] = rng.choice([np.nan, np.inf, -np.inf, 1.0, 2.0], records.size)
+    records["index"] = np.arange(records.size)
+    result = sort_file(
+        tmp_path, records, key="key", memory_limit=memory_limit, fan_in=fan_in
+    )
+    expected = records[np.argsort(records["key"], kind="stable")]
+    # Structured records holding NaN never compare equal, so compare fields.
+    np.testing.assert_array_equal(result["key"], expected["key"])
+    np.testing.assert_array_equal(result["index"], expected["index"])
+
+
+def test_merge_files_takes_equal_keys_from_earlier_runs(tmp_path):
+    runs = []
+    for run in range(3):
+        records = np.zeros(40, RECORD)
+        records["key"] = np.arange(40) // 10
+        records["index"] = run * 100 + np.arange(40)
+        runs.append(records)
+        records.tofile(tmp_path / f"run-{run}.bin")
+    output_path = tmp_path / "merged.bin"
+    paths = [tmp_path / f"run-{run}.bin" for run in range(3)]
+    assert merge_files(paths, output_path, RECORD, "key", 7) == 120
+    result = np.fromfile(output_path, dtype=RECORD)
+    expected = stable_sort(np.concatenate(runs), "key")
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_external_sort_rejects_small_fan_in(tmp_path):
+    with pytest.raises(ValueError):
+        sort_file(tmp_path, np.arange(10), fan_in=1)
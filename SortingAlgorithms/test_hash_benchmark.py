@@ -0,0 +1,27 @@
+import numpy as np
+
+from hash_benchmark import make_keys, run_benchmark, table_size
+
+
+def test_table_sizes_and_keys():
+    assert table_size(100, "prime") == 101
+    assert table_size(100, "power of two") == 128
+    rng = np.random.default_rng(0)
+    for distribution in ("uniform", "sequential", "multiples of m"):
+        keys = make_keys(50, 101, distribution, rng)
+        assert len(set(keys)) == 50
+    assert {k % 101 for k in make_keys(50, 101, "multiples of m", rng)} == {0}
+
+
+def test_benchmark_rows():
+    rows = run_benchmark(
+        size=64,
+        methods=["linear probe", "robin hood"],
+        load_factors=(0.5,),
+        size_kinds=("prime",),
+    )
+    assert len(rows) == 2 * 3
+    for row in rows:
+        assert row["keys"] == row["inserts"] == 33
+        assert row["failed"] == 0 and not row["abandoned"]
+        assert row["max probe"] >= row["mean probe"] >= 1
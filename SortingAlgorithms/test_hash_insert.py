@@ -0,0 +1,333 @@
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from hash_insert import (
+    DELETED,
+    HASH_STRATEGIES,
+    MappedHashTable,
+    OpenAddressingTable,
+    ProbeStats,
+    SequenceStrategy,
+    ShardedHashTable,
+    batch_hash_insert,
+    cluster_statistics,
+    empty_slot,
+    get_strategy,
+    hash_insert,
+    hash_search,
+    new_hash_table,
+    new_occupancy_bitmap,
+    register_strategy,
+    shard_of,
+    write_hash_file,
+)
+
+SEQUENCE_METHODS = ("double hash", "quadratic hash", "linear probe")
+ALL_METHODS = tuple(HASH_STRATEGIES)
+
+
+@pytest.mark.parametrize("hash_method", SEQUENCE_METHODS)
+@pytest.mark.parametrize("dtype", [np.float64, np.int64])
+@pytest.mark.parametrize("bitmap", [False, True])
+def test_batch_insert_matches_one_by_one_inserts(hash_method, dtype, bitmap):
+    rng = np.random.default_rng(0)
+    m = 101
+    keys = rng.choice(10_000, 150, replace=False)
+    tables = [new_hash_table(m, dtype) for _ in range(2)]
+    bitmaps = [new_occupancy_bitmap(m) if bitmap else None for _ in range(2)]
+    stats = [ProbeStats(), ProbeStats()]
+
+    expected = [
+        hash_insert(tables[0], int(k), hash_method, False, bitmaps[0], stats[0])
+        for k in keys
+    ]
+    positions, collisions = batch_hash_insert(
+        tables[1], keys, hash_method, occupied=bitmaps[1], stats=stats[1]
+    )
+    np.testing.assert_array_equal(positions, expected)
+    np.testing.assert_array_equal(tables[1], tables[0])
+    if bitmap:
+        np.testing.assert_array_equal(bitmaps[1], bitmaps[0])
+    assert stats[1].lengths == stats[0].lengths
+    assert stats[1].failed == stats[0].failed == np.count_nonzero(positions == -1)
+    assert (collisions[positions == -1] == m).all()
+
+
+def check_against_dict(table: OpenAddressingTable, operations: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    model = {}
+    for _ in range(operations):
+        k = int(rng.integers(0, 300))
+        if rng.random() < 0.3 and model:
+            k = int(rng.choice(list(model)))
+            table.delete(k)
+            del model[k]
+        else:
+            table.insert(k, str(k * 7))
+            model[k] = str(k * 7)
+        assert len(table) == len(model)
+    assert dict(table.items()) == model
+    for k in range(300):
+        assert (k in table) == (k in model)
+        if k in model:
+            assert table.lookup(k) == model[k]
+        else:
+            with pytest.raises(KeyError):
+                table.lookup(k)
+
+
+@pytest.mark.parametrize("hash_method", SEQUENCE_METHODS)
+def test_open_addressing_table_behaves_like_a_dict(hash_method):
+    table = OpenAddressingTable(capacity=5, hash_method=hash_method)
+    check_against_dict(table, 2000, 0)
+    assert table.capacity > 5
+    assert len(table) + table.tombstones <= table.max_load * table.capacity
+
+
+def test_tombstones_trigger_a_rebuild():
+    table = OpenAddressingTable(capacity=101, max_load=0.9, max_tombstones=0.1)
+    for k in range(40):
+        table.insert(k)
+    capacity = table.capacity
+    for k in range(30):
+        table.delete(k)
+        assert table.tombstones <= table.max_tombstones * table.capacity
+    assert table.capacity == capacity
+    assert np.count_nonzero(table.states == DELETED) == table.tombstones
+    assert sorted(k for k, _ in table.items()) == list(range(30, 40))
+
+
+@pytest.mark.parametrize("dtype", [np.int32, np.int64, np.uint64])
+def test_integer_tables_store_keys_exactly(dtype):
+    largest = int(np.iinfo(dtype).max)
+    keys = np.array([largest - 1, largest - 2, 7, largest // 3], dtype=dtype)
+    table = new_hash_table(13, dtype)
+    assert table[0] == empty_slot(dtype) == largest
+    positions, _ = batch_hash_insert(table, keys, "double hash")
+    for k, position in zip(keys.tolist(), positions.tolist()):
+        assert table[position] == k
+        assert hash_search(table, k, "double hash") == position
+    with pytest.raises(ValueError):
+        hash_insert(table, largest, "double hash", False)
+
+    occupied = new_occupancy_bitmap(13)
+    table = new_hash_table(13, dtype)
+    position = hash_insert(table, largest, "double hash", False, occupied)
+    assert hash_search(table, largest, "double hash", occupied) == position
+    assert hash_search(table, largest - 1, "double hash", occupied) == -1
+
+
+def test_uint64_open_addressing_table():
+    table = OpenAddressingTable(capacity=7, dtype=np.uint64)
+    keys = [(1 << 64) - 1 - i * 1_000_003 for i in range(50)]
+    for k in keys:
+        table.insert(k, k % 97)
+    assert all(table.lookup(k) == k % 97 for k in keys)
+    assert sorted(k for k, _ in table.items()) == sorted(keys)
+
+
+@pytest.mark.parametrize("hash_method", ALL_METHODS)
+def test_every_strategy_behaves_like_a_dict(hash_method):
+    table = OpenAddressingTable(capacity=5, hash_method=hash_method)
+    check_against_dict(table, 2000, 1)
+    lengths = table.probe_lengths()
+    assert (lengths >= 1).all()
+    if hash_method == "cuckoo":
+        assert lengths.max() <= 2
+    elif hash_method == "hopscotch":
+        assert lengths.max() <= table.strategy.neighbourhood
+
+
+def test_robin_hood_keeps_displacements_ordered():
+    table = OpenAddressingTable(capacity=211, hash_method="robin hood", max_load=0.9)
+    rng = np.random.default_rng(2)
+    for k in rng.choice(100_000, 180, replace=False).tolist():
+        table.insert(k)
+    m = table.capacity
+    for position in range(m):
+        following = (position + 1) % m
+        if table.states[position] and table.states[following]:
+            distance = table.strategy.distance(table, position)
+            assert table.strategy.distance(table, following) <= distance + 1
+
+
+def test_strategy_registry():
+    assert set(SEQUENCE_METHODS) <= set(ALL_METHODS)
+    assert {"robin hood", "hopscotch", "cuckoo"} <= set(ALL_METHODS)
+    with pytest.raises(ValueError):
+        get_strategy("no such probing")
+
+    @register_strategy("test stride")
+    class Stride(SequenceStrategy):
+        label = "st"
+
+        @staticmethod
+        def probe(i, k, m):
+            return (k + 7 * i) % m
+
+    try:
+        assert get_strategy("test stride") is Stride
+        table = new_hash_table(11)
+        assert hash_insert(table, 3, "test stride", False) == 3
+        assert hash_insert(table, 14, "test stride", False) == 10
+        check_against_dict(OpenAddressingTable(5, "test stride"), 500, 2)
+    finally:
+        del HASH_STRATEGIES["test stride"]
+
+
+def test_probe_stats_and_clusters():
+    stats = ProbeStats()
+    for probes in (1, 1, 2, 4):
+        stats.record(probes)
+    stats.record_failure()
+    assert (stats.count, stats.failed, stats.max) == (4, 1, 4)
+    assert stats.mean == 2.0
+    assert stats.variance == 1.5
+    np.testing.assert_array_equal(stats.histogram(), [0, 2, 1, 0, 1])
+
+    empty = np.array([False, True, False, False, True, True, False, False])
+    assert cluster_statistics(empty) == {
+        "clusters": 2,
+        "mean cluster": 2.5,
+        "max cluster": 3,
+    }
+    assert cluster_statistics(np.zeros(4, dtype=bool))["max cluster"] == 4
+    assert cluster_statistics(np.ones(4, dtype=bool))["clusters"] == 0
+
+
+def test_table_stats_match_probe_lengths():
+    table = OpenAddressingTable(101, "linear probe", max_load=0.9, collect_stats=True)
+    for k in range(0, 80 * 101, 101):
+        table.insert(k)
+    assert table.stats.count == 80
+    assert table.stats.max == table.probe_lengths().max() == 80
+
+
+@pytest.mark.parametrize("bitmap", [False, True])
+def test_mapped_table_round_trip(tmp_path, bitmap):
+    rng = np.random.default_rng(3)
+    keys = rng.choice(1 << 40, 300, replace=False)
+    table = new_hash_table(1009, np.int64)
+    occupied = new_occupancy_bitmap(1009) if bitmap else None
+    batch_hash_insert(table, keys, "quadratic hash", occupied=occupied)
+    path = tmp_path / "table.hash"
+    write_hash_file(path, table, "quadratic hash", occupied, chunk_size=100)
+
+    mapped = MappedHashTable(path)
+    assert len(mapped) == 300
+    np.testing.assert_array_equal(mapped.table, table)
+    for k in keys[:50].tolist() + rng.integers(0, 1 << 40, 50).tolist():
+        assert mapped.find(k) == hash_search(table, k, "quadratic hash", occupied)
+    with pytest.raises(ValueError):
+        mapped.insert(1)
+    mapped.close()
+
+    built = MappedHashTable.build(
+        tmp_path / "built.hash", keys, 1009, "quadratic hash", bitmap=bitmap
+    )
+    np.testing.assert_array_equal(built.table, table)
+    built.close()
+
+
+def test_mapped_table_inserts_persist(tmp_path):
+    path = tmp_path / "table.hash"
+    mapped = MappedHashTable.create(path, 101, "linear probe", np.int32, bitmap=True)
+    expected = new_hash_table(101, np.int32)
+    for k in (5, 106, 207, -3):
+        assert mapped.insert(k) == hash_insert(expected, k, "linear probe", False)
+    mapped.close()
+
+    reopened = MappedHashTable(path)
+    assert len(reopened) == 4 and 207 in reopened and 7 not in reopened
+    np.testing.assert_array_equal(reopened.table, expected)
+    reopened.close()
+
+    path.write_bytes(b"not a table" * 10)
+    with pytest.raises(ValueError):
+        MappedHashTable(path)
+
+
+@pytest.mark.parametrize("bitmap", [False, True])
+def test_sharded_bulk_insert_matches_serial(bitmap):
+    keys = np.random.default_rng(4).choice(1 << 40, 2000, replace=False)
+    with ShardedHashTable(4, 701, bitmap=bitmap) as serial:
+        with ShardedHashTable(4, 701, bitmap=bitmap) as pooled:
+            expected = serial.bulk_insert(keys, processes=1)
+            np.testing.assert_array_equal(
+                pooled.bulk_insert(keys, processes=2), expected
+            )
+            for a, b in zip(pooled.tables, serial.tables):
+                np.testing.assert_array_equal(a, b)
+            assert len(pooled) == 2000
+
+            routes = shard_of(keys, 4)
+            assert routes.tolist() == [shard_of(int(k), 4) for k in keys]
+            np.testing.assert_array_equal(expected // 701, routes)
+            for k, position in zip(keys[:100].tolist(), expected[:100].tolist()):
+                assert k in pooled and pooled.find(k) == position
+            assert pooled.find(1 << 41) == -1
+
+            table, occupied = pooled.merge()
+            assert not table.flags.writeable
+            for k in keys.tolist():
+                assert hash_search(table, k, "double hash", occupied) != -1
+
+
+def test_sharded_threaded_inserts():
+    keys = np.arange(4000) * 7919
+    with ShardedHashTable(8, 1031) as sharded:
+        threads = [
+            threading.Thread(
+                target=lambda part: [sharded.insert(k) for k in part], args=(part,)
+            )
+            for part in np.array_split(keys.tolist(), 4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(sharded) == 4000
+        assert all(k in sharded for k in keys.tolist())
+    assert sharded.shared == [] and sharded.tables == []
+
+
+@pytest.mark.parametrize("hash_method", ALL_METHODS)
+def test_strategies_take_numpy_integer_keys(hash_method):
+    keys = np.random.default_rng(5).choice(1 << 62, 300, replace=False)
+    table = OpenAddressingTable(capacity=5, hash_method=hash_method)
+    for k in keys:
+        table.insert(k, int(k) % 11)
+    assert len(table) == keys.size
+    for k in keys:
+        assert k in table and int(k) in table
+        assert table.lookup(k) == int(k) % 11
+    assert np.int64(-1) not in table
+
+
+def test_mapped_build_fills_the_file_window_by_window(tmp_path):
+    rng = np.random.default_rng(6)
+    keys = rng.choice(1 << 40, 500, replace=False)
+    built = MappedHashTable.build(tmp_path / "small.hash", keys, 1009, window=100)
+    windows = keys % 1009 // 100
+    expected = new_hash_table(1009, np.int64)
+    batch_hash_insert(expected, keys[np.argsort(windows, kind="stable")], "double hash")
+    np.testing.assert_array_equal(built.table, expected)
+    assert len(built) == 500 and all(k in built for k in keys.tolist())
+    built.close()
+
+    # The table is never built in memory: peak allocations stay far below it.
+    m = 4_000_037
+    tracemalloc.start()
+    try:
+        built = MappedHashTable.build(
+            tmp_path / "large.hash", keys, m, bitmap=True, window=1 << 16
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < m * 8 / 2
+    assert len(built) == 500 and all(k in built for k in keys.tolist())
+    built.close()
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from mergesort import MIN_RUN, natural_mergesort
+
+
+class Item:
+    # Compares by key only, so equal keys show whether the sort is stable.
+    def __init__(self, key, index):
+        self.key = key
+        self.index = index
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __ge__(self, other):
+        return self.key >= other.key
+
+
+def inputs(n, seed):
+    rng = random.Random(seed)
+    yield [rng.random() for _ in range(n)]
+    yield list(range(n))
+    yield list(range(n, 0, -1))
+    yield [rng.randrange(5) for _ in range(n)]
+    # Long runs broken by a few displaced elements, which makes merge_runs gallop.
+    nearly = list(range(n))
+    for _ in range(n // 100):
+        i, j = rng.randrange(n), rng.randrange(n)
+        nearly[i], nearly[j] = nearly[j], nearly[i]
+    yield nearly
+    yield [i % 7 for i in range(n)] + list(range(n))
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, MIN_RUN - 1, MIN_RUN + 1, 1000, 5000])
+def test_natural_mergesort_matches_sorted(n):
+    for array in inputs(n, n):
+        expected = sorted(array)
+        assert natural_mergesort(array) is array
+        assert array == expected
+
+
+def test_natural_mergesort_is_stable():
+    for n in (MIN_RUN, 1000, 5000):
+        for array in inputs(n, n + 1):
+            items = [Item(key, index) for index, key in enumerate(array)]
+            expected = sorted(items, key=lambda item: item.key)
+            natural_mergesort(items)
+            assert [item.index for item in items] == [item.index for item in expected]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from parallel_mergesort import chunk_bounds, parallel_mergesort, split_point
+
+RECORD = np.dtype([("key", "<i4"), ("index", "<i8")])
+
+
+def sorted_chunks(keys: np.ndarray, chunks: int) -> tuple:
+    bounds = chunk_bounds(keys.size, chunks)
+    keys = keys.copy()
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        keys[start:stop] = np.sort(keys[start:stop], kind="stable")
+    return keys, bounds
+
+
+@pytest.mark.parametrize("processes", [1, 2, 3, 5])
+def test_parallel_mergesort_matches_np_sort(processes):
+    rng = np.random.default_rng(processes)
+    for size in (0, 1, 7, 1000, 4099):
+        integers = rng.integers(0, 10, size)
+        result = parallel_mergesort(integers, processes, threshold=0)
+        np.testing.assert_array_equal(result, np.sort(integers))
+
+        floats = rng.random(size)
+        floats[rng.random(size) < 0.2] = np.nan
+        floats[rng.random(size) < 0.2] = 0.5
+        result = parallel_mergesort(floats, processes, threshold=0)
+        np.testing.assert_array_equal(result, np.sort(floats))
+
+
+@pytest.mark.parametrize("processes", [1, 2, 4])
+def test_parallel_mergesort_is_stable(processes):
+    rng = np.random.default_rng(0)
+    records = np.zeros(5000, RECORD)
+    records["key"] = rng.integers(0, 4, records.size)
+    records["index"] = np.arange(records.size)
+    result = parallel_mergesort(records, processes, key="key", threshold=0)
+    expected = records[np.argsort(records["key"], kind="stable")]
+    np.testing.assert_array_equal(result, expected)
+
+    zeros = np.where(rng.random(5000) < 0.5, -0.0, 0.0)
+    result = parallel_mergesort(zeros, processes, threshold=0)
+    np.testing.assert_array_equal(np.signbit(result), np.signbit(zeros))
+
+
+def test_parallel_mergesort_sorts_objects_in_this_process():
+    values = np.array([3, 1.0, 2, 1, 0], dtype=object)
+    result = parallel_mergesort(values, 4, threshold=0)
+    assert result.tolist() == [0, 1, 1, 2, 3]
+    assert [type(value) for value in result[1:3]] == [float, int]
+
+
+@pytest.mark.parametrize("chunks", [1, 2, 7, 64])
+def test_split_point_cuts_the_stable_merge(chunks):
+    rng = np.random.default_rng(chunks)
+    keys, bounds = sorted_chunks(rng.integers(0, 5, 3000), chunks)
+    stable_order = np.argsort(keys, kind="stable")
+    for rank in (0, 1, 599, 1500, 2999, 3000):
+        cuts = split_point(keys, bounds, rank)
+        assert (bounds[:-1] <= cuts).all() and (cuts <= bounds[1:]).all()
+        first = np.zeros(keys.size, dtype=bool)
+        first[stable_order[:rank]] = True
+        taken = np.zeros(keys.size, dtype=bool)
+        for start, cut in zip(bounds[:-1], cuts):
+            taken[start:cut] = True
+        np.testing.assert_array_equal(taken, first)
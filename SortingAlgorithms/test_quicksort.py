@@ -0,0 +1,115 @@
+import random
+
+import numpy as np
+import pytest
+
+from quicksort import introsort, nth_element, quicksort_introspectivo, select, top_k
+
+PIVOTES = ("aleatorio", "mediana_de_medianas")
+
+
+@pytest.mark.parametrize("pivote", PIVOTES)
+def test_select_coincide_con_sort(pivote):
+    generador = np.random.default_rng(0)
+    for _ in range(50):
+        arreglo = generador.integers(-1000, 1000, int(generador.integers(1, 5000)))
+        k = int(generador.integers(0, arreglo.size))
+        assert select(arreglo, k, pivote) == np.sort(arreglo)[k]
+        assert select(arreglo.tolist(), k, pivote) == np.sort(arreglo)[k]
+
+
+@pytest.mark.parametrize("pivote", PIVOTES)
+def test_select_con_muchos_repetidos(pivote):
+    generador = np.random.default_rng(1)
+    assert select(np.zeros(1000), 500, pivote) == 0
+    arreglo = generador.integers(0, 3, 100_000)
+    ordenado = np.sort(arreglo)
+    for k in (0, 1, 33_333, 50_000, 66_667, 99_999):
+        assert select(arreglo, k, pivote) == ordenado[k]
+    np.testing.assert_array_equal(top_k(arreglo, 1000, pivote), ordenado[:1000])
+    np.testing.assert_array_equal(
+        top_k(arreglo.astype(float), 40_000, pivote), ordenado[:40_000]
+    )
+
+
+@pytest.mark.parametrize("pivote", PIVOTES)
+def test_nth_element_particiona_listas(pivote):
+    aleatorio = random.Random(2)
+    for _ in range(50):
+        arreglo = [aleatorio.randrange(10) for _ in range(aleatorio.randrange(1, 300))]
+        k = aleatorio.randrange(len(arreglo))
+        esperado = sorted(arreglo)
+        valor = nth_element(arreglo, k, pivote=pivote)
+        assert valor == esperado[k] == arreglo[k]
+        assert all(x <= valor for x in arreglo[:k])
+        assert all(x >= valor for x in arreglo[k + 1 :])
+        assert sorted(arreglo) == esperado
+
+
+def test_top_k_ordena_los_menores():
+    arreglo = [5, 3, 9, 3, 1, 7, 3]
+    assert top_k(arreglo, 4) == [1, 3, 3, 3]
+    assert top_k(arreglo, 0) == []
+    assert top_k(arreglo, 100) == sorted(arreglo)
+    assert arreglo == [5, 3, 9, 3, 1, 7, 3]
+
+
+@pytest.mark.parametrize("seleccion", ["mediana_de_tres", "ninther"])
+def test_quicksort_introspectivo_coincide_con_sorted(seleccion):
+    aleatorio = random.Random(3)
+    n = 3000
+    casos = [
+        [aleatorio.random() for _ in range(n)],
+        list(range(n)),
+        list(range(n, 0, -1)),
+        [aleatorio.randrange(4) for _ in range(n)],
+        [1, 2] * (n // 2),
+        [],
+        [7],
+    ]
+    for arreglo in casos:
+        esperado = sorted(arreglo)
+        quicksort_introspectivo(arreglo, seleccion_pivote=seleccion)
+        assert arreglo == esperado
+
+
+def test_quicksort_introspectivo_ordena_subarreglos():
+    arreglo = list(range(100, 0, -1))
+    quicksort_introspectivo(arreglo, 10, 89)
+    assert arreglo[:10] == list(range(100, 90, -1))
+    assert arreglo[10:90] == list(range(11, 91))
+    assert arreglo[90:] == list(range(10, 0, -1))
+    with pytest.raises(ValueError):
+        quicksort_introspectivo(arreglo, seleccion_pivote="primero")
+
+
+def test_introsort_sin_profundidad_usa_heapsort():
+    aleatorio = random.Random(4)
+    arreglo = [aleatorio.randrange(50) for _ in range(500)]
+    esperado = sorted(arreglo)
+    introsort(arreglo, 0, len(arreglo) - 1, 0, "mediana_de_tres")
+    assert arreglo == esperado
+
+
+@pytest.mark.parametrize("pivote", PIVOTES)
+def test_select_y_top_k_en_listas_grandes(pivote):
+    aleatorio = random.Random(5)
+    n = 20_000
+    casos = [
+        [aleatorio.randrange(-(10**9), 10**9) for _ in range(n)],
+        [aleatorio.random() for _ in range(n)],
+        [aleatorio.randrange(5) for _ in range(n)],
+        [str(aleatorio.random()) for _ in range(n)],
+        # Enteros que no caben en float64 ni en int64, y tipos mezclados.
+        [2**70 + aleatorio.randrange(1000) for _ in range(n)],
+        [2**60 + aleatorio.randrange(3) for _ in range(n // 2)] + [0.5] * (n // 2),
+    ]
+    for arreglo in casos:
+        copia = list(arreglo)
+        esperado = sorted(arreglo)
+        for k in (0, 7, n // 2, n - 1):
+            valor = select(arreglo, k, pivote)
+            assert valor == esperado[k] and type(valor) is type(esperado[k])
+        for k in (10, n // 100, n // 3, n):
+            assert top_k(arreglo, k, pivote) == esperado[:k]
+        assert arreglo == copia